@@ -1,36 +1,90 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import requests
 from datetime import datetime, timedelta
-import json
-import time
 import io
+import logging
+import os
+import threading
+import inspect
 from PIL import Image
 
+import perf_metrics
+from predictions_data import (CACHE_DIR, apply_schema, create_refresher, dataset_version, from_day_ordinal,
+                              parse_sheet_sources, to_day_ordinal)
+from predictions_stats import FilterIndex, MatchdayIndex, TeamIndex, get_derived_views, get_matchday_views
+from predictions_charts import cached_figure, confidence_figure, match_type_figure, reliability_figure, trend_figure
+from predictions_scoring import get_probability_scores
+from predictions_trends import get_accuracy_series, rolling_matches
+from predictions_render import (completed_matches_html, page_count, page_for_date, page_slice,
+                                upcoming_matches_html)
+
 RAW_ICON_URL = "https://raw.githubusercontent.com/lgznml/FootballPredictions/main/FMP_Solo_Logo.png"
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+BUNDLED_ICONS = ['FMP_Solo_Logo.png', 'icon-192.png']
+ICON_CACHE_PATH = os.path.join(CACHE_DIR, 'page_icon.png')
+# Intervallo (secondi) tra due aggiornamenti in background del foglio
+REFRESH_INTERVAL = float(os.getenv('ELITEPREDICT_REFRESH_SECONDS', '300'))
+# Schede "pigre": a ogni rerun viene eseguita solo la scheda selezionata
+# (0 = tutte le schede, come st.tabs senza stato)
+LAZY_TABS = os.getenv('ELITEPREDICT_LAZY_TABS', '1') != '0'
+
+# Streamlit esegue lo script come __main__: nome esplicito per il logger
+logger = logging.getLogger('elitepredict')
 
-try:
-    r = requests.get(RAW_ICON_URL, timeout=10)
-    r.raise_for_status()
-    icon = Image.open(io.BytesIO(r.content)).convert("RGBA")
-    # ridimensiona (opzionale, ma utile per coerenza)
-    icon = icon.resize((256, 256), Image.LANCZOS)
-    # imposta l'icona della pagina
-    st.set_page_config(page_title="Predizioni Calcio", page_icon=icon, layout="wide")
-except Exception as e:
-    # fallback: emoji pallone se non riesce a scaricare l'immagine
-    st.set_page_config(page_title="Predizioni Calcio", page_icon="⚽", layout="wide")
-    st.warning(f"Impossibile caricare l'icona da GitHub: {e}")
-# -------------------------------------------------
+
+def refresh_icon_cache():
+    """
+    Scarica l'icona da GitHub e la salva nella cache locale (rename atomico).
+    Pensata per girare in un thread in background: gli errori di rete o di
+    scrittura vengono solo registrati, l'icona resta quella già risolta.
+    """
+    try:
+        r = requests.get(RAW_ICON_URL, timeout=10)
+        r.raise_for_status()
+        icon = Image.open(io.BytesIO(r.content)).convert("RGBA")
+        icon = icon.resize((256, 256), Image.LANCZOS)
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = f"{ICON_CACHE_PATH}.{os.getpid()}.tmp"
+        icon.save(tmp_path, format="PNG")
+        os.replace(tmp_path, ICON_CACHE_PATH)
+    except (OSError, requests.RequestException) as e:
+        logger.warning("Impossibile aggiornare l'icona in cache %s: %s", ICON_CACHE_PATH, e)
 
 
+@st.cache_resource(show_spinner=False)
+def load_page_icon():
+    """
+    Risolve l'icona della pagina una sola volta per processo:
+    prima la copia in cache su disco, poi i loghi inclusi nel repository,
+    infine l'emoji pallone. Il download da GitHub è opzionale
+    (ELITEPREDICT_ICON_REFRESH=1) e avviene in background.
+    """
+    perf_metrics.annotate(cache='miss')
+    if os.getenv('ELITEPREDICT_ICON_REFRESH', '0') == '1':
+        threading.Thread(target=refresh_icon_cache, name='icon-refresh', daemon=True).start()
+
+    candidates = [ICON_CACHE_PATH] + [os.path.join(APP_DIR, name) for name in BUNDLED_ICONS]
+    for path in candidates:
+        try:
+            icon = Image.open(path).convert("RGBA")
+        except OSError:
+            continue
+        # ridimensiona (opzionale, ma utile per coerenza)
+        return icon.resize((256, 256), Image.LANCZOS)
+    return "⚽"
+
+
+# Misure delle prestazioni di questa esecuzione (pannello "⏱️ Performance")
+perf = perf_metrics.start_run()
+
+with perf.stage('icona', cache='hit'):
+    page_icon = load_page_icon()
+
 # Configurazione pagina per mobile
 st.set_page_config(
     page_title="Predizioni Calcio",
-    page_icon="⚽",
+    page_icon=page_icon,
     layout="wide",
     initial_sidebar_state="expanded"
 )
@@ -168,12 +222,86 @@ st.markdown("""
         border: 1px solid #fcd34d;
     }
     
+    .match-row {
+        display: flex;
+        justify-content: space-between;
+        align-items: flex-start;
+        gap: 1rem;
+    }
+    
+    .match-info {
+        flex: 3;
+        line-height: 1.8;
+    }
+    
+    .match-status {
+        flex: 1;
+    }
+    
+    .prediction-grid {
+        display: grid;
+        grid-template-columns: repeat(3, 1fr);
+        gap: 1rem;
+        margin: 0.5rem 0;
+    }
+    
+    .prob-box {
+        text-align: center;
+        padding: 15px;
+        border-radius: 10px;
+        border: 2px solid;
+    }
+    
+    .prob-label {
+        font-size: 0.85rem;
+        color: #64748b;
+        margin-bottom: 5px;
+    }
+    
+    .prob-value {
+        font-size: 1.8rem;
+        font-weight: 700;
+    }
+    
+    .prob-home {
+        background: #f0f9ff;
+        border-color: #3b82f6;
+        color: #3b82f6;
+    }
+    
+    .prob-draw {
+        background: #fffbeb;
+        border-color: #f59e0b;
+        color: #f59e0b;
+    }
+    
+    .prob-away {
+        background: #f0fdf4;
+        border-color: #10b981;
+        color: #10b981;
+    }
+    
+    .match-divider {
+        height: 2px;
+        background: linear-gradient(90deg, transparent, #e2e8f0, transparent);
+        margin: 2rem 0;
+    }
+    
     @media (max-width: 768px) {
         .main .block-container {
             padding-left: 1rem;
             padding-right: 1rem;
         }
         
+        .match-row {
+            flex-direction: column;
+            gap: 0.5rem;
+        }
+        
+        .prediction-grid {
+            grid-template-columns: 1fr;
+        }
+        
         .stTabs [data-baseweb="tab-list"] {
         gap: 12px;
         background-color: #f8fafc;
@@ -208,69 +336,30 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-import re
-from urllib.parse import urlparse, parse_qs, unquote
-
-def parse_sheet_url(url: str):
-    """
-    Estrae automaticamente sheet_id e gid da un Google Sheets URL.
-    Restituisce (sheet_id, gid_or_None).
-    """
-    url = (url or "").strip()
-    parsed = urlparse(url)
-
-    # 1) Prova ad ottenere l'id dal percorso /d/<id>/
-    m = re.search(r'/d/([a-zA-Z0-9-_]+)', parsed.path)
-    if m:
-        sheet_id = m.group(1)
-    else:
-        # 2) Prova a trovare id nella query (es. ?id=<id>)
-        qs = parse_qs(parsed.query)
-        id_list = qs.get('id') or qs.get('spreadsheetId')
-        if id_list:
-            sheet_id = id_list[0]
-        else:
-            # 3) Cerca nell'fragment
-            frag = unquote(parsed.fragment or "")
-            m2 = re.search(r'id=([a-zA-Z0-9-_]+)', frag)
-            if m2:
-                sheet_id = m2.group(1)
-            else:
-                raise ValueError("Impossibile trovare lo sheet id nell'URL fornito.")
-
-    # Estrai il gid (può essere in query o nel fragment)
-    qs = parse_qs(parsed.query)
-    gid = None
-    if 'gid' in qs:
-        gid = qs['gid'][0]
-    else:
-        frag = unquote(parsed.fragment or "")
-        m_gid = re.search(r'gid=(\d+)', frag)
-        if m_gid:
-            gid = m_gid.group(1)
-        else:
-            m_gid2 = re.search(r'gid[:=](\d+)', frag)
-            if m_gid2:
-                gid = m_gid2.group(1)
-
-    return sheet_id, gid
-
-def make_csv_export_url(sheet_id: str, gid: str | None = None) -> str:
+@st.cache_resource
+def get_refresher(csv_urls: tuple, labels: tuple):
     """
-    Costruisce l'URL di esportazione CSV per Google Sheets.
+    Un solo refresher per processo e per insieme di fogli, condiviso da tutte
+    le sessioni: SheetRefresher per un foglio, MultiSheetRefresher (download
+    paralleli e dataset unito) per più fogli. All'avvio riparte dall'ultimo
+    snapshot salvato su disco, se presente. Gli snapshot in CACHE_DIR sono
+    condivisi con le altre repliche: il foglio viene scaricato da una sola di
+    esse per intervallo e le altre caricano il suo snapshot.
     """
-    if gid:
-        return f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv&gid={gid}"
-    else:
-        return f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv"
+    return create_refresher(list(zip(labels, csv_urls)), snapshot_dir=CACHE_DIR, refresh_interval=REFRESH_INTERVAL)
 
 
-@st.cache_data(ttl=300)  # Cache per 5 minuti
+# cache_resource: un solo DataFrame per processo, condiviso senza copie da
+# tutte le sessioni e i rerun (cache_data ne deserializzerebbe una copia a
+# ogni chiamata). Il dataset è immutabile: i filtri ne producono slice e
+# il refresher lo sostituisce in blocco, svuotando questa cache
+@st.cache_resource
 def load_data():
     """
-    Carica i dati dal Google Sheets convertendo l'URL in formato CSV.
+    Carica i dati dal Google Sheets (uno o più fogli) convertendo l'URL in formato CSV.
     Ora rileva automaticamente sheet_id e gid dall'URL.
     """
+    perf_metrics.annotate(cache='miss')
 
     import os
     google_sheets_url = os.getenv('GOOGLE_SHEETS_URL', 'https://esempio-fallback.com')
@@ -282,35 +371,27 @@ def load_data():
         st.stop()
     
     try:
-        # Estrae lo sheet_id e il gid dall'URL
-        sheet_id, gid = parse_sheet_url(google_sheets_url)
-        
-        # Costruisce l'URL CSV
-        csv_url = make_csv_export_url(sheet_id, gid)
+        # Estrae sheet_id e gid di ogni foglio indicato e costruisce gli URL CSV
+        sources = parse_sheet_sources(google_sheets_url)
+        labels = tuple(label for label, _ in sources)
+        csv_urls = tuple(csv_url for _, csv_url in sources)
         
-        # Legge i dati dal CSV
-        df = pd.read_csv(csv_url)
+        # Legge i dati dal CSV: download condizionale (in parallelo se i fogli
+        # sono più di uno), riuso del DataFrame se il contenuto non è cambiato
+        # e parsing della sola coda se sono state aggiunte righe
+        refresher = get_refresher(csv_urls, labels)
         
-        # Pulizia e preprocessing dei dati
-        df.columns = df.columns.str.strip()
+        # Il thread del refresher scarica il foglio ogni REFRESH_INTERVAL
+        # secondi (o adotta lo snapshot scaricato da un'altra replica) e
+        # svuota questa cache solo se il dataset è cambiato: le sessioni
+        # ricevono sempre l'ultimo dataset valido (anche lo snapshot locale
+        # all'avvio) e attendono il download solo se non c'è nulla
+        refresher.start_background(REFRESH_INTERVAL, on_change=load_data.clear)
+        if refresher.df is not None:
+            perf_metrics.annotate(mode=refresher.last_mode)
+            return refresher.df
         
-        # Converte le date in formato corretto se necessario
-        if 'Data predizione' in df.columns:
-            df['Data predizione'] = pd.to_datetime(df['Data predizione'], format='%d/%m/%Y', errors='coerce')
-        if 'Data partita' in df.columns:
-            df['Data partita'] = pd.to_datetime(df['Data partita'], format='%d/%m/%Y', errors='coerce')
-        
-        # Rimuove righe completamente vuote
-        df = df.dropna(how='all')
-        
-        # Sostituisce NaN con stringhe vuote per alcune colonne
-        text_columns = ['Risultato secco reale', 'Risultato predizione (risultato secco)', 
-                       'Risultato predizione (doppia chance)']
-        for col in text_columns:
-            if col in df.columns:
-                df[col] = df[col].fillna('Da giocare')
-                
-        return df
+        return refresher.refresh()
         
     except Exception as e:
         st.error(f"❌ Errore nel caricamento dei dati: {str(e)}")
@@ -331,10 +412,139 @@ def load_data():
             'Campionato': ['Premier League'] * 5,
             'Data partita': pd.to_datetime(['23/8/2025', '23/8/2025', '24/8/2025', '24/8/2025', '25/8/2025'], format='%d/%m/%Y')
         }
-        return pd.DataFrame(data)
+        return apply_schema(pd.DataFrame(data))
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def get_filter_index(version: str, _df: pd.DataFrame):
+    """
+    Indice dei filtri condiviso tra le sessioni, uno per versione del dataset.
+    """
+    perf_metrics.annotate(cache='miss')
+    return FilterIndex(_df)
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def get_matchday_index(version: str, _df: pd.DataFrame):
+    """
+    Read model per campionato e giornata condiviso tra le sessioni, uno per versione del dataset.
+    """
+    perf_metrics.annotate(cache='miss')
+    return MatchdayIndex(_df)
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def get_team_index(version: str, _df: pd.DataFrame):
+    """
+    Read model per squadra (presenze, riepiloghi, scontri diretti) condiviso tra le sessioni, uno per versione.
+    """
+    perf_metrics.annotate(cache='miss')
+    return TeamIndex(_df)
+
+
+# Opzioni di paginazione delle liste di partite
+PAGE_SIZES = [10, 25, 50, 100]
+
+# Serie disponibili nel grafico del trend di accuratezza
+TREND_MODES = ["Settimanale", "Cumulativa", "Ultime N partite", "Ultimi K giorni"]
+
+
+def jump_to_date(match_dates: pd.Series, page_size: int, key: str):
+    """
+    Callback del selettore "Vai alla data": porta la lista alla pagina
+    che contiene la data scelta.
+    """
+    st.session_state[f'{key}_page'] = page_for_date(match_dates, st.session_state[f'{key}_jump_date'], page_size)
+
+
+def pagination_controls(matches: pd.DataFrame, key: str):
+    """
+    Selettori di paginazione (partite per pagina, pagina, vai alla data) per
+    una lista di partite ordinata per data. Restituisce le righe della pagina
+    corrente.
+    """
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        page_size = st.selectbox("Partite per pagina:", PAGE_SIZES, index=1, key=f'{key}_page_size')
+    
+    n_pages = page_count(len(matches), page_size)
+    if st.session_state.get(f'{key}_page', 1) > n_pages:
+        st.session_state[f'{key}_page'] = n_pages
+    
+    with col3:
+        match_dates = matches['Data partita'].dropna()
+        if len(match_dates) > 0:
+            st.date_input(
+                "Vai alla data:",
+                value=match_dates.iloc[0].date(),
+                min_value=match_dates.iloc[0].date(),
+                max_value=match_dates.iloc[-1].date(),
+                key=f'{key}_jump_date',
+                on_change=jump_to_date,
+                args=(matches['Data partita'], page_size, key),
+                help="Mostra la pagina con le partite da questa data in poi"
+            )
+    
+    with col2:
+        page = st.number_input("Pagina:", min_value=1, max_value=n_pages, step=1, key=f'{key}_page')
+    
+    page_matches = page_slice(matches, page, page_size)
+    first_row = (page - 1) * page_size + 1
+    st.caption(f"Partite {first_row}–{first_row + len(page_matches) - 1} di {len(matches)}")
+    return page_matches
+
+
+def remember_tab(labels: list, key: str):
+    """
+    Callback delle schede: salva l'indice della scheda selezionata, così
+    resta attiva anche quando cambia la sua etichetta (ad esempio il
+    conteggio delle partite da giocare).
+    """
+    st.session_state[f'{key}_index'] = labels.index(st.session_state[key])
+
+
+def view_tabs(labels: list, key: str = 'active_tab'):
+    """
+    st.tabs con la scheda attiva tracciata: cambiare scheda provoca un rerun
+    e tab_open() è vero solo per la scheda selezionata, quindi le altre non
+    eseguono aggregazioni, grafici e render. Senza LAZY_TABS, o con versioni
+    di Streamlit senza schede con stato, tutte le schede vengono eseguite.
+    """
+    if not LAZY_TABS or 'on_change' not in inspect.signature(st.tabs).parameters:
+        return st.tabs(labels)
+    index = min(st.session_state.get(f'{key}_index', 0), len(labels) - 1)
+    return st.tabs(labels, default=labels[index], key=key, on_change=remember_tab, args=(labels, key))
+
+
+def format_percent(value) -> str:
+    """
+    Percentuale con un decimale, 'N/D' se manca (nessuna partita conclusa).
+    """
+    return 'N/D' if pd.isna(value) else f"{value:.1f}%"
+
+
+def format_streak(streak: int) -> str:
+    """
+    Serie in corso: predizioni consecutive corrette (positiva) o errate (negativa).
+    """
+    if streak > 0:
+        return f"{streak} corrett{'a' if streak == 1 else 'e'}"
+    if streak < 0:
+        return f"{-streak} errat{'a' if streak == -1 else 'e'}"
+    return 'N/D'
+
+
+def tab_open(tab) -> bool:
+    """
+    True se la scheda è quella selezionata o se le schede non tracciano la selezione.
+    """
+    return getattr(tab, 'open', None) is not False
+
 
 # Caricamento dati
-df = load_data()
+with perf.stage('load_data', cache='hit') as load_stage:
+    df = load_data()
+    load_stage['rows'] = len(df)
 
 # Debug info (mostra solo in sviluppo)
 if st.sidebar.button("🔧 Debug Info"):
@@ -389,10 +599,14 @@ st.markdown("""
 # Filtri nella sidebar
 st.sidebar.markdown("## 📅 Filtri")
 
+# Indice dei filtri: costruito una volta per versione del dataset
+with perf.stage('indice filtri', cache='hit'):
+    filter_index = get_filter_index(dataset_version(df), df)
+
 # Data minima e massima disponibili
-if 'Data partita' in df.columns and not df['Data partita'].isna().all():
-    min_date = df['Data partita'].min().date()
-    max_date = df['Data partita'].max().date()
+if filter_index.min_day is not None:
+    min_date = from_day_ordinal(filter_index.min_day)
+    max_date = from_day_ordinal(filter_index.max_day)
 else:
     min_date = datetime.now().date()
     max_date = datetime.now().date() + timedelta(days=30)
@@ -416,7 +630,7 @@ only_selected_date = st.sidebar.checkbox(
 show_all = st.sidebar.checkbox("Mostra tutte le date", value=False, help="Ignora il filtro data e mostra tutte le partite")
 
 # Filtro campionato
-available_leagues = ['Tutti'] + sorted(df['Campionato'].dropna().unique().tolist())
+available_leagues = ['Tutti'] + sorted(filter_index.leagues)
 selected_league = st.sidebar.selectbox(
     "Campionato:",
     options=available_leagues,
@@ -424,29 +638,51 @@ selected_league = st.sidebar.selectbox(
     help="Filtra per campionato specifico"
 )
 
-# Applica filtri data e campionato
-df_base = df.copy()
-
-# Filtro campionato
-if selected_league != 'Tutti':
-    df_base = df_base[df_base['Campionato'] == selected_league]
+# Filtro giornata: disponibile per un singolo campionato, sostituisce il filtro data
+selected_matchday = None
+if selected_league != 'Tutti' and 'Giornata' in df.columns:
+    with perf.stage('indice giornate', cache='hit'):
+        matchday_index = get_matchday_index(dataset_version(df), df)
+    league_matchdays = matchday_index.matchdays(selected_league)
+    if league_matchdays:
+        matchday_choice = st.sidebar.selectbox(
+            "Giornata:",
+            options=['Tutte'] + league_matchdays,
+            index=0,
+            help="Mostra solo le partite di questa giornata (ignora il filtro data)"
+        )
+        if matchday_choice != 'Tutte':
+            selected_matchday = matchday_choice
 
-# Filtro data
-if not show_all and 'Data partita' in df_base.columns:
+# Applica filtri data e campionato: le viste derivate (filtrate, concluse,
+# da giocare e KPI) sono calcolate una volta per combinazione di filtri e
+# condivise tra schede e sessioni
+if selected_matchday is not None:
+    filter_info = f"della giornata {selected_matchday}"
+    with perf.stage('filtri', cache='hit'):
+        views = get_matchday_views(matchday_index, dataset_version(df), selected_league, selected_matchday)
+    df_filtered = views.filtered
+elif not show_all and 'Data partita' in df.columns:
     if only_selected_date:
         # Mostra solo partite della data selezionata
-        df_filtered = df_base[df_base['Data partita'].dt.date == selected_date].copy()
+        date_mode = 'solo'
         filter_info = f"del {selected_date.strftime('%d/%m/%Y')}"
     else:
         # Mostra partite dalla data selezionata in poi
-        df_filtered = df_base[df_base['Data partita'].dt.date >= selected_date].copy()
+        date_mode = 'da'
         filter_info = f"dal {selected_date.strftime('%d/%m/%Y')} in poi"
     
+    with perf.stage('filtri', cache='hit'):
+        views = get_derived_views(filter_index, dataset_version(df), selected_league, date_mode, selected_date)
+    df_filtered = views.filtered
+    
     if len(df_filtered) == 0:
         st.warning(f"⚠️ Nessuna partita trovata {filter_info}" + (f" per {selected_league}" if selected_league != 'Tutti' else ""))
         st.info("💡 Prova a selezionare una data diversa, un altro campionato o attiva 'Mostra tutte le date'")
 else:
-    df_filtered = df_base.copy()
+    with perf.stage('filtri', cache='hit'):
+        views = get_derived_views(filter_index, dataset_version(df), selected_league)
+    df_filtered = views.filtered
     filter_info = "tutte le date"
 
 # Info filtro applicato
@@ -462,981 +698,894 @@ st.markdown("""
 
 # Tabs principali
 # Calcola il numero di partite da giocare per il badge
-upcoming_count = len(df_filtered[
-    (df_filtered['Risultato predizione (risultato secco)'] == 'Da giocare') |
-    (df_filtered['Risultato predizione (doppia chance)'] == 'Da giocare')
-])
-
-tab1, tab2, tab3, tab4 = st.tabs(["📊 Statistiche", "📋 Storico Predizioni", f"🔴 Predizioni Future ({upcoming_count})", "🤖 Come Funzionano Le Predizioni"])
-
-with tab1:
-    # Genera il testo dinamico basato sui filtri applicati
-    if show_all:
-        title_date_info = ""
-    elif only_selected_date:
-        title_date_info = f" del {selected_date.strftime('%d/%m/%Y')}"
-    else:
-        title_date_info = f" dal {selected_date.strftime('%d/%m/%Y')}"
+upcoming_count = views.upcoming_count
 
-    st.markdown(f"## 📊 Statistiche Generali{title_date_info}")
-    
-    # Usa df_filtered per rispettare i filtri data e campionato
-    completed_filtered = df_filtered[
-        (df_filtered['Risultato predizione (risultato secco)'] != 'Da giocare') &
-        (df_filtered['Risultato predizione (doppia chance)'] != 'Da giocare')
-    ]
-    
-    if len(completed_filtered) > 0:
-        # KPI principali - 2 righe con 3 colonne ciascuna
-        st.markdown("### 📈 Metriche Principali")
-        
-        # Prima riga - Risultato Secco
-        col1, col2, col3 = st.columns(3)
+# Solo la scheda selezionata viene eseguita (vedi view_tabs)
+tab1, tab2, tab3, tab4, tab5 = view_tabs(["📊 Statistiche", "📋 Storico Predizioni", f"🔴 Predizioni Future ({upcoming_count})", "👥 Squadre", "🤖 Come Funzionano Le Predizioni"])
+
+if tab_open(tab1):
+    with tab1, perf.stage('scheda Statistiche'):
+        # Genera il testo dinamico basato sui filtri applicati
+        if selected_matchday is not None:
+            title_date_info = f" - Giornata {selected_matchday}"
+        elif show_all:
+            title_date_info = ""
+        elif only_selected_date:
+            title_date_info = f" del {selected_date.strftime('%d/%m/%Y')}"
+        else:
+            title_date_info = f" dal {selected_date.strftime('%d/%m/%Y')}"
+
+        st.markdown(f"## 📊 Statistiche Generali{title_date_info}")
         
-        total_matches = len(completed_filtered)
-        correct_exact = len(completed_filtered[completed_filtered['Risultato predizione (risultato secco)'] == 'Corretto'])
-        accuracy_exact = (correct_exact / total_matches) * 100
-        wrong_exact = total_matches - correct_exact
+        # Usa le viste filtrate per rispettare i filtri data e campionato
+        completed_filtered = views.completed
         
-        with col1:
-            st.markdown(f"""
-            <div style="
-                background: white;
-                padding: 25px 20px;
-                border-radius: 16px;
-                box-shadow: 0 4px 20px rgba(0,0,0,0.08);
-                border-top: 4px solid #667eea;
-                text-align: center;
-                transition: transform 0.2s, box-shadow 0.2s;
-            " onmouseover="this.style.transform='translateY(-5px)'; this.style.boxShadow='0 8px 30px rgba(102,126,234,0.15)';" 
-               onmouseout="this.style.transform='translateY(0)'; this.style.boxShadow='0 4px 20px rgba(0,0,0,0.08)';">
+        if len(completed_filtered) > 0:
+            # Tutte le aggregazioni da un'unica matrice degli esiti
+            stats = views.stats
+            
+            # KPI principali - 2 righe con 3 colonne ciascuna
+            st.markdown("### 📈 Metriche Principali")
+            
+            # Prima riga - Risultato Secco
+            col1, col2, col3 = st.columns(3)
+            
+            total_matches = stats['Totale']
+            correct_exact = stats['Corrette Secco']
+            accuracy_exact = (correct_exact / total_matches) * 100
+            wrong_exact = total_matches - correct_exact
+            
+            with col1:
+                st.markdown(f"""
                 <div style="
-                    color: #64748b;
-                    font-size: 0.85rem;
-                    font-weight: 600;
-                    text-transform: uppercase;
-                    letter-spacing: 0.5px;
-                    margin-bottom: 8px;
-                ">
-                    🎯 Risultato Secco
+                    background: white;
+                    padding: 25px 20px;
+                    border-radius: 16px;
+                    box-shadow: 0 4px 20px rgba(0,0,0,0.08);
+                    border-top: 4px solid #667eea;
+                    text-align: center;
+                    transition: transform 0.2s, box-shadow 0.2s;
+                " onmouseover="this.style.transform='translateY(-5px)'; this.style.boxShadow='0 8px 30px rgba(102,126,234,0.15)';" 
+                   onmouseout="this.style.transform='translateY(0)'; this.style.boxShadow='0 4px 20px rgba(0,0,0,0.08)';">
+                    <div style="
+                        color: #64748b;
+                        font-size: 0.85rem;
+                        font-weight: 600;
+                        text-transform: uppercase;
+                        letter-spacing: 0.5px;
+                        margin-bottom: 8px;
+                    ">
+                        🎯 Risultato Secco
+                    </div>
+                    <div style="
+                        color: #667eea;
+                        font-size: 2.8rem;
+                        font-weight: 700;
+                        margin: 10px 0;
+                        line-height: 1;
+                    ">
+                        {accuracy_exact:.1f}%
+                    </div>
+                    <div style="
+                        color: #94a3b8;
+                        font-size: 0.9rem;
+                        font-weight: 500;
+                    ">
+                        Accuratezza
+                    </div>
                 </div>
+                """, unsafe_allow_html=True)
+                    
+            with col2:
+                st.markdown(f"""
                 <div style="
-                    color: #667eea;
-                    font-size: 2.8rem;
-                    font-weight: 700;
-                    margin: 10px 0;
-                    line-height: 1;
-                ">
-                    {accuracy_exact:.1f}%
+                    background: white;
+                    padding: 25px 20px;
+                    border-radius: 16px;
+                    box-shadow: 0 4px 20px rgba(0,0,0,0.08);
+                    border-top: 4px solid #10b981;
+                    text-align: center;
+                    transition: transform 0.2s, box-shadow 0.2s;
+                " onmouseover="this.style.transform='translateY(-5px)'; this.style.boxShadow='0 8px 30px rgba(16,185,129,0.15)';" 
+                   onmouseout="this.style.transform='translateY(0)'; this.style.boxShadow='0 4px 20px rgba(0,0,0,0.08)';">
+                    <div style="
+                        color: #64748b;
+                        font-size: 0.85rem;
+                        font-weight: 600;
+                        text-transform: uppercase;
+                        letter-spacing: 0.5px;
+                        margin-bottom: 8px;
+                    ">
+                        ✅ Corrette
+                    </div>
+                    <div style="
+                        color: #10b981;
+                        font-size: 2.8rem;
+                        font-weight: 700;
+                        margin: 10px 0;
+                        line-height: 1;
+                    ">
+                        {correct_exact}
+                    </div>
+                    <div style="
+                        color: #94a3b8;
+                        font-size: 0.9rem;
+                        font-weight: 500;
+                    ">
+                        predizioni
+                    </div>
                 </div>
+                """, unsafe_allow_html=True)
+            
+            with col3:
+                st.markdown(f"""
                 <div style="
-                    color: #94a3b8;
-                    font-size: 0.9rem;
-                    font-weight: 500;
-                ">
-                    Accuratezza
+                    background: white;
+                    padding: 25px 20px;
+                    border-radius: 16px;
+                    box-shadow: 0 4px 20px rgba(0,0,0,0.08);
+                    border-top: 4px solid #ef4444;
+                    text-align: center;
+                    transition: transform 0.2s, box-shadow 0.2s;
+                " onmouseover="this.style.transform='translateY(-5px)'; this.style.boxShadow='0 8px 30px rgba(239,68,68,0.15)';" 
+                   onmouseout="this.style.transform='translateY(0)'; this.style.boxShadow='0 4px 20px rgba(0,0,0,0.08)';">
+                    <div style="
+                        color: #64748b;
+                        font-size: 0.85rem;
+                        font-weight: 600;
+                        text-transform: uppercase;
+                        letter-spacing: 0.5px;
+                        margin-bottom: 8px;
+                    ">
+                        ❌ Errate
+                    </div>
+                    <div style="
+                        color: #ef4444;
+                        font-size: 2.8rem;
+                        font-weight: 700;
+                        margin: 10px 0;
+                        line-height: 1;
+                    ">
+                        {wrong_exact}
+                    </div>
+                    <div style="
+                        color: #94a3b8;
+                        font-size: 0.9rem;
+                        font-weight: 500;
+                    ">
+                        predizioni
+                    </div>
                 </div>
-            </div>
-            """, unsafe_allow_html=True)
-                
-        with col2:
-            st.markdown(f"""
-            <div style="
-                background: white;
-                padding: 25px 20px;
-                border-radius: 16px;
-                box-shadow: 0 4px 20px rgba(0,0,0,0.08);
-                border-top: 4px solid #10b981;
-                text-align: center;
-                transition: transform 0.2s, box-shadow 0.2s;
-            " onmouseover="this.style.transform='translateY(-5px)'; this.style.boxShadow='0 8px 30px rgba(16,185,129,0.15)';" 
-               onmouseout="this.style.transform='translateY(0)'; this.style.boxShadow='0 4px 20px rgba(0,0,0,0.08)';">
+                """, unsafe_allow_html=True)
+            
+            # Seconda riga - Doppia Chance
+            col1, col2, col3 = st.columns(3)
+            
+            correct_double = stats['Corrette Doppia']
+            accuracy_double = (correct_double / total_matches) * 100 if total_matches > 0 else 0
+            wrong_double = total_matches - correct_double
+            
+            with col1:
+                st.markdown(f"""
                 <div style="
-                    color: #64748b;
-                    font-size: 0.85rem;
-                    font-weight: 600;
-                    text-transform: uppercase;
-                    letter-spacing: 0.5px;
-                    margin-bottom: 8px;
-                ">
-                    ✅ Corrette
+                    background: white;
+                    padding: 25px 20px;
+                    border-radius: 16px;
+                    box-shadow: 0 4px 20px rgba(0,0,0,0.08);
+                    border-top: 4px solid #3b82f6;
+                    text-align: center;
+                    transition: transform 0.2s, box-shadow 0.2s;
+                " onmouseover="this.style.transform='translateY(-5px)'; this.style.boxShadow='0 8px 30px rgba(59,130,246,0.15)';" 
+                   onmouseout="this.style.transform='translateY(0)'; this.style.boxShadow='0 4px 20px rgba(0,0,0,0.08)';">
+                    <div style="
+                        color: #64748b;
+                        font-size: 0.85rem;
+                        font-weight: 600;
+                        text-transform: uppercase;
+                        letter-spacing: 0.5px;
+                        margin-bottom: 8px;
+                    ">
+                        🎲 Doppia Chance
+                    </div>
+                    <div style="
+                        color: #3b82f6;
+                        font-size: 2.8rem;
+                        font-weight: 700;
+                        margin: 10px 0;
+                        line-height: 1;
+                    ">
+                        {accuracy_double:.1f}%
+                    </div>
+                    <div style="
+                        color: #94a3b8;
+                        font-size: 0.9rem;
+                        font-weight: 500;
+                    ">
+                        Accuratezza
+                    </div>
                 </div>
+                """, unsafe_allow_html=True)
+            
+            with col2:
+                st.markdown(f"""
                 <div style="
-                    color: #10b981;
-                    font-size: 2.8rem;
-                    font-weight: 700;
-                    margin: 10px 0;
-                    line-height: 1;
-                ">
-                    {correct_exact}
+                    background: white;
+                    padding: 25px 20px;
+                    border-radius: 16px;
+                    box-shadow: 0 4px 20px rgba(0,0,0,0.08);
+                    border-top: 4px solid #10b981;
+                    text-align: center;
+                    transition: transform 0.2s, box-shadow 0.2s;
+                " onmouseover="this.style.transform='translateY(-5px)'; this.style.boxShadow='0 8px 30px rgba(16,185,129,0.15)';" 
+                   onmouseout="this.style.transform='translateY(0)'; this.style.boxShadow='0 4px 20px rgba(0,0,0,0.08)';">
+                    <div style="
+                        color: #64748b;
+                        font-size: 0.85rem;
+                        font-weight: 600;
+                        text-transform: uppercase;
+                        letter-spacing: 0.5px;
+                        margin-bottom: 8px;
+                    ">
+                        ✅ Corrette
+                    </div>
+                    <div style="
+                        color: #10b981;
+                        font-size: 2.8rem;
+                        font-weight: 700;
+                        margin: 10px 0;
+                        line-height: 1;
+                    ">
+                        {correct_double}
+                    </div>
+                    <div style="
+                        color: #94a3b8;
+                        font-size: 0.9rem;
+                        font-weight: 500;
+                    ">
+                        predizioni
+                    </div>
                 </div>
+                """, unsafe_allow_html=True)
+            
+            with col3:
+                st.markdown(f"""
                 <div style="
-                    color: #94a3b8;
-                    font-size: 0.9rem;
-                    font-weight: 500;
-                ">
-                    predizioni
+                    background: white;
+                    padding: 25px 20px;
+                    border-radius: 16px;
+                    box-shadow: 0 4px 20px rgba(0,0,0,0.08);
+                    border-top: 4px solid #ef4444;
+                    text-align: center;
+                    transition: transform 0.2s, box-shadow 0.2s;
+                " onmouseover="this.style.transform='translateY(-5px)'; this.style.boxShadow='0 8px 30px rgba(239,68,68,0.15)';" 
+                   onmouseout="this.style.transform='translateY(0)'; this.style.boxShadow='0 4px 20px rgba(0,0,0,0.08)';">
+                    <div style="
+                        color: #64748b;
+                        font-size: 0.85rem;
+                        font-weight: 600;
+                        text-transform: uppercase;
+                        letter-spacing: 0.5px;
+                        margin-bottom: 8px;
+                    ">
+                        ❌ Errate
+                    </div>
+                    <div style="
+                        color: #ef4444;
+                        font-size: 2.8rem;
+                        font-weight: 700;
+                        margin: 10px 0;
+                        line-height: 1;
+                    ">
+                        {wrong_double}
+                    </div>
+                    <div style="
+                        color: #94a3b8;
+                        font-size: 0.9rem;
+                        font-weight: 500;
+                    ">
+                        predizioni
+                    </div>
                 </div>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        with col3:
-            st.markdown(f"""
+                """, unsafe_allow_html=True)
+            
+            st.markdown("""
             <div style="
-                background: white;
-                padding: 25px 20px;
-                border-radius: 16px;
-                box-shadow: 0 4px 20px rgba(0,0,0,0.08);
-                border-top: 4px solid #ef4444;
-                text-align: center;
-                transition: transform 0.2s, box-shadow 0.2s;
-            " onmouseover="this.style.transform='translateY(-5px)'; this.style.boxShadow='0 8px 30px rgba(239,68,68,0.15)';" 
-               onmouseout="this.style.transform='translateY(0)'; this.style.boxShadow='0 4px 20px rgba(0,0,0,0.08)';">
-                <div style="
-                    color: #64748b;
-                    font-size: 0.85rem;
-                    font-weight: 600;
-                    text-transform: uppercase;
-                    letter-spacing: 0.5px;
-                    margin-bottom: 8px;
-                ">
-                    ❌ Errate
-                </div>
-                <div style="
-                    color: #ef4444;
-                    font-size: 2.8rem;
-                    font-weight: 700;
-                    margin: 10px 0;
-                    line-height: 1;
-                ">
-                    {wrong_exact}
-                </div>
-                <div style="
-                    color: #94a3b8;
-                    font-size: 0.9rem;
-                    font-weight: 500;
-                ">
-                    predizioni
-                </div>
-            </div>
+                height: 2px;
+                background: linear-gradient(90deg, transparent, #e2e8f0, transparent);
+                margin: 2rem 0;
+            "></div>
             """, unsafe_allow_html=True)
-        
-        # Seconda riga - Doppia Chance
-        col1, col2, col3 = st.columns(3)
-        
-        correct_double = len(completed_filtered[completed_filtered['Risultato predizione (doppia chance)'] == 'Corretto'])
-        accuracy_double = (correct_double / total_matches) * 100 if total_matches > 0 else 0
-        wrong_double = total_matches - correct_double
-        
-        with col1:
-            st.markdown(f"""
+            
+            # Statistiche per campionato
+            st.markdown("### 🏆 Performance per Campionato")
+            
+            league_stats = stats['Campionato'].round(1).rename(columns={'Totale': 'Totale Partite'})
+            league_stats = league_stats.sort_values('Accuratezza Secco %', ascending=False)
+            
+            st.dataframe(league_stats, use_container_width=True)
+            
+            # Riepilogo per giornata dal read model (già calcolato per versione del dataset)
+            if selected_league != 'Tutti' and 'Giornata' in df.columns:
+                st.markdown(f"### 📅 Giornate - {selected_league}")
+                
+                if selected_matchday is not None:
+                    matchday_summary = matchday_index.matchday_summary(selected_league, selected_matchday)
+                    confidence_mix = ', '.join(f"{col.removeprefix('Confidence ')} {matchday_summary[col]}"
+                                               for col in matchday_summary if col.startswith('Confidence '))
+                    st.caption(f"Giornata {selected_matchday}: {matchday_summary['Partite']} partite "
+                               f"({matchday_summary['Concluse']} concluse, {matchday_summary['Da giocare']} da giocare)"
+                               f" · Confidence: {confidence_mix}")
+                
+                # Giornate più recenti in alto
+                matchday_table = matchday_index.league_summary(selected_league).iloc[::-1].round(
+                    {'Accuratezza Secco %': 1, 'Accuratezza Doppia %': 1})
+                st.dataframe(matchday_table, use_container_width=True)
+            
+            st.markdown("""
             <div style="
-                background: white;
-                padding: 25px 20px;
-                border-radius: 16px;
-                box-shadow: 0 4px 20px rgba(0,0,0,0.08);
-                border-top: 4px solid #3b82f6;
-                text-align: center;
-                transition: transform 0.2s, box-shadow 0.2s;
-            " onmouseover="this.style.transform='translateY(-5px)'; this.style.boxShadow='0 8px 30px rgba(59,130,246,0.15)';" 
-               onmouseout="this.style.transform='translateY(0)'; this.style.boxShadow='0 4px 20px rgba(0,0,0,0.08)';">
-                <div style="
-                    color: #64748b;
-                    font-size: 0.85rem;
-                    font-weight: 600;
-                    text-transform: uppercase;
-                    letter-spacing: 0.5px;
-                    margin-bottom: 8px;
-                ">
-                    🎲 Doppia Chance
-                </div>
-                <div style="
-                    color: #3b82f6;
-                    font-size: 2.8rem;
-                    font-weight: 700;
-                    margin: 10px 0;
-                    line-height: 1;
-                ">
-                    {accuracy_double:.1f}%
-                </div>
-                <div style="
-                    color: #94a3b8;
-                    font-size: 0.9rem;
-                    font-weight: 500;
-                ">
-                    Accuratezza
-                </div>
-            </div>
+                height: 2px;
+                background: linear-gradient(90deg, transparent, #e2e8f0, transparent);
+                margin: 2rem 0;
+            "></div>
             """, unsafe_allow_html=True)
-        
-        with col2:
-            st.markdown(f"""
+            
+            # Statistiche per Status Merged
+            st.markdown("### ⚖️ Performance per Tipo Sfida")
+            
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                if 'Status Merged' in completed_filtered.columns:
+                    fig = cached_figure(match_type_figure, stats['Status Merged'], outcome='Secco',
+                                        title='Accuratezza per Tipo Sfida (Risultato Secco)', color_scale='RdYlGn')
+                    st.plotly_chart(fig, use_container_width=True)
+            
+            with col2:
+                if 'Status Merged' in completed_filtered.columns:
+                    fig = cached_figure(match_type_figure, stats['Status Merged'], outcome='Doppia',
+                                        title='Accuratezza per Tipo Sfida (Doppia Chance)', color_scale='Blues')
+                    st.plotly_chart(fig, use_container_width=True)
+            
+            st.markdown("""
             <div style="
-                background: white;
-                padding: 25px 20px;
-                border-radius: 16px;
-                box-shadow: 0 4px 20px rgba(0,0,0,0.08);
-                border-top: 4px solid #10b981;
-                text-align: center;
-                transition: transform 0.2s, box-shadow 0.2s;
-            " onmouseover="this.style.transform='translateY(-5px)'; this.style.boxShadow='0 8px 30px rgba(16,185,129,0.15)';" 
-               onmouseout="this.style.transform='translateY(0)'; this.style.boxShadow='0 4px 20px rgba(0,0,0,0.08)';">
-                <div style="
-                    color: #64748b;
-                    font-size: 0.85rem;
-                    font-weight: 600;
-                    text-transform: uppercase;
-                    letter-spacing: 0.5px;
-                    margin-bottom: 8px;
-                ">
-                    ✅ Corrette
-                </div>
-                <div style="
-                    color: #10b981;
-                    font-size: 2.8rem;
-                    font-weight: 700;
-                    margin: 10px 0;
-                    line-height: 1;
-                ">
-                    {correct_double}
-                </div>
-                <div style="
-                    color: #94a3b8;
+                height: 2px;
+                background: linear-gradient(90deg, transparent, #e2e8f0, transparent);
+                margin: 2rem 0;
+            "></div>
+            """, unsafe_allow_html=True)
+
+            # Styling tabella
+            st.markdown("""
+            <style>
+                .dataframe {
                     font-size: 0.9rem;
-                    font-weight: 500;
-                ">
-                    predizioni
-                </div>
-            </div>
+                    border-radius: 12px;
+                    overflow: hidden;
+                }
+                .dataframe th {
+                    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+                    color: white;
+                    font-weight: 600;
+                    padding: 12px;
+                }
+                .dataframe td {
+                    padding: 10px;
+                    border-bottom: 1px solid #e2e8f0;
+                }
+                .dataframe tr:hover {
+                    background-color: #f8fafc;
+                }
+            </style>
             """, unsafe_allow_html=True)
-        
-        with col3:
-            st.markdown(f"""
+
+            # Grafico confidence
+            st.markdown("### 💪 Performance per Livello Confidence")
+            
+            # Livelli ordinati da Bassa ad Alta
+            fig = cached_figure(confidence_figure, stats['Confidence'], title='Accuratezza per Livello Confidence',
+                                ordered=True, decimals=1)
+            st.plotly_chart(fig, use_container_width=True)
+            
+            st.markdown("""
             <div style="
-                background: white;
-                padding: 25px 20px;
-                border-radius: 16px;
-                box-shadow: 0 4px 20px rgba(0,0,0,0.08);
-                border-top: 4px solid #ef4444;
-                text-align: center;
-                transition: transform 0.2s, box-shadow 0.2s;
-            " onmouseover="this.style.transform='translateY(-5px)'; this.style.boxShadow='0 8px 30px rgba(239,68,68,0.15)';" 
-               onmouseout="this.style.transform='translateY(0)'; this.style.boxShadow='0 4px 20px rgba(0,0,0,0.08)';">
-                <div style="
-                    color: #64748b;
-                    font-size: 0.85rem;
-                    font-weight: 600;
-                    text-transform: uppercase;
-                    letter-spacing: 0.5px;
-                    margin-bottom: 8px;
-                ">
-                    ❌ Errate
-                </div>
-                <div style="
-                    color: #ef4444;
-                    font-size: 2.8rem;
-                    font-weight: 700;
-                    margin: 10px 0;
-                    line-height: 1;
-                ">
-                    {wrong_double}
-                </div>
-                <div style="
-                    color: #94a3b8;
-                    font-size: 0.9rem;
-                    font-weight: 500;
-                ">
-                    predizioni
-                </div>
-            </div>
+                height: 2px;
+                background: linear-gradient(90deg, transparent, #e2e8f0, transparent);
+                margin: 2rem 0;
+            "></div>
             """, unsafe_allow_html=True)
-        
-        st.markdown("""
-        <div style="
-            height: 2px;
-            background: linear-gradient(90deg, transparent, #e2e8f0, transparent);
-            margin: 2rem 0;
-        "></div>
-        """, unsafe_allow_html=True)
-        
-        # Statistiche per campionato
-        st.markdown("### 🏆 Performance per Campionato")
-        
-        league_stats_exact = completed_filtered.groupby('Campionato').agg({
-            'Risultato predizione (risultato secco)': [
-                ('Totale', 'count'),
-                ('Corrette Secco', lambda x: (x == 'Corretto').sum()),
-                ('Accuratezza Secco %', lambda x: (x == 'Corretto').sum() / len(x) * 100)
-            ]
-        }).round(1)
-        
-        league_stats_double = completed_filtered.groupby('Campionato').agg({
-            'Risultato predizione (doppia chance)': [
-                ('Corrette Doppia', lambda x: (x == 'Corretto').sum()),
-                ('Accuratezza Doppia %', lambda x: (x == 'Corretto').sum() / len(x) * 100)
-            ]
-        }).round(1)
-        
-        league_stats = pd.concat([league_stats_exact, league_stats_double], axis=1)
-        league_stats.columns = ['Totale Partite', 'Corrette Secco', 'Accuratezza Secco %', 'Corrette Doppia', 'Accuratezza Doppia %']
-        league_stats = league_stats.sort_values('Accuratezza Secco %', ascending=False)
-        
-        st.dataframe(league_stats, use_container_width=True)
-        
-        st.markdown("""
-        <div style="
-            height: 2px;
-            background: linear-gradient(90deg, transparent, #e2e8f0, transparent);
-            margin: 2rem 0;
-        "></div>
-        """, unsafe_allow_html=True)
-        
-        # Statistiche per Status Merged
-        st.markdown("### ⚖️ Performance per Tipo Sfida")
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            if 'Status Merged' in completed_filtered.columns:
-                status_stats_exact = completed_filtered.groupby('Status Merged').agg({
-                    'Risultato predizione (risultato secco)': [
-                        ('Accuratezza', lambda x: (x == 'Corretto').sum() / len(x) * 100),
-                        ('Totale', 'count'),
-                        ('Corrette', lambda x: (x == 'Corretto').sum())
-                    ]
-                }).round(1)
-                status_stats_exact.columns = ['Accuratezza', 'Totale', 'Corrette']
-                status_stats_exact = status_stats_exact.reset_index()
+            
+            # Trend temporale
+            st.markdown("### 📈 Trend Accuratezza nel Tempo")
+            
+            if 'Settimana' in stats:
+                # Serie dal motore incrementale (conteggi per campionato, confidence
+                # e giorno) con gli stessi filtri data e campionato delle altre viste
+                accuracy_series = get_accuracy_series(df)
+                trend_filters = {'league': selected_league}
+                if selected_matchday is not None:
+                    # Giorni della giornata selezionata
+                    matchday_summary = matchday_index.matchday_summary(selected_league, selected_matchday)
+                    if pd.notna(matchday_summary['Prima data']):
+                        trend_filters['start_day'] = to_day_ordinal(matchday_summary['Prima data'])
+                        trend_filters['end_day'] = to_day_ordinal(matchday_summary['Ultima data'])
+                elif not show_all:
+                    trend_filters['start_day'] = to_day_ordinal(selected_date)
+                    if only_selected_date:
+                        trend_filters['end_day'] = trend_filters['start_day']
                 
-                fig = px.bar(
-                    status_stats_exact,
-                    x='Status Merged',
-                    y='Accuratezza',
-                    title='Accuratezza per Tipo Sfida (Risultato Secco)',
-                    labels={'Accuratezza': 'Accuratezza %', 'Status Merged': 'Tipo Sfida'},
-                    color='Accuratezza',
-                    color_continuous_scale='RdYlGn',
-                    hover_data={
-                        'Accuratezza': ':.1f',
-                        'Totale': True,
-                        'Corrette': True
-                    }
-                )
-                fig.update_traces(
-                    hovertemplate='<b>%{x}</b><br>Accuratezza: %{y:.1f}%<br>Corrette: %{customdata[1]}<br>Totale: %{customdata[0]}<extra></extra>'
-                )
-                fig.update_layout(height=400)
-                st.plotly_chart(fig, use_container_width=True)
-        
-        with col2:
-            if 'Status Merged' in completed_filtered.columns:
-                status_stats_double = completed_filtered.groupby('Status Merged').agg({
-                    'Risultato predizione (doppia chance)': [
-                        ('Accuratezza', lambda x: (x == 'Corretto').sum() / len(x) * 100),
-                        ('Totale', 'count'),
-                        ('Corrette', lambda x: (x == 'Corretto').sum())
-                    ]
-                }).round(1)
-                status_stats_double.columns = ['Accuratezza', 'Totale', 'Corrette']
-                status_stats_double = status_stats_double.reset_index()
+                col1, col2 = st.columns([3, 1])
+                
+                with col1:
+                    trend_mode = st.radio("Serie:", TREND_MODES, horizontal=True, key='trend_mode')
+                
+                with col2:
+                    if trend_mode == "Ultime N partite":
+                        trend_window = st.number_input("Partite (N):", min_value=5, value=50, step=5, key='trend_matches')
+                    elif trend_mode == "Ultimi K giorni":
+                        trend_window = st.number_input("Giorni (K):", min_value=1, value=5, step=1, key='trend_days')
+                
+                if trend_mode == "Settimanale":
+                    trend = accuracy_series.series('settimana', **trend_filters)
+                    trend_title = 'Accuratezza Settimanale'
+                elif trend_mode == "Cumulativa":
+                    trend = accuracy_series.cumulative('settimana', **trend_filters)
+                    trend_title = 'Accuratezza Cumulata'
+                elif trend_mode == "Ultime N partite":
+                    trend = rolling_matches(completed_filtered, trend_window)
+                    trend_title = f'Accuratezza sulle Ultime {trend_window} Partite'
+                else:
+                    trend = accuracy_series.rolling(trend_window, 'giorno', **trend_filters)
+                    trend_title = f'Accuratezza negli Ultimi {trend_window} Giorni'
                 
-                fig = px.bar(
-                    status_stats_double,
-                    x='Status Merged',
-                    y='Accuratezza',
-                    title='Accuratezza per Tipo Sfida (Doppia Chance)',
-                    labels={'Accuratezza': 'Accuratezza %', 'Status Merged': 'Tipo Sfida'},
-                    color='Accuratezza',
-                    color_continuous_scale='Blues',
-                    hover_data={
-                        'Accuratezza': ':.1f',
-                        'Totale': True,
-                        'Corrette': True
-                    }
-                )
-                fig.update_traces(
-                    hovertemplate='<b>%{x}</b><br>Accuratezza: %{y:.1f}%<br>Corrette: %{customdata[1]}<br>Totale: %{customdata[0]}<extra></extra>'
-                )
-                fig.update_layout(height=400)
+                fig = cached_figure(trend_figure, trend, title=trend_title)
                 st.plotly_chart(fig, use_container_width=True)
+                st.caption("Le bande indicano l'intervallo di confidenza di Wilson al 95%.")
+            
+            st.markdown("""
+            <div style="
+                height: 2px;
+                background: linear-gradient(90deg, transparent, #e2e8f0, transparent);
+                margin: 2rem 0;
+            "></div>
+            """, unsafe_allow_html=True)
+            
+            # Calibrazione delle probabilità 1/X/2 su tutto lo storico del campionato
+            # (punteggi calcolati una volta per versione del dataset)
+            probability_scores = get_probability_scores(df)
+            score_summary = probability_scores.summary(selected_league)
+            if score_summary['Partite'] > 0:
+                st.markdown("### 🎯 Calibrazione delle Probabilità")
+                
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("Brier Score", f"{score_summary['Brier']:.3f}")
+                with col2:
+                    st.metric("Log-loss", f"{score_summary['Log-loss']:.3f}")
+                with col3:
+                    st.metric("RPS", f"{score_summary['RPS']:.3f}")
+                st.caption(f"Su {score_summary['Partite']} partite concluse: valori più bassi indicano probabilità più accurate.")
+                
+                col1, col2 = st.columns(2)
+                with col1:
+                    if selected_league == 'Tutti':
+                        st.dataframe(probability_scores.score_table('Campionato').round(3), use_container_width=True)
+                    st.dataframe(probability_scores.score_table('Confidence', selected_league).round(3),
+                                 use_container_width=True)
+                with col2:
+                    fig = cached_figure(reliability_figure, probability_scores.reliability(selected_league),
+                                        title='Affidabilità delle Probabilità')
+                    st.plotly_chart(fig, use_container_width=True)
         
-        st.markdown("""
-        <div style="
-            height: 2px;
-            background: linear-gradient(90deg, transparent, #e2e8f0, transparent);
-            margin: 2rem 0;
-        "></div>
-        """, unsafe_allow_html=True)
-
-        # Styling tabella
-        st.markdown("""
-        <style>
-            .dataframe {
-                font-size: 0.9rem;
-                border-radius: 12px;
-                overflow: hidden;
-            }
-            .dataframe th {
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                color: white;
-                font-weight: 600;
-                padding: 12px;
-            }
-            .dataframe td {
-                padding: 10px;
-                border-bottom: 1px solid #e2e8f0;
-            }
-            .dataframe tr:hover {
-                background-color: #f8fafc;
-            }
-        </style>
-        """, unsafe_allow_html=True)
-
-        # Grafico confidence
-        st.markdown("### 💪 Performance per Livello Confidence")
-        
-        confidence_stats = completed_filtered.groupby('Confidence').agg({
-            'Risultato predizione (risultato secco)': lambda x: (x == 'Corretto').sum() / len(x) * 100,
-            'Risultato predizione (doppia chance)': lambda x: (x == 'Corretto').sum() / len(x) * 100
-        }).round(1).reset_index()
-        
-        # Ordina per livello di confidence
-        confidence_order = {'Bassa': 0, 'Media': 1, 'Alta': 2}
-        confidence_stats['order'] = confidence_stats['Confidence'].map(confidence_order)
-        confidence_stats = confidence_stats.sort_values('order').drop('order', axis=1)
-        
-        fig = go.Figure()
-        fig.add_trace(go.Bar(
-            name='Risultato Secco',
-            x=confidence_stats['Confidence'],
-            y=confidence_stats['Risultato predizione (risultato secco)'],
-            marker_color='#ff6b35'
-        ))
-        fig.add_trace(go.Bar(
-            name='Doppia Chance',
-            x=confidence_stats['Confidence'],
-            y=confidence_stats['Risultato predizione (doppia chance)'],
-            marker_color='#4facfe'
-        ))
-        
-        fig.update_layout(
-            title='Accuratezza per Livello Confidence',
-            xaxis_title='Livello Confidence',
-            yaxis_title='Accuratezza (%)',
-            barmode='group',
-            height=400,
-            showlegend=True
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.info("📊 Nessun dato disponibile per generare statistiche con i filtri selezionati. Prova a modificare i filtri o attiva 'Mostra tutte le date'.")
+if tab_open(tab2):
+    with tab2, perf.stage('scheda Storico Predizioni'):
+        # Genera il testo dinamico basato sui filtri applicati
+        if selected_matchday is not None:
+            title_date_info = f" - Giornata {selected_matchday}"
+        elif show_all:
+            title_date_info = ""
+        elif only_selected_date:
+            title_date_info = f" del {selected_date.strftime('%d/%m/%Y')}"
+        else:
+            title_date_info = f" dal {selected_date.strftime('%d/%m/%Y')}"
         
-        st.markdown("""
-        <div style="
-            height: 2px;
-            background: linear-gradient(90deg, transparent, #e2e8f0, transparent);
-            margin: 2rem 0;
-        "></div>
-        """, unsafe_allow_html=True)
+        st.markdown(f"## 📈 Performance delle Predizioni{title_date_info}")
         
-        # Trend temporale
-        st.markdown("### 📈 Trend Accuratezza nel Tempo")
+        # Filtra partite terminate dal dataset filtrato per data
+        completed_matches = views.completed
         
-        if 'Data partita' in completed_filtered.columns:
-            weekly_stats = completed_filtered.copy()
-            weekly_stats['Settimana'] = pd.to_datetime(weekly_stats['Data partita']).dt.to_period('W').astype(str)
+        if len(completed_matches) > 0:
+            # Stesse aggregazioni della scheda Statistiche (già calcolate)
+            stats = views.stats
             
-            weekly_accuracy = weekly_stats.groupby('Settimana').agg({
-                'Risultato predizione (risultato secco)': lambda x: (x == 'Corretto').sum() / len(x) * 100,
-                'Risultato predizione (doppia chance)': lambda x: (x == 'Corretto').sum() / len(x) * 100
-            }).reset_index()
+            # Metriche principali
+            col1, col2 = st.columns(2)
             
-            fig = go.Figure()
-            fig.add_trace(go.Scatter(
-                x=weekly_accuracy['Settimana'],
-                y=weekly_accuracy['Risultato predizione (risultato secco)'],
-                mode='lines+markers',
-                name='Risultato Secco',
-                line=dict(color='#ff6b35', width=3)
-            ))
-            fig.add_trace(go.Scatter(
-                x=weekly_accuracy['Settimana'],
-                y=weekly_accuracy['Risultato predizione (doppia chance)'],
-                mode='lines+markers',
-                name='Doppia Chance',
-                line=dict(color='#4facfe', width=3)
-            ))
+            with col1:
+                # Accuratezza risultato secco
+                correct_exact = stats['Corrette Secco']
+                total_exact = stats['Totale']
+                accuracy_exact = (correct_exact / total_exact) * 100 if total_exact > 0 else 0
+                
+                st.markdown(f"""
+                <div class="metric-card">
+                    <h3>🎯 Risultato Secco</h3>
+                    <h2>{accuracy_exact:.1f}%</h2>
+                    <p>{correct_exact}/{total_exact} predizioni corrette</p>
+                </div>
+                """, unsafe_allow_html=True)
             
-            fig.update_layout(
-                title='Accuratezza Settimanale',
-                xaxis_title='Settimana',
-                yaxis_title='Accuratezza (%)',
-                height=400,
-                hovermode='x unified'
-            )
+            with col2:
+                # Accuratezza doppia chance
+                correct_double = stats['Corrette Doppia']
+                accuracy_double = (correct_double / total_exact) * 100 if total_exact > 0 else 0
+                
+                st.markdown(f"""
+                <div class="metric-card">
+                    <h3>🎲 Doppia Chance</h3>
+                    <h2>{accuracy_double:.1f}%</h2>
+                    <p>{correct_double}/{total_exact} predizioni corrette</p>
+                </div>
+                """, unsafe_allow_html=True)
             
+            # Grafici
+            st.markdown("### 📊 Analisi Dettagliata")
+            
+            # Grafico accuratezza per confidence
+            fig = cached_figure(confidence_figure, stats['Confidence'], title='Accuratezza per Livello di Confidence')
             st.plotly_chart(fig, use_container_width=True)
-    
-    else:
-        st.info("📊 Nessun dato disponibile per generare statistiche con i filtri selezionati. Prova a modificare i filtri o attiva 'Mostra tutte le date'.")
-with tab2:
-    # Genera il testo dinamico basato sui filtri applicati
-    if show_all:
-        title_date_info = ""
-    elif only_selected_date:
-        title_date_info = f" del {selected_date.strftime('%d/%m/%Y')}"
-    else:
-        title_date_info = f" dal {selected_date.strftime('%d/%m/%Y')}"
-    
-    st.markdown(f"## 📈 Performance delle Predizioni{title_date_info}")
-    
-    # Filtra partite terminate dal dataset filtrato per data
-    completed_matches = df_filtered[
-        (df_filtered['Risultato predizione (risultato secco)'] != 'Da giocare') &
-        (df_filtered['Risultato predizione (doppia chance)'] != 'Da giocare')
-    ]
-    
-    if len(completed_matches) > 0:
-        # Metriche principali
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            # Accuratezza risultato secco
-            correct_exact = len(completed_matches[completed_matches['Risultato predizione (risultato secco)'] == 'Corretto'])
-            total_exact = len(completed_matches)
-            accuracy_exact = (correct_exact / total_exact) * 100 if total_exact > 0 else 0
             
-            st.markdown(f"""
-            <div class="metric-card">
-                <h3>🎯 Risultato Secco</h3>
-                <h2>{accuracy_exact:.1f}%</h2>
-                <p>{correct_exact}/{total_exact} predizioni corrette</p>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        with col2:
-            # Accuratezza doppia chance
-            correct_double = len(completed_matches[completed_matches['Risultato predizione (doppia chance)'] == 'Corretto'])
-            accuracy_double = (correct_double / total_exact) * 100 if total_exact > 0 else 0
+            # Tabella dettagli partite completate
+            st.markdown("### 📋 Dettaglio Partite Completate")
             
-            st.markdown(f"""
-            <div class="metric-card">
-                <h3>🎲 Doppia Chance</h3>
-                <h2>{accuracy_double:.1f}%</h2>
-                <p>{correct_double}/{total_exact} predizioni corrette</p>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        # Grafici
-        st.markdown("### 📊 Analisi Dettagliata")
+            # Vista paginata: vengono renderizzate e inviate solo le partite della
+            # pagina corrente, in un unico blocco HTML
+            page_matches = pagination_controls(completed_matches, 'history')
+            
+            with perf.stage('render partite', rows=len(page_matches)):
+                st.markdown(completed_matches_html(page_matches), unsafe_allow_html=True)
         
-        # Grafico accuratezza per confidence
-        confidence_stats = completed_matches.groupby('Confidence').agg({
-            'Risultato predizione (risultato secco)': lambda x: (x == 'Corretto').sum() / len(x) * 100,
-            'Risultato predizione (doppia chance)': lambda x: (x == 'Corretto').sum() / len(x) * 100
-        }).reset_index()
+        else:
+            st.info("📊 Nessuna partita completata ancora. Le statistiche appariranno qui una volta terminate le prime partite.")
+
+if tab_open(tab3):
+    with tab3, perf.stage('scheda Predizioni Future'):
+        st.markdown("## 🔴 Predizioni")
         
-        fig = go.Figure()
-        fig.add_trace(go.Bar(
-            name='Risultato Secco',
-            x=confidence_stats['Confidence'],
-            y=confidence_stats['Risultato predizione (risultato secco)'],
-            marker_color='#ff6b35'
-        ))
-        fig.add_trace(go.Bar(
-            name='Doppia Chance',
-            x=confidence_stats['Confidence'],
-            y=confidence_stats['Risultato predizione (doppia chance)'],
-            marker_color='#4facfe'
-        ))
+        # Filtra partite da giocare dal dataset filtrato per data
+        upcoming_matches = views.upcoming
         
-        fig.update_layout(
-            title='Accuratezza per Livello di Confidence',
-            xaxis_title='Livello Confidence',
-            yaxis_title='Accuratezza (%)',
-            barmode='group',
-            height=400,
-            showlegend=True
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
+        if len(upcoming_matches) > 0:
+            st.markdown(f"### 🎮 {len(upcoming_matches)} Partite in Programma")
+            
+            # Tutte le card della pagina in un unico blocco HTML
+            page_matches = pagination_controls(upcoming_matches, 'upcoming')
+            with perf.stage('render partite', rows=len(page_matches)):
+                st.markdown(upcoming_matches_html(page_matches), unsafe_allow_html=True)
+                        
+        else:
+            st.info("🎮 Nessuna partita in programma al momento. Le prossime predizioni appariranno qui.")
+            
+if tab_open(tab4):
+    with tab4, perf.stage('scheda Squadre'):
+        st.markdown("## 👥 Squadre")
         
-        # Tabella dettagli partite completate
-        st.markdown("### 📋 Dettaglio Partite Completate")
+        # Presenze, riepiloghi e scontri diretti calcolati una volta per versione:
+        # la scelta di una squadra è solo una ricerca nell'indice
+        with perf.stage('indice squadre', cache='hit'):
+            team_index = get_team_index(dataset_version(df), df)
+        team_options = team_index.team_list(selected_league)
         
-        for idx, match in completed_matches.iterrows():
-            col1, col2 = st.columns([3, 1])
-            
-            # Formatta la data per visualizzazione
-            match_date = match['Data partita'].strftime('%d/%m/%Y') if pd.notna(match['Data partita']) else 'Data N/D'
+        if team_options:
+            col1, col2 = st.columns(2)
             
             with col1:
-                st.markdown(f"""
-                **{match['Squadra casa']} vs {match['Squadra ospite']}**  
-                📅 {match_date} | 🏆 {match['Campionato']}  
-                🎯 Previsto: {match['Risultato secco previsto']} | Reale: {match['Risultato secco reale']}  
-                🎲 Doppia Chance: {match['Doppia chance prevista']} | Confidence: {match['Confidence']}
-                """)
+                selected_team = st.selectbox("Squadra:", team_options, key='team')
             
             with col2:
-                # Badge status
-                exact_status = match['Risultato predizione (risultato secco)']
-                double_status = match['Risultato predizione (doppia chance)']
-                
-                exact_class = 'status-correct' if exact_status == 'Corretto' else 'status-incorrect'
-                double_class = 'status-correct' if double_status == 'Corretto' else 'status-incorrect'
-                
-                st.markdown(f"""
-                <div class="status-badge {exact_class}">Secco: {exact_status}</div><br>
-                <div class="status-badge {double_class}">Doppia: {double_status}</div>
-                """, unsafe_allow_html=True)
+                selected_opponent = st.selectbox("Scontri diretti con:", ['Nessuno'] + team_index.opponents(selected_team),
+                                                 key='team_opponent')
             
-            st.markdown("""
-            <div style="
-                height: 2px;
-                background: linear-gradient(90deg, transparent, #e2e8f0, transparent);
-                margin: 2rem 0;
-            "></div>
-            """, unsafe_allow_html=True)
-    
-    else:
-        st.info("📊 Nessuna partita completata ancora. Le statistiche appariranno qui una volta terminate le prime partite.")
-
-with tab3:
-    st.markdown("## 🔴 Predizioni")
-    
-    # Filtra partite da giocare dal dataset filtrato per data
-    upcoming_matches = df_filtered[
-        (df_filtered['Risultato predizione (risultato secco)'] == 'Da giocare') |
-        (df_filtered['Risultato predizione (doppia chance)'] == 'Da giocare')
-    ]
-    
-    if len(upcoming_matches) > 0:
-        st.markdown(f"### 🎮 {len(upcoming_matches)} Partite in Programma")
-        
-        for idx, match in upcoming_matches.iterrows():
-            # Formatta la data per visualizzazione
-            match_date = match['Data partita'].strftime('%d/%m/%Y') if pd.notna(match['Data partita']) else 'Data N/D'
+            st.caption("Statistiche su tutto lo storico della squadra: il filtro campionato limita solo l'elenco delle squadre.")
             
-            # Card con predizioni usando container normale invece di HTML
-            with st.container():
-                st.markdown(f"""
-                <div class="prediction-card">
-                    <h3>⚽ {match['Squadra casa']} vs {match['Squadra ospite']}</h3>
-                    <p>📅 {match_date} | 🏆 {match['Campionato']} | Giornata {match['Giornata']}</p>
-                </div>
-                """, unsafe_allow_html=True)
+            team_summary = team_index.team_summary(selected_team)
+            if team_summary['Concluse'] > 0:
+                st.markdown(f"### 📈 Predizioni su {selected_team}")
                 
-                # Predizioni usando colonne Streamlit normali
-                col1, col2, col3 = st.columns(3)
+                for label, outcome in (("🎯 Secco", 'Secco'), ("🎲 Doppia Chance", 'Doppia')):
+                    col1, col2, col3, col4 = st.columns(4)
+                    with col1:
+                        st.metric(f"{label} - Totale", format_percent(team_summary[f'Accuratezza {outcome} %']),
+                                  help=f"{team_summary[f'Corrette {outcome}']}/{team_summary['Concluse']} predizioni corrette")
+                    with col2:
+                        st.metric(f"{label} - Casa", format_percent(team_summary[f'Casa Accuratezza {outcome} %']),
+                                  help=f"Su {team_summary['Casa Concluse']} partite in casa")
+                    with col3:
+                        st.metric(f"{label} - Trasferta", format_percent(team_summary[f'Trasferta Accuratezza {outcome} %']),
+                                  help=f"Su {team_summary['Trasferta Concluse']} partite in trasferta")
+                    with col4:
+                        st.metric(f"{label} - Serie in corso", format_streak(team_summary[f'Serie {outcome}']))
+            
+            if selected_opponent != 'Nessuno':
+                st.markdown(f"### ⚔️ {selected_team} - {selected_opponent}")
+                head_to_head = team_index.head_to_head(selected_team, selected_opponent)
                 
+                col1, col2, col3, col4 = st.columns(4)
                 with col1:
-                    st.markdown("**🎯 Risultato Secco Previsto:**")
-                    st.markdown(f"**{match['Risultato secco previsto']}**")
-                
+                    st.metric(f"Vittorie {selected_team}", head_to_head['Vittorie'])
                 with col2:
-                    st.markdown("**🎲 Doppia Chance:**")
-                    st.markdown(f"**{match['Doppia chance prevista']}**")
-                
+                    st.metric("Pareggi", head_to_head['Pareggi'])
                 with col3:
-                    st.markdown("**📊 Confidence:**")
-                    st.markdown(f"**{match['Confidence']}**")
-                
-                # Nuova sezione: Probabilità dettagliate
-                st.markdown("---")
-                st.markdown("**📈 Probabilità Dettagliate:**")
-                
-                prob_col1, prob_col2, prob_col3 = st.columns(3)
+                    st.metric(f"Vittorie {selected_opponent}", head_to_head['Sconfitte'])
+                with col4:
+                    st.metric("🎯 Accuratezza Secco", format_percent(head_to_head['Accuratezza Secco %']),
+                              help=f"Su {head_to_head['Concluse']} scontri diretti conclusi")
                 
-                with prob_col1:
-                    prob_casa = match.get('Probabilità Vittoria Casa', 'N/D')
-                    if prob_casa != 'N/D' and pd.notna(prob_casa):
-                        st.markdown(f"""
-                        <div style="text-align: center; padding: 15px; background: #f0f9ff; border-radius: 10px; border: 2px solid #3b82f6;">
-                            <div style="font-size: 0.85rem; color: #64748b; margin-bottom: 5px;">🏠 Vittoria Casa</div>
-                            <div style="font-size: 1.8rem; font-weight: 700; color: #3b82f6;">{prob_casa}%</div>
-                        </div>
-                        """, unsafe_allow_html=True)
-                    else:
-                        st.markdown("🏠 **Vittoria Casa:** N/D")
-                
-                with prob_col2:
-                    prob_pareggio = match.get('Probabilità Pareggio', 'N/D')
-                    if prob_pareggio != 'N/D' and pd.notna(prob_pareggio):
-                        st.markdown(f"""
-                        <div style="text-align: center; padding: 15px; background: #fffbeb; border-radius: 10px; border: 2px solid #f59e0b;">
-                            <div style="font-size: 0.85rem; color: #64748b; margin-bottom: 5px;">🤝 Pareggio</div>
-                            <div style="font-size: 1.8rem; font-weight: 700; color: #f59e0b;">{prob_pareggio}%</div>
-                        </div>
-                        """, unsafe_allow_html=True)
-                    else:
-                        st.markdown("🤝 **Pareggio:** N/D")
-                
-                with prob_col3:
-                    prob_ospite = match.get('Probabilità Vittoria Ospite', 'N/D')
-                    if prob_ospite != 'N/D' and pd.notna(prob_ospite):
-                        st.markdown(f"""
-                        <div style="text-align: center; padding: 15px; background: #f0fdf4; border-radius: 10px; border: 2px solid #10b981;">
-                            <div style="font-size: 0.85rem; color: #64748b; margin-bottom: 5px;">✈️ Vittoria Ospite</div>
-                            <div style="font-size: 1.8rem; font-weight: 700; color: #10b981;">{prob_ospite}%</div>
-                        </div>
-                        """, unsafe_allow_html=True)
-                    else:
-                        st.markdown("✈️ **Vittoria Ospite:** N/D")
-                
-                # Spazio tra le partite
-                st.markdown("""
-                <div style="
-                    height: 2px;
-                    background: linear-gradient(90deg, transparent, #e2e8f0, transparent);
-                    margin: 2rem 0;
-                "></div>
-                """, unsafe_allow_html=True)
-                    
-    else:
-        st.info("🎮 Nessuna partita in programma al momento. Le prossime predizioni appariranno qui.")
+                head_to_head_matches = team_index.head_to_head_matches(selected_team, selected_opponent, completed=True)
+                with perf.stage('render partite', rows=len(head_to_head_matches)):
+                    st.markdown(completed_matches_html(head_to_head_matches.iloc[::-1]), unsafe_allow_html=True)
+            
+            # Partite in programma e storico della squadra
+            team_upcoming = team_index.matches(selected_team, completed=False)
+            if len(team_upcoming) > 0:
+                st.markdown(f"### 🔴 {len(team_upcoming)} Partite in Programma")
+                with perf.stage('render partite', rows=len(team_upcoming)):
+                    st.markdown(upcoming_matches_html(team_upcoming), unsafe_allow_html=True)
+            
+            team_completed = team_index.matches(selected_team, completed=True)
+            if len(team_completed) > 0:
+                st.markdown("### 📋 Partite Concluse")
+                page_matches = pagination_controls(team_completed, 'team_history')
+                with perf.stage('render partite', rows=len(page_matches)):
+                    st.markdown(completed_matches_html(page_matches), unsafe_allow_html=True)
         
-with tab4:
-    st.markdown("""
-    <div style="
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        padding: 2rem;
-        border-radius: 20px;
-        margin-bottom: 2rem;
-        color: white;
-        box-shadow: 0 10px 40px rgba(102, 126, 234, 0.3);
-        text-align: center;
-    ">
-        <h1 style="margin: 0; font-size: 2.2rem; font-weight: 700;">🤖 Come Funzionano le Predizioni</h1>
-        <p style="margin-top: 1rem; font-size: 1.1rem; opacity: 0.95;">
-            Sistema AI avanzato che combina analisi statistica, forma recente e informazioni contestuali in tempo reale
-        </p>
-    </div>
-    
-    <div style="background: white; padding: 30px; border-radius: 16px; box-shadow: 0 4px 20px rgba(0,0,0,0.08); margin-bottom: 25px;">
-        <h2 style="color: #1e293b; margin-bottom: 20px; font-size: 1.5rem;">🔄 Pipeline di Analisi</h2>
-        <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(250px, 1fr)); gap: 20px; margin-bottom: 20px;">
-            <div style="background: #f8fafc; padding: 20px; border-radius: 12px; border-left: 4px solid #667eea;">
-                <div style="font-size: 2.5rem; margin-bottom: 10px;">📊</div>
-                <h3 style="color: #1e293b; font-size: 1.1rem; margin-bottom: 10px;">1. Raccolta Calendario</h3>
-                <p style="color: #64748b; font-size: 0.9rem; line-height: 1.6;">
-                    Il sistema riceve numero giornata e campionato tramite form, quindi estrae automaticamente tutte le partite da Sky Sport per la giornata selezionata
+        else:
+            st.info("👥 Nessuna squadra disponibile per il campionato selezionato.")
+
+if tab_open(tab5):
+    with tab5, perf.stage('scheda Come Funzionano'):
+        st.markdown("""
+        <div style="
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            padding: 2rem;
+            border-radius: 20px;
+            margin-bottom: 2rem;
+            color: white;
+            box-shadow: 0 10px 40px rgba(102, 126, 234, 0.3);
+            text-align: center;
+        ">
+            <h1 style="margin: 0; font-size: 2.2rem; font-weight: 700;">🤖 Come Funzionano le Predizioni</h1>
+            <p style="margin-top: 1rem; font-size: 1.1rem; opacity: 0.95;">
+                Sistema AI avanzato che combina analisi statistica, forma recente e informazioni contestuali in tempo reale
+            </p>
+        </div>
+        
+        <div style="background: white; padding: 30px; border-radius: 16px; box-shadow: 0 4px 20px rgba(0,0,0,0.08); margin-bottom: 25px;">
+            <h2 style="color: #1e293b; margin-bottom: 20px; font-size: 1.5rem;">🔄 Pipeline di Analisi</h2>
+            <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(250px, 1fr)); gap: 20px; margin-bottom: 20px;">
+                <div style="background: #f8fafc; padding: 20px; border-radius: 12px; border-left: 4px solid #667eea;">
+                    <div style="font-size: 2.5rem; margin-bottom: 10px;">📊</div>
+                    <h3 style="color: #1e293b; font-size: 1.1rem; margin-bottom: 10px;">1. Raccolta Calendario</h3>
+                    <p style="color: #64748b; font-size: 0.9rem; line-height: 1.6;">
+                        Il sistema riceve numero giornata e campionato tramite form, quindi estrae automaticamente tutte le partite da Sky Sport per la giornata selezionata
+                    </p>
+                </div>
+                <div style="background: #f8fafc; padding: 20px; border-radius: 12px; border-left: 4px solid #3b82f6;">
+                    <div style="font-size: 2.5rem; margin-bottom: 10px;">📈</div>
+                    <h3 style="color: #1e293b; font-size: 1.1rem; margin-bottom: 10px;">2. Statistiche Avanzate</h3>
+                    <p style="color: #64748b; font-size: 0.9rem; line-height: 1.6;">
+                        Per ogni squadra vengono recuperate le statistiche dettagliate e gli ultimi risultati per valutare la forma recente
+                    </p>
+                </div>
+                <div style="background: #f8fafc; padding: 20px; border-radius: 12px; border-left: 4px solid #f59e0b;">
+                    <div style="font-size: 2.5rem; margin-bottom: 10px;">🔍</div>
+                    <h3 style="color: #1e293b; font-size: 1.1rem; margin-bottom: 10px;">3. Info Contestuali</h3>
+                    <p style="color: #64748b; font-size: 0.9rem; line-height: 1.6;">
+                        Tavily API cerca informazioni real-time su infortuni, squalifiche, dichiarazioni pre-partita, motivazioni e fattori psicologici delle squadre
+                    </p>
+                </div>
+                <div style="background: #f8fafc; padding: 20px; border-radius: 12px; border-left: 4px solid #10b981;">
+                    <div style="font-size: 2.5rem; margin-bottom: 10px;">📱</div>
+                    <h3 style="color: #1e293b; font-size: 1.1rem; margin-bottom: 10px;">4. Analisi AI</h3>
+                    <p style="color: #64748b; font-size: 0.9rem; line-height: 1.6;">
+                        GPT-4o-mini analizza tutti i dati con metodologia strutturata e genera predizioni con percentuali di probabilità, livelli di confidence e insight chiave
+                    </p>
+                </div>
+            </div>
+        </div>
+        
+        <div style="background: white; padding: 30px; border-radius: 16px; box-shadow: 0 4px 20px rgba(0,0,0,0.08); margin-bottom: 25px;">
+            <h2 style="color: #1e293b; margin-bottom: 20px; font-size: 1.5rem;">🎯 Metodologia di Predizione AI</h2>
+            <div style="background: #f8fafc; padding: 20px; border-radius: 12px; margin-bottom: 15px; border-left: 4px solid #667eea;">
+                <h3 style="color: #667eea; margin-bottom: 10px; font-size: 1.1rem;">📊 Step 1: Valutazione Forza Offensiva</h3>
+                <p style="color: #64748b; line-height: 1.7; margin-bottom: 8px;">
+                    L’AI confronta i valori di xG normalizzati (ossia il rapporto tra xG e partite giocate) per valutare la forza offensiva delle squadre. Valori elevati indicano un attacco efficace e con alta probabilità di andare a segno. Inoltre, l’analisi dei differenziali tra xG attesi e gol effettivamente realizzati permette di individuare squadre che, pur creando molte occasioni, non hanno ancora espresso appieno il proprio potenziale realizzativo.            </p>
+                <p style="color: #475569; font-size: 0.85rem; background: white; padding: 10px; border-radius: 6px;">
+                    <strong>Esempio:</strong> Squadra con xG_norm=1.8 contro difesa avversaria con xGC_norm=1.4 → alto divario offensivo, favorita a segnare
                 </p>
             </div>
-            <div style="background: #f8fafc; padding: 20px; border-radius: 12px; border-left: 4px solid #3b82f6;">
-                <div style="font-size: 2.5rem; margin-bottom: 10px;">📈</div>
-                <h3 style="color: #1e293b; font-size: 1.1rem; margin-bottom: 10px;">2. Statistiche Avanzate</h3>
-                <p style="color: #64748b; font-size: 0.9rem; line-height: 1.6;">
-                    Per ogni squadra vengono recuperate le statistiche dettagliate e gli ultimi risultati per valutare la forma recente
+            <div style="background: #f8fafc; padding: 20px; border-radius: 12px; margin-bottom: 15px; border-left: 4px solid #3b82f6;">
+                <h3 style="color: #3b82f6; margin-bottom: 10px; font-size: 1.1rem;">🛡️ Step 2: Valutazione Solidità Difensiva</h3>
+                <p style="color: #64748b; line-height: 1.7; margin-bottom: 8px;">
+                    Il confronto degli xGC normalizzati (ossia rapportati al numero di partite giocate) permette di valutare l’effettiva solidità difensiva delle squadre. Valori particolarmente bassi indicano una difesa affidabile, ma l’analisi dei differenziali tra xGC attesi e gol subiti reali consente di individuare le squadre che stanno beneficiando di una certa fortuna difensiva e che, di conseguenza, potrebbero subire un peggioramento delle prestazioni nelle gare successive.            </p>
+                <p style="color: #475569; font-size: 0.85rem; background: white; padding: 10px; border-radius: 6px;">
+                    <strong>Esempio:</strong> Difesa con xGC_norm=0.7 contro attacco avversario con xG_norm=0.9 → difesa solida, difficile da battere
                 </p>
             </div>
-            <div style="background: #f8fafc; padding: 20px; border-radius: 12px; border-left: 4px solid #f59e0b;">
-                <div style="font-size: 2.5rem; margin-bottom: 10px;">🔍</div>
-                <h3 style="color: #1e293b; font-size: 1.1rem; margin-bottom: 10px;">3. Info Contestuali</h3>
-                <p style="color: #64748b; font-size: 0.9rem; line-height: 1.6;">
-                    Tavily API cerca informazioni real-time su infortuni, squalifiche, dichiarazioni pre-partita, motivazioni e fattori psicologici delle squadre
+            <div style="background: #f8fafc; padding: 20px; border-radius: 12px; margin-bottom: 15px; border-left: 4px solid #f59e0b;">
+                <h3 style="color: #f59e0b; margin-bottom: 10px; font-size: 1.1rem;">📈 Step 3: Identificazione Trend</h3>
+                <p style="color: #64748b; line-height: 1.7; margin-bottom: 8px;">
+                    L’analisi dei differenziali tra punti attesi (xPTS) e punti reali consente di valutare la coerenza tra rendimento effettivo e prestazioni attese. Un differenziale positivo suggerisce che la squadra ha ottenuto meno punti di quanto meritasse e potrebbe essere in fase di crescita, mentre un differenziale negativo indica una squadra che ha raccolto più di quanto prodotto in campo e che potrebbe andare incontro a un calo di rendimento.            </p>
+                <p style="color: #475569; font-size: 0.85rem; background: white; padding: 10px; border-radius: 6px;">
+                    <strong>Esempio:</strong> xPTS_diff=+2.5 → squadra che gioca meglio di quanto dice la classifica, probabile miglioramento risultati
                 </p>
             </div>
             <div style="background: #f8fafc; padding: 20px; border-radius: 12px; border-left: 4px solid #10b981;">
-                <div style="font-size: 2.5rem; margin-bottom: 10px;">📱</div>
-                <h3 style="color: #1e293b; font-size: 1.1rem; margin-bottom: 10px;">4. Analisi AI</h3>
-                <p style="color: #64748b; font-size: 0.9rem; line-height: 1.6;">
-                    GPT-4o-mini analizza tutti i dati con metodologia strutturata e genera predizioni con percentuali di probabilità, livelli di confidence e insight chiave
+                <h3 style="color: #10b981; margin-bottom: 10px; font-size: 1.1rem;">⚖️ Step 4: Gestione Pareggi Intelligente</h3>
+                <p style="color: #64748b; line-height: 1.7; margin-bottom: 8px;">
+                    L’AI non tende a sottostimare i pareggi, ma ne incrementa sensibilmente la probabilità quando le squadre mostrano valori offensivi e difensivi simili, entrambe dispongono di difese solide, gli attacchi risultano poco incisivi oppure lo storico degli scontri diretti evidenzia una frequenza elevata di pareggi.            </p>
+                <p style="color: #475569; font-size: 0.85rem; background: white; padding: 10px; border-radius: 6px;">
+                    <strong>Esempio:</strong> xG_norm 1.3 vs 1.4 e xGC_norm 1.1 vs 1.0 → equilibrio statistico, pareggio altamente probabile
                 </p>
             </div>
         </div>
-    </div>
-    
-    <div style="background: white; padding: 30px; border-radius: 16px; box-shadow: 0 4px 20px rgba(0,0,0,0.08); margin-bottom: 25px;">
-        <h2 style="color: #1e293b; margin-bottom: 20px; font-size: 1.5rem;">🎯 Metodologia di Predizione AI</h2>
-        <div style="background: #f8fafc; padding: 20px; border-radius: 12px; margin-bottom: 15px; border-left: 4px solid #667eea;">
-            <h3 style="color: #667eea; margin-bottom: 10px; font-size: 1.1rem;">📊 Step 1: Valutazione Forza Offensiva</h3>
-            <p style="color: #64748b; line-height: 1.7; margin-bottom: 8px;">
-                L’AI confronta i valori di xG normalizzati (ossia il rapporto tra xG e partite giocate) per valutare la forza offensiva delle squadre. Valori elevati indicano un attacco efficace e con alta probabilità di andare a segno. Inoltre, l’analisi dei differenziali tra xG attesi e gol effettivamente realizzati permette di individuare squadre che, pur creando molte occasioni, non hanno ancora espresso appieno il proprio potenziale realizzativo.            </p>
-            <p style="color: #475569; font-size: 0.85rem; background: white; padding: 10px; border-radius: 6px;">
-                <strong>Esempio:</strong> Squadra con xG_norm=1.8 contro difesa avversaria con xGC_norm=1.4 → alto divario offensivo, favorita a segnare
-            </p>
-        </div>
-        <div style="background: #f8fafc; padding: 20px; border-radius: 12px; margin-bottom: 15px; border-left: 4px solid #3b82f6;">
-            <h3 style="color: #3b82f6; margin-bottom: 10px; font-size: 1.1rem;">🛡️ Step 2: Valutazione Solidità Difensiva</h3>
-            <p style="color: #64748b; line-height: 1.7; margin-bottom: 8px;">
-                Il confronto degli xGC normalizzati (ossia rapportati al numero di partite giocate) permette di valutare l’effettiva solidità difensiva delle squadre. Valori particolarmente bassi indicano una difesa affidabile, ma l’analisi dei differenziali tra xGC attesi e gol subiti reali consente di individuare le squadre che stanno beneficiando di una certa fortuna difensiva e che, di conseguenza, potrebbero subire un peggioramento delle prestazioni nelle gare successive.            </p>
-            <p style="color: #475569; font-size: 0.85rem; background: white; padding: 10px; border-radius: 6px;">
-                <strong>Esempio:</strong> Difesa con xGC_norm=0.7 contro attacco avversario con xG_norm=0.9 → difesa solida, difficile da battere
-            </p>
-        </div>
-        <div style="background: #f8fafc; padding: 20px; border-radius: 12px; margin-bottom: 15px; border-left: 4px solid #f59e0b;">
-            <h3 style="color: #f59e0b; margin-bottom: 10px; font-size: 1.1rem;">📈 Step 3: Identificazione Trend</h3>
-            <p style="color: #64748b; line-height: 1.7; margin-bottom: 8px;">
-                L’analisi dei differenziali tra punti attesi (xPTS) e punti reali consente di valutare la coerenza tra rendimento effettivo e prestazioni attese. Un differenziale positivo suggerisce che la squadra ha ottenuto meno punti di quanto meritasse e potrebbe essere in fase di crescita, mentre un differenziale negativo indica una squadra che ha raccolto più di quanto prodotto in campo e che potrebbe andare incontro a un calo di rendimento.            </p>
-            <p style="color: #475569; font-size: 0.85rem; background: white; padding: 10px; border-radius: 6px;">
-                <strong>Esempio:</strong> xPTS_diff=+2.5 → squadra che gioca meglio di quanto dice la classifica, probabile miglioramento risultati
-            </p>
-        </div>
-        <div style="background: #f8fafc; padding: 20px; border-radius: 12px; border-left: 4px solid #10b981;">
-            <h3 style="color: #10b981; margin-bottom: 10px; font-size: 1.1rem;">⚖️ Step 4: Gestione Pareggi Intelligente</h3>
-            <p style="color: #64748b; line-height: 1.7; margin-bottom: 8px;">
-                L’AI non tende a sottostimare i pareggi, ma ne incrementa sensibilmente la probabilità quando le squadre mostrano valori offensivi e difensivi simili, entrambe dispongono di difese solide, gli attacchi risultano poco incisivi oppure lo storico degli scontri diretti evidenzia una frequenza elevata di pareggi.            </p>
-            <p style="color: #475569; font-size: 0.85rem; background: white; padding: 10px; border-radius: 6px;">
-                <strong>Esempio:</strong> xG_norm 1.3 vs 1.4 e xGC_norm 1.1 vs 1.0 → equilibrio statistico, pareggio altamente probabile
-            </p>
+        
+        <div style="background: white; padding: 30px; border-radius: 16px; box-shadow: 0 4px 20px rgba(0,0,0,0.08); margin-bottom: 25px;">
+            <h2 style="color: #1e293b; margin-bottom: 20px; font-size: 1.5rem;">🔧 Strumenti AI Utilizzati</h2>
+            <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(280px, 1fr)); gap: 15px;">
+                <div style="background: #f8fafc; padding: 18px; border-radius: 10px; border-left: 4px solid #667eea;">
+                    <strong style="color: #667eea;">📊 Stats Retriever Tool</strong>
+                    <p style="color: #64748b; font-size: 0.9rem; margin-top: 8px; line-height: 1.6;">
+                        Recupera statistiche dettagliate: xG, xGC, xPTS con metriche normalizzate, expected stats dettagliate (xGOT, xGFH, xGSH, xGOP, xGSP) e differenziali chiave
+                    </p>
+                </div>
+                <div style="background: #f8fafc; padding: 18px; border-radius: 10px; border-left: 4px solid #3b82f6;">
+                    <strong style="color: #3b82f6;">🎯 Matches Tool</strong>
+                    <p style="color: #64748b; font-size: 0.9rem; margin-top: 8px; line-height: 1.6;">
+                        Recupera storico recente delle partite per valutare forma (ultime 3-5 partite), difficoltà avversari recenti, pattern di performance e gestione energie/rotazioni
+                    </p>
+                </div>
+                <div style="background: #f8fafc; padding: 18px; border-radius: 10px; border-left: 4px solid #f59e0b;">
+                    <strong style="color: #f59e0b;">🔍 Tavily Tool</strong>
+                    <p style="color: #64748b; font-size: 0.9rem; margin-top: 8px; line-height: 1.6;">
+                        Cerca info contestuali critiche: infortuni/squalifiche, dichiarazioni allenatori, rotazioni previste, condizioni meteo, motivazioni particolari, news pre-partita
+                    </p>
+                </div>
+            </div>
         </div>
-    </div>
-    
-    <div style="background: white; padding: 30px; border-radius: 16px; box-shadow: 0 4px 20px rgba(0,0,0,0.08); margin-bottom: 25px;">
-        <h2 style="color: #1e293b; margin-bottom: 20px; font-size: 1.5rem;">🔧 Strumenti AI Utilizzati</h2>
-        <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(280px, 1fr)); gap: 15px;">
-            <div style="background: #f8fafc; padding: 18px; border-radius: 10px; border-left: 4px solid #667eea;">
-                <strong style="color: #667eea;">📊 Stats Retriever Tool</strong>
-                <p style="color: #64748b; font-size: 0.9rem; margin-top: 8px; line-height: 1.6;">
-                    Recupera statistiche dettagliate: xG, xGC, xPTS con metriche normalizzate, expected stats dettagliate (xGOT, xGFH, xGSH, xGOP, xGSP) e differenziali chiave
+        
+        <div style="background: white; padding: 30px; border-radius: 16px; box-shadow: 0 4px 20px rgba(0,0,0,0.08); margin-bottom: 25px;">
+            <h2 style="color: #1e293b; margin-bottom: 20px; font-size: 1.5rem;">📈 Statistiche Chiave Analizzate</h2>
+            <div style="background: #f8fafc; padding: 20px; border-radius: 12px; margin-bottom: 15px; border-left: 4px solid #667eea;">
+                <h3 style="color: #667eea; margin-bottom: 10px; font-size: 1.1rem;">🎯 xG_norm (Expected Goals Normalizzati)</h3>
+                <p style="color: #64748b; line-height: 1.7; margin-bottom: 8px;">
+                    <strong>Metrica principale</strong> per valutare la qualità offensiva media, permette confronti diretti tra squadre con partite diverse, individuando il livello di qualità offensivo.
                 </p>
-            </div>
-            <div style="background: #f8fafc; padding: 18px; border-radius: 10px; border-left: 4px solid #3b82f6;">
-                <strong style="color: #3b82f6;">🎯 Matches Tool</strong>
-                <p style="color: #64748b; font-size: 0.9rem; margin-top: 8px; line-height: 1.6;">
-                    Recupera storico recente delle partite per valutare forma (ultime 3-5 partite), difficoltà avversari recenti, pattern di performance e gestione energie/rotazioni
+                <p style="color: #475569; font-size: 0.85rem; background: white; padding: 10px; border-radius: 6px;">
+                    <strong>Formula:</strong> xG_norm = xG totali / partite giocate
                 </p>
             </div>
-            <div style="background: #f8fafc; padding: 18px; border-radius: 10px; border-left: 4px solid #f59e0b;">
-                <strong style="color: #f59e0b;">🔍 Tavily Tool</strong>
-                <p style="color: #64748b; font-size: 0.9rem; margin-top: 8px; line-height: 1.6;">
-                    Cerca info contestuali critiche: infortuni/squalifiche, dichiarazioni allenatori, rotazioni previste, condizioni meteo, motivazioni particolari, news pre-partita
+            <div style="background: #f8fafc; padding: 20px; border-radius: 12px; margin-bottom: 15px; border-left: 4px solid #3b82f6;">
+                <h3 style="color: #3b82f6; margin-bottom: 10px; font-size: 1.1rem;">🛡️ xGC_norm (Expected Goals Conceded Normalizzati)</h3>
+                <p style="color: #64748b; line-height: 1.7; margin-bottom: 8px;">
+                    <strong>Metrica principale</strong> per valutare quale sia il livello di solidità difensiva della squadra.
                 </p>
-            </div>
-        </div>
-    </div>
-    
-    <div style="background: white; padding: 30px; border-radius: 16px; box-shadow: 0 4px 20px rgba(0,0,0,0.08); margin-bottom: 25px;">
-        <h2 style="color: #1e293b; margin-bottom: 20px; font-size: 1.5rem;">📈 Statistiche Chiave Analizzate</h2>
-        <div style="background: #f8fafc; padding: 20px; border-radius: 12px; margin-bottom: 15px; border-left: 4px solid #667eea;">
-            <h3 style="color: #667eea; margin-bottom: 10px; font-size: 1.1rem;">🎯 xG_norm (Expected Goals Normalizzati)</h3>
-            <p style="color: #64748b; line-height: 1.7; margin-bottom: 8px;">
-                <strong>Metrica principale</strong> per valutare la qualità offensiva media, permette confronti diretti tra squadre con partite diverse, individuando il livello di qualità offensivo.
-            </p>
-            <p style="color: #475569; font-size: 0.85rem; background: white; padding: 10px; border-radius: 6px;">
-                <strong>Formula:</strong> xG_norm = xG totali / partite giocate
-            </p>
-        </div>
-        <div style="background: #f8fafc; padding: 20px; border-radius: 12px; margin-bottom: 15px; border-left: 4px solid #3b82f6;">
-            <h3 style="color: #3b82f6; margin-bottom: 10px; font-size: 1.1rem;">🛡️ xGC_norm (Expected Goals Conceded Normalizzati)</h3>
-            <p style="color: #64748b; line-height: 1.7; margin-bottom: 8px;">
-                <strong>Metrica principale</strong> per valutare quale sia il livello di solidità difensiva della squadra.
-            </p>
-            <p style="color: #475569; font-size: 0.85rem; background: white; padding: 10px; border-radius: 6px;">
-                <strong>Formula:</strong> xGC_norm = xGC totali / partite giocate
-            </p>
-        </div>
-        <div style="background: #f8fafc; padding: 20px; border-radius: 12px; margin-bottom: 15px; border-left: 4px solid #10b981;">
-            <h3 style="color: #10b981; margin-bottom: 10px; font-size: 1.1rem;">📊 Expected Stats Differenziali</h3>
-            <p style="color: #64748b; line-height: 1.7; margin-bottom: 8px;">
-                <strong>xG_diff</strong> (xG - gol reali): negativo = sfortunata in attacco, miglioramento probabile<br>
-                <strong>xGC_diff</strong> (xGC - gol subiti): positivo = difesa fortunata, rischio crollo<br>
-                <strong>xPTS_diff</strong> (xPTS - punti reali): positivo = sottovalutata, negativo = sopravvalutata
-            </p>
-        </div>
-        <div style="background: #f8fafc; padding: 20px; border-radius: 12px; border-left: 4px solid #f59e0b;">
-            <h3 style="color: #f59e0b; margin-bottom: 10px; font-size: 1.1rem;">🔍 Expected Stats Dettagliate</h3>
-            <p style="color: #64748b; line-height: 1.7;">
-                <strong>xGOT</strong> (Expected Goals On Target): qualità dei tiri in porta<br>
-                <strong>xGFH/xGSH</strong> (First/Second Half): distribuzione prestazioni nei tempi<br>
-                <strong>xGOP</strong> (Open Play): qualità del gioco manovrato<br>
-                <strong>xGSP</strong> (Set Pieces): pericolosità su palle ferme
-            </p>
-        </div>
-    </div>
-    
-    <div style="background: white; padding: 30px; border-radius: 16px; box-shadow: 0 4px 20px rgba(0,0,0,0.08); margin-bottom: 25px;">
-        <h2 style="color: #1e293b; margin-bottom: 20px; font-size: 1.5rem;">💪 Livelli di Confidence</h2>
-        <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(250px, 1fr)); gap: 15px;">
-            <div style="background: linear-gradient(135deg, #10b981 0%, #059669 100%); padding: 25px; border-radius: 12px; color: white; text-align: center;">
-                <h3 style="margin: 0; font-size: 1.3rem;">🟢 Alta</h3>
-                <p style="margin-top: 12px; font-size: 0.9rem; line-height: 1.6; opacity: 0.95;">
-                    Forte convergenza di tutti gli indicatori. Divario netto xG_norm/xGC_norm, trend chiari nei differenziali, forma recente coerente, nessun fattore contestuale critico in contrasto.
+                <p style="color: #475569; font-size: 0.85rem; background: white; padding: 10px; border-radius: 6px;">
+                    <strong>Formula:</strong> xGC_norm = xGC totali / partite giocate
                 </p>
             </div>
-            <div style="background: linear-gradient(135deg, #f59e0b 0%, #d97706 100%); padding: 25px; border-radius: 12px; color: white; text-align: center;">
-                <h3 style="margin: 0; font-size: 1.3rem;">🟡 Media</h3>
-                <p style="margin-top: 12px; font-size: 0.9rem; line-height: 1.6; opacity: 0.95;">
-                    Equilibrio statistico o segnali contrastanti. Le metriche normalizzate indicano una direzione ma fattori contestuali o forma recente suggeriscono cautela.
+            <div style="background: #f8fafc; padding: 20px; border-radius: 12px; margin-bottom: 15px; border-left: 4px solid #10b981;">
+                <h3 style="color: #10b981; margin-bottom: 10px; font-size: 1.1rem;">📊 Expected Stats Differenziali</h3>
+                <p style="color: #64748b; line-height: 1.7; margin-bottom: 8px;">
+                    <strong>xG_diff</strong> (xG - gol reali): negativo = sfortunata in attacco, miglioramento probabile<br>
+                    <strong>xGC_diff</strong> (xGC - gol subiti): positivo = difesa fortunata, rischio crollo<br>
+                    <strong>xPTS_diff</strong> (xPTS - punti reali): positivo = sottovalutata, negativo = sopravvalutata
                 </p>
             </div>
-            <div style="background: linear-gradient(135deg, #ef4444 0%, #dc2626 100%); padding: 25px; border-radius: 12px; color: white; text-align: center;">
-                <h3 style="margin: 0; font-size: 1.3rem;">🔴 Bassa</h3>
-                <p style="margin-top: 12px; font-size: 0.9rem; line-height: 1.6; opacity: 0.95;">
-                    Partita molto incerta. Statistiche vicine, fattori imprevedibili critici (infortuni chiave, motivazioni opposte), mancanza informazioni decisive. Alto rischio pareggio.
+            <div style="background: #f8fafc; padding: 20px; border-radius: 12px; border-left: 4px solid #f59e0b;">
+                <h3 style="color: #f59e0b; margin-bottom: 10px; font-size: 1.1rem;">🔍 Expected Stats Dettagliate</h3>
+                <p style="color: #64748b; line-height: 1.7;">
+                    <strong>xGOT</strong> (Expected Goals On Target): qualità dei tiri in porta<br>
+                    <strong>xGFH/xGSH</strong> (First/Second Half): distribuzione prestazioni nei tempi<br>
+                    <strong>xGOP</strong> (Open Play): qualità del gioco manovrato<br>
+                    <strong>xGSP</strong> (Set Pieces): pericolosità su palle ferme
                 </p>
             </div>
         </div>
-    </div>
-    
-    <div style="background: white; padding: 30px; border-radius: 16px; box-shadow: 0 4px 20px rgba(0,0,0,0.08); margin-bottom: 25px;">
-        <h2 style="color: #1e293b; margin-bottom: 20px; font-size: 1.5rem;">📋 Output della Predizione</h2>
-        <div style="background: #f8fafc; padding: 20px; border-radius: 12px; border-left: 4px solid #667eea;">
-            <p style="color: #64748b; line-height: 1.7; margin-bottom: 12px;">
-                Per ogni partita l'AI fornisce un'analisi strutturata completa:
-            </p>
-            <ul style="color: #64748b; line-height: 2; margin-left: 20px;">
-                <li><strong>📊 Analisi Statistica:</strong> Confronto xG_norm, xGC_norm e differenziali chiave</li>
-                <li><strong>📈 Forma Recente:</strong> Sintesi ultimi risultati e trend per entrambe le squadre</li>
-                <li><strong>🔍 Fattori Contestuali:</strong> Infortuni/squalifiche, motivazioni, altri fattori rilevanti</li>
-                <li><strong>⚽ Predizione Finale:</strong> Confidence level + probabilità dettagliate (1/X/2)</li>
-                <li><strong>💡 Insight Chiave:</strong> 1-2 frasi sul fattore decisivo basato su dati xG_norm e contesto</li>
-            </ul>
-        </div>
-    </div>
-    
-    <div style="background: white; padding: 30px; border-radius: 16px; box-shadow: 0 4px 20px rgba(0,0,0,0.08); margin-bottom: 25px;">
-        <h2 style="color: #1e293b; margin-bottom: 20px; font-size: 1.5rem; text-align: center;">⚙️ Stack Tecnologico</h2>
-        <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(150px, 1fr)); gap: 20px;">
-            <div style="text-align: center; padding: 15px;">
-                <div style="font-size: 2.5rem; margin-bottom: 10px;">🔥</div>
-                <strong style="color: #1e293b;">Firecrawl API</strong>
-                <p style="color: #64748b; font-size: 0.8rem; margin-top: 5px;">Estrazione partite</p>
-            </div>
-            <div style="text-align: center; padding: 15px;">
-                <div style="font-size: 2.5rem; margin-bottom: 10px;">📱</div>
-                <strong style="color: #1e293b;">GPT-4o-mini</strong>
-                <p style="color: #64748b; font-size: 0.8rem; margin-top: 5px;">Modello AI</p>
-            </div>
-            <div style="text-align: center; padding: 15px;">
-                <div style="font-size: 2.5rem; margin-bottom: 10px;">🔍</div>
-                <strong style="color: #1e293b;">Tavily API</strong>
-                <p style="color: #64748b; font-size: 0.8rem; margin-top: 5px;">Info real-time</p>
-            </div>
-            <div style="text-align: center; padding: 15px;">
-                <div style="font-size: 2.5rem; margin-bottom: 10px;">📊</div>
-                <strong style="color: #1e293b;">Stats Retriever</strong>
-                <p style="color: #64748b; font-size: 0.8rem; margin-top: 5px;">Workflow n8n</p>
+        
+        <div style="background: white; padding: 30px; border-radius: 16px; box-shadow: 0 4px 20px rgba(0,0,0,0.08); margin-bottom: 25px;">
+            <h2 style="color: #1e293b; margin-bottom: 20px; font-size: 1.5rem;">💪 Livelli di Confidence</h2>
+            <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(250px, 1fr)); gap: 15px;">
+                <div style="background: linear-gradient(135deg, #10b981 0%, #059669 100%); padding: 25px; border-radius: 12px; color: white; text-align: center;">
+                    <h3 style="margin: 0; font-size: 1.3rem;">🟢 Alta</h3>
+                    <p style="margin-top: 12px; font-size: 0.9rem; line-height: 1.6; opacity: 0.95;">
+                        Forte convergenza di tutti gli indicatori. Divario netto xG_norm/xGC_norm, trend chiari nei differenziali, forma recente coerente, nessun fattore contestuale critico in contrasto.
+                    </p>
+                </div>
+                <div style="background: linear-gradient(135deg, #f59e0b 0%, #d97706 100%); padding: 25px; border-radius: 12px; color: white; text-align: center;">
+                    <h3 style="margin: 0; font-size: 1.3rem;">🟡 Media</h3>
+                    <p style="margin-top: 12px; font-size: 0.9rem; line-height: 1.6; opacity: 0.95;">
+                        Equilibrio statistico o segnali contrastanti. Le metriche normalizzate indicano una direzione ma fattori contestuali o forma recente suggeriscono cautela.
+                    </p>
+                </div>
+                <div style="background: linear-gradient(135deg, #ef4444 0%, #dc2626 100%); padding: 25px; border-radius: 12px; color: white; text-align: center;">
+                    <h3 style="margin: 0; font-size: 1.3rem;">🔴 Bassa</h3>
+                    <p style="margin-top: 12px; font-size: 0.9rem; line-height: 1.6; opacity: 0.95;">
+                        Partita molto incerta. Statistiche vicine, fattori imprevedibili critici (infortuni chiave, motivazioni opposte), mancanza informazioni decisive. Alto rischio pareggio.
+                    </p>
+                </div>
             </div>
-            <div style="text-align: center; padding: 15px;">
-                <div style="font-size: 2.5rem; margin-bottom: 10px;">🎯</div>
-                <strong style="color: #1e293b;">Matches Tool</strong>
-                <p style="color: #64748b; font-size: 0.8rem; margin-top: 5px;">Workflow n8n</p>
+        </div>
+        
+        <div style="background: white; padding: 30px; border-radius: 16px; box-shadow: 0 4px 20px rgba(0,0,0,0.08); margin-bottom: 25px;">
+            <h2 style="color: #1e293b; margin-bottom: 20px; font-size: 1.5rem;">📋 Output della Predizione</h2>
+            <div style="background: #f8fafc; padding: 20px; border-radius: 12px; border-left: 4px solid #667eea;">
+                <p style="color: #64748b; line-height: 1.7; margin-bottom: 12px;">
+                    Per ogni partita l'AI fornisce un'analisi strutturata completa:
+                </p>
+                <ul style="color: #64748b; line-height: 2; margin-left: 20px;">
+                    <li><strong>📊 Analisi Statistica:</strong> Confronto xG_norm, xGC_norm e differenziali chiave</li>
+                    <li><strong>📈 Forma Recente:</strong> Sintesi ultimi risultati e trend per entrambe le squadre</li>
+                    <li><strong>🔍 Fattori Contestuali:</strong> Infortuni/squalifiche, motivazioni, altri fattori rilevanti</li>
+                    <li><strong>⚽ Predizione Finale:</strong> Confidence level + probabilità dettagliate (1/X/2)</li>
+                    <li><strong>💡 Insight Chiave:</strong> 1-2 frasi sul fattore decisivo basato su dati xG_norm e contesto</li>
+                </ul>
             </div>
-            <div style="text-align: center; padding: 15px;">
-                <div style="font-size: 2.5rem; margin-bottom: 10px;">⚡</div>
-                <strong style="color: #1e293b;">n8n</strong>
-                <p style="color: #64748b; font-size: 0.8rem; margin-top: 5px;">Orchestrazione</p>
+        </div>
+        
+        <div style="background: white; padding: 30px; border-radius: 16px; box-shadow: 0 4px 20px rgba(0,0,0,0.08); margin-bottom: 25px;">
+            <h2 style="color: #1e293b; margin-bottom: 20px; font-size: 1.5rem; text-align: center;">⚙️ Stack Tecnologico</h2>
+            <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(150px, 1fr)); gap: 20px;">
+                <div style="text-align: center; padding: 15px;">
+                    <div style="font-size: 2.5rem; margin-bottom: 10px;">🔥</div>
+                    <strong style="color: #1e293b;">Firecrawl API</strong>
+                    <p style="color: #64748b; font-size: 0.8rem; margin-top: 5px;">Estrazione partite</p>
+                </div>
+                <div style="text-align: center; padding: 15px;">
+                    <div style="font-size: 2.5rem; margin-bottom: 10px;">📱</div>
+                    <strong style="color: #1e293b;">GPT-4o-mini</strong>
+                    <p style="color: #64748b; font-size: 0.8rem; margin-top: 5px;">Modello AI</p>
+                </div>
+                <div style="text-align: center; padding: 15px;">
+                    <div style="font-size: 2.5rem; margin-bottom: 10px;">🔍</div>
+                    <strong style="color: #1e293b;">Tavily API</strong>
+                    <p style="color: #64748b; font-size: 0.8rem; margin-top: 5px;">Info real-time</p>
+                </div>
+                <div style="text-align: center; padding: 15px;">
+                    <div style="font-size: 2.5rem; margin-bottom: 10px;">📊</div>
+                    <strong style="color: #1e293b;">Stats Retriever</strong>
+                    <p style="color: #64748b; font-size: 0.8rem; margin-top: 5px;">Workflow n8n</p>
+                </div>
+                <div style="text-align: center; padding: 15px;">
+                    <div style="font-size: 2.5rem; margin-bottom: 10px;">🎯</div>
+                    <strong style="color: #1e293b;">Matches Tool</strong>
+                    <p style="color: #64748b; font-size: 0.8rem; margin-top: 5px;">Workflow n8n</p>
+                </div>
+                <div style="text-align: center; padding: 15px;">
+                    <div style="font-size: 2.5rem; margin-bottom: 10px;">⚡</div>
+                    <strong style="color: #1e293b;">n8n</strong>
+                    <p style="color: #64748b; font-size: 0.8rem; margin-top: 5px;">Orchestrazione</p>
+                </div>
             </div>
         </div>
-    </div>
-    
-    <div style="
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        padding: 2rem;
-        border-radius: 20px;
-        color: white;
-        text-align: center;
-        box-shadow: 0 10px 40px rgba(102, 126, 234, 0.3);
-    ">
-        <h3 style="margin: 0; font-size: 1.3rem; margin-bottom: 10px;">⚠️ Disclaimer</h3>
-        <p style="margin: 0; font-size: 0.95rem; line-height: 1.7; opacity: 0.95;">
-            Queste predizioni sono generate da un sistema AI a scopo informativo e di analisi. 
-            Non costituiscono in alcun modo un consiglio per scommesse o investimenti. 
-            Il calcio è uno sport imprevedibile e nessun sistema può garantire risultati accurati al 100%.
-        </p>
-    </div>
-    """, unsafe_allow_html=True)
+        
+        <div style="
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            padding: 2rem;
+            border-radius: 20px;
+            color: white;
+            text-align: center;
+            box-shadow: 0 10px 40px rgba(102, 126, 234, 0.3);
+        ">
+            <h3 style="margin: 0; font-size: 1.3rem; margin-bottom: 10px;">⚠️ Disclaimer</h3>
+            <p style="margin: 0; font-size: 0.95rem; line-height: 1.7; opacity: 0.95;">
+                Queste predizioni sono generate da un sistema AI a scopo informativo e di analisi. 
+                Non costituiscono in alcun modo un consiglio per scommesse o investimenti. 
+                Il calcio è uno sport imprevedibile e nessun sistema può garantire risultati accurati al 100%.
+            </p>
+        </div>
+        """, unsafe_allow_html=True)
 
 # Footer
 st.markdown("""
@@ -1453,6 +1602,13 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
+# Pannello prestazioni: fasi di questa esecuzione (anche come log strutturato
+# e, con ELITEPREDICT_METRICS_FILE, come riga JSON nel file delle metriche)
+perf_summary = perf.emit()
+with st.sidebar.expander("⏱️ Performance"):
+    st.caption(f"Esecuzione completata in {perf_summary['total_ms']:.0f} ms")
+    st.dataframe(perf.to_frame(), use_container_width=True)
+
 
 
 
@@ -0,0 +1,220 @@
+"""
+API HTTP/JSON locale con le statistiche della dashboard, per i servizi che
+interrogano periodicamente i numeri senza aprire una sessione Streamlit.
+
+Endpoint (GET):
+    /api/health       versione del dataset e righe caricate
+    /api/kpi          partite concluse, corrette, accuratezze, partite da giocare
+    /api/leagues      statistiche per campionato
+    /api/confidence   statistiche per livello di confidence
+    /api/match-types  statistiche per tipo di sfida
+    /api/upcoming     partite da giocare (?limit=N)
+    /api/matchdays    riepilogo per giornata di un campionato (?league=...), o
+                      riepilogo e partite di una giornata (?league=...&matchday=N)
+    /api/teams        riepilogo per squadra (?league=...)
+    /api/team         riepilogo e partite di una squadra (?team=...), con gli
+                      scontri diretti se indicato ?opponent=...
+    /api/calibration  punteggi e affidabilità delle probabilità 1/X/2 (?league=...&confidence=...)
+    /api/trend        serie dell'accuratezza (?mode=settimanale|cumulativa|ultime_partite|ultimi_giorni&window=N)
+
+Filtri comuni (?league=Serie A&date=2025-08-23&only_date=1) per kpi, leagues,
+confidence, match-types, upcoming e trend; matchdays, teams e calibration
+leggono solo league, team solo team e opponent, health nessun parametro.
+
+Le risposte sono memorizzate per (versione del dataset, endpoint, parametri):
+una nuova versione del foglio rende obsolete tutte le voci. ETag e
+If-None-Match permettono ai client di ricevere 304 senza corpo.
+
+Esempio:
+    GOOGLE_SHEETS_URL=... python api_server.py --port 8502
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import perf_metrics
+from predictions_data import CACHE_DIR
+from predictions_service import PredictionsService
+from predictions_stats import BoundedLRUCache
+
+logger = logging.getLogger('elitepredict.api')
+
+# Cache delle risposte serializzate (dimensione in MB configurabile)
+RESPONSE_CACHE = BoundedLRUCache(int(os.getenv('ELITEPREDICT_API_CACHE_MB', '32')) * 2**20,
+                                 sizeof=lambda response: len(response[1]))
+# Secondi per cui i client possono riusare una risposta senza richiederla
+MAX_AGE = int(os.getenv('ELITEPREDICT_API_MAX_AGE', '60'))
+
+
+def parse_filters(params: dict) -> dict:
+    """
+    Filtri comuni (campionato, data, solo la data) dai parametri della query.
+    """
+    filters = {'league': params.get('league', 'Tutti')}
+    if params.get('date'):
+        try:
+            filters['date'] = date.fromisoformat(params['date'])
+        except ValueError:
+            raise ValueError(f"Data non valida: {params['date']} (formato AAAA-MM-GG)")
+        filters['only_date'] = params.get('only_date', '').lower() in ('1', 'true', 'si', 'sì')
+    return filters
+
+
+def parse_int(params: dict, name: str) -> int | None:
+    if name not in params:
+        return None
+    try:
+        return int(params[name])
+    except ValueError:
+        raise ValueError(f"Parametro {name} non valido: {params[name]}")
+
+
+def matchdays(service: PredictionsService, params: dict):
+    """
+    Riepiloghi delle giornate del campionato o, con matchday, una sola giornata.
+    """
+    league = params.get('league')
+    if not league or league == 'Tutti':
+        raise ValueError("Il parametro league (campionato) è obbligatorio")
+    matchday = parse_int(params, 'matchday')
+    if matchday is None:
+        return service.matchdays(league)
+    result = service.matchday(league, matchday)
+    if result is None:
+        raise ValueError(f"Giornata {matchday} non trovata per {league}")
+    return result
+
+
+def team(service: PredictionsService, params: dict):
+    """
+    Riepilogo e partite di una squadra, con gli scontri diretti se indicato opponent.
+    """
+    if not params.get('team'):
+        raise ValueError("Il parametro team (squadra) è obbligatorio")
+    result = service.team(params['team'], params.get('opponent'))
+    if result is None:
+        raise ValueError(f"Squadra non trovata: {params['team']}")
+    return result
+
+
+ENDPOINTS = {
+    '/api/health': lambda service, params: {'rows': len(service.dataset())},
+    '/api/kpi': lambda service, params: service.kpis(**parse_filters(params)),
+    '/api/leagues': lambda service, params: service.league_stats(**parse_filters(params)),
+    '/api/confidence': lambda service, params: service.confidence_stats(**parse_filters(params)),
+    '/api/match-types': lambda service, params: service.match_type_stats(**parse_filters(params)),
+    '/api/upcoming': lambda service, params: service.upcoming(parse_int(params, 'limit'), **parse_filters(params)),
+    '/api/matchdays': matchdays,
+    '/api/teams': lambda service, params: service.teams(params.get('league', 'Tutti')),
+    '/api/team': team,
+    '/api/calibration': lambda service, params: service.calibration(params.get('league', 'Tutti'),
+                                                                    params.get('confidence')),
+    '/api/trend': lambda service, params: service.trend(params.get('mode', 'settimanale'),
+                                                        parse_int(params, 'window'), **parse_filters(params)),
+}
+
+
+def build_response(service: PredictionsService, path: str, params: dict) -> tuple:
+    """
+    (ETag, corpo JSON) della risposta, dalla cache se già calcolata per la versione corrente.
+    """
+    version = service.version()
+    key = (version, path, tuple(sorted(params.items())))
+
+    def compute():
+        perf_metrics.annotate(cache='miss')
+        data = ENDPOINTS[path](service, params)
+        body = json.dumps({'version': version, 'data': data}, ensure_ascii=False).encode('utf-8')
+        return '"' + hashlib.sha1(body).hexdigest() + '"', body
+
+    with perf_metrics.stage('risposta', cache='hit'):
+        return RESPONSE_CACHE.get_or_compute(key, compute)
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    """
+    Gestore delle richieste; il servizio è condiviso da tutti i thread del server.
+    """
+    service: PredictionsService = None
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        # Per ogni parametro vale l'ultimo valore indicato
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        perf = perf_metrics.start_run(url.path)
+        try:
+            if url.path not in ENDPOINTS:
+                self.send_json(404, {'error': f"Endpoint sconosciuto: {url.path}"})
+                return
+            try:
+                etag, body = build_response(self.service, url.path, params)
+            except ValueError as e:
+                self.send_json(400, {'error': str(e)})
+                return
+            except Exception as e:
+                logger.exception("Errore nella richiesta %s", self.path)
+                self.send_json(500, {'error': str(e)})
+                return
+
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', f'max-age={MAX_AGE}')
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            perf.emit()
+
+    def send_json(self, status: int, payload: dict):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.info("%s - %s", self.address_string(), format % args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API JSON locale con le statistiche della dashboard")
+    parser.add_argument('--host', default='127.0.0.1', help="indirizzo di ascolto")
+    parser.add_argument('--port', type=int, default=8502, help="porta di ascolto")
+    parser.add_argument('--sheets-url', default=os.getenv('GOOGLE_SHEETS_URL'),
+                        help="URL del foglio (o dei fogli), default GOOGLE_SHEETS_URL")
+    parser.add_argument('--refresh', type=float, default=float(os.getenv('ELITEPREDICT_REFRESH_SECONDS', '300')),
+                        help="secondi tra due aggiornamenti del foglio")
+    args = parser.parse_args()
+    if not args.sheets_url:
+        parser.error("URL Google Sheets non configurato: usa --sheets-url o GOOGLE_SHEETS_URL")
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(name)s %(levelname)s %(message)s')
+    service = PredictionsService(args.sheets_url, refresh_interval=args.refresh, snapshot_dir=CACHE_DIR)
+    service.start()
+    ApiHandler.service = service
+
+    server = ThreadingHTTPServer((args.host, args.port), ApiHandler)
+    logger.info("API in ascolto su http://%s:%d", args.host, args.port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.stop()
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,235 @@
+"""
+Benchmark della pipeline dati della dashboard su fogli sintetici.
+
+Genera export CSV con lo stesso schema del foglio reale (colonne in italiano,
+campionati, livelli di confidence, esiti) e misura separatamente, per ogni
+dimensione, tempo e picco di memoria di ogni fase: download (simulato) +
+parsing + pulizia, refresh senza modifiche e con righe aggiunte, indice dei
+filtri, query dei filtri, aggregazioni e costruzione dell'HTML delle liste.
+
+Esempio:
+    python benchmark.py --sizes 1000 10000 100000 1000000
+"""
+import argparse
+import json
+import time
+import tracemalloc
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+import predictions_data
+from predictions_data import SheetRefresher
+from predictions_render import completed_matches_html, page_slice, upcoming_matches_html
+from predictions_stats import DerivedViews, FilterIndex
+
+LEAGUES = ['Serie A', 'Premier League', 'Bundesliga', 'Ligue 1', 'La Liga']
+CONFIDENCE_LEVELS = ['Alta', 'Media', 'Bassa']
+MATCH_TYPES = ['Favorita casa', 'Favorita ospite', 'Equilibrata']
+RESULTS = np.array(['1', 'X', '2'])
+DOUBLE_CHANCES = np.array(['1X', 'X2', '12'])
+TEAMS_PER_LEAGUE = 20
+FIXTURES_PER_DAY = 50
+PENDING_SHARE = 0.03
+START_DATE = date(2015, 8, 1)
+
+
+def generate_sheet(n_rows: int, seed: int = 0) -> bytes:
+    """
+    Export CSV sintetico di n_rows predizioni, ordinate per data come il foglio
+    reale (le ultime PENDING_SHARE righe sono partite ancora da giocare).
+    """
+    rng = np.random.default_rng(seed)
+
+    match_day = pd.Timestamp(START_DATE) + pd.to_timedelta(np.arange(n_rows) // FIXTURES_PER_DAY, unit='D')
+    league = rng.integers(0, len(LEAGUES), n_rows)
+    home = rng.integers(0, TEAMS_PER_LEAGUE, n_rows)
+    away = (home + rng.integers(1, TEAMS_PER_LEAGUE, n_rows)) % TEAMS_PER_LEAGUE
+    league_names = np.array(LEAGUES)[league]
+    team_names = np.char.add(np.char.add(league_names, ' Squadra '), home.astype(str))
+    away_names = np.char.add(np.char.add(league_names, ' Squadra '), away.astype(str))
+
+    predicted = rng.integers(0, 3, n_rows)
+    actual = rng.integers(0, 3, n_rows)
+    exact_ok = predicted == actual
+    double_ok = exact_ok | (rng.random(n_rows) < 0.5)
+    pending = np.arange(n_rows) >= int(n_rows * (1 - PENDING_SHARE))
+
+    probabilities = rng.dirichlet([4, 3, 3], n_rows) * 100
+
+    # Le date sono poche rispetto alle righe: formattate una volta sola
+    day_labels, day_codes = np.unique(match_day.to_numpy(), return_inverse=True)
+    day_strings = pd.DatetimeIndex(day_labels).strftime('%d/%m/%Y').to_numpy()[day_codes]
+
+    sheet = pd.DataFrame({
+        'Data predizione': day_strings,
+        'Squadra casa': team_names,
+        'Squadra ospite': away_names,
+        'Risultato secco previsto': RESULTS[predicted],
+        'Risultato secco reale': np.where(pending, '', RESULTS[actual]),
+        'Doppia chance prevista': DOUBLE_CHANCES[rng.integers(0, 3, n_rows)],
+        'Confidence': np.array(CONFIDENCE_LEVELS)[rng.integers(0, 3, n_rows)],
+        'Risultato predizione (risultato secco)': np.where(pending, '', np.where(exact_ok, 'Corretto', 'Errato')),
+        'Risultato predizione (doppia chance)': np.where(pending, '', np.where(double_ok, 'Corretto', 'Errato')),
+        'Giornata': 1 + (np.arange(n_rows) // (FIXTURES_PER_DAY * 7)) % 38,
+        'Campionato': league_names,
+        'Status Merged': np.array(MATCH_TYPES)[rng.integers(0, 3, n_rows)],
+        'Data partita': day_strings,
+        'Probabilità Vittoria Casa': np.char.add(probabilities[:, 0].round().astype(int).astype(str), '%'),
+        'Probabilità Pareggio': np.char.add(probabilities[:, 1].round().astype(int).astype(str), '%'),
+        'Probabilità Vittoria Ospite': np.char.add(probabilities[:, 2].round().astype(int).astype(str), '%'),
+    })
+    return sheet.to_csv(index=False, lineterminator='\r\n').encode('utf-8').rstrip(b'\r\n')
+
+
+class StubResponse:
+    """
+    Risposta HTTP minimale servita da StubSession.
+    """
+
+    def __init__(self, content: bytes):
+        self.content = content
+        self.status_code = 200
+        self.headers = {}
+
+    def raise_for_status(self):
+        pass
+
+
+class StubSession:
+    """
+    Sostituisce requests.Session: restituisce sempre il contenuto impostato,
+    così il benchmark misura la pipeline e non la rete.
+    """
+
+    def __init__(self, content: bytes):
+        self.content = content
+
+    def get(self, url, headers=None, timeout=None, **kwargs):
+        return StubResponse(self.content)
+
+
+def timed(func):
+    """
+    Esegue func e restituisce (risultato, millisecondi).
+    """
+    start = time.perf_counter()
+    value = func()
+    return value, (time.perf_counter() - start) * 1000
+
+
+def traced(func):
+    """
+    Esegue func e restituisce (risultato, picco di memoria allocata in MB).
+    """
+    tracemalloc.start()
+    try:
+        value = func()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return value, peak / 2**20
+
+
+def run_stages(content: bytes, appended: bytes, page_size: int, probe) -> list:
+    """
+    Esegue in ordine le fasi della pipeline; probe (timed o traced) misura ognuna.
+    Restituisce [(fase, misura), ...].
+    """
+    measures = []
+
+    def measure(stage, func):
+        value, amount = probe(func)
+        measures.append((stage, amount))
+        return value
+
+    session = StubSession(content)
+    refresher = SheetRefresher('benchmark://sheet', session=session)
+
+    measure('load_data (download + parse + clean)', refresher.refresh)
+    measure('load_data (contenuto invariato)', refresher.refresh)
+    session.content = appended
+    df = measure('load_data (righe aggiunte)', refresher.refresh)
+
+    index = measure('indice filtri', lambda: FilterIndex(df))
+    first_day = df['Data partita'].min()
+    middle_day = df['Data partita'].iloc[len(df) // 2]
+    measure('filtri (3 modalità x 2 campionati)', lambda: [
+        index.query(league, day, only_date=only_date)
+        for league in ('Tutti', LEAGUES[0])
+        for day, only_date in ((None, False), (first_day, False), (middle_day, True))
+    ])
+
+    filtered = index.query('Tutti')
+
+    def derived_views():
+        views = DerivedViews(filtered)
+        views.stats   # aggregazioni calcolate al primo accesso
+        return views
+
+    views = measure('viste derivate + aggregazioni', derived_views)
+
+    measure(f'render storico (pagina da {page_size})',
+            lambda: completed_matches_html(page_slice(views.completed, 1, page_size)))
+    measure('render storico (lista completa)', lambda: completed_matches_html(views.completed))
+    measure(f'render predizioni future (pagina da {page_size})',
+            lambda: upcoming_matches_html(page_slice(views.upcoming, 1, page_size)))
+    measure('render predizioni future (lista completa)', lambda: upcoming_matches_html(views.upcoming))
+    return measures
+
+
+def run_size(size: int, page_size: int = 25) -> list:
+    """
+    Misura tutte le fasi della pipeline su un foglio sintetico di size righe.
+    Tempi e memoria vengono rilevati in due passate separate, perché
+    tracemalloc rallenta sensibilmente l'esecuzione.
+    """
+    content = generate_sheet(size)
+    appended = content + b'\r\n' + generate_sheet(max(size // 100, 1), seed=1).split(b'\r\n', 1)[1]
+
+    timings = run_stages(content, appended, page_size, timed)
+    peaks = run_stages(content, appended, page_size, traced)
+    return [
+        {'rows': size, 'stage': stage, 'ms': round(ms, 2), 'peak_mb': round(peak_mb, 2)}
+        for (stage, ms), (_, peak_mb) in zip(timings, peaks)
+    ]
+
+
+def format_report(results: list) -> str:
+    """
+    Tabella testuale dei risultati.
+    """
+    lines = [f"{'righe':>9}  {'fase':<45} {'ms':>10} {'picco MB':>10}"]
+    for row in results:
+        lines.append(f"{row['rows']:>9}  {row['stage']:<45} {row['ms']:>10.2f} {row['peak_mb']:>10.2f}")
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark della pipeline dati della dashboard")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000, 1_000_000],
+                        help="numero di righe dei fogli sintetici")
+    parser.add_argument('--page-size', type=int, default=25, help="partite per pagina nel render")
+    parser.add_argument('--chunk-rows', type=int,
+                        help="righe per blocco nel parsing del CSV (0 = tutto insieme, "
+                             "default ELITEPREDICT_CSV_CHUNK_ROWS)")
+    parser.add_argument('--json', help="salva i risultati anche in formato JSON in questo file")
+    args = parser.parse_args()
+
+    if args.chunk_rows is not None:
+        predictions_data.CSV_CHUNK_ROWS = args.chunk_rows
+
+    results = []
+    for size in args.sizes:
+        size_results = run_size(size, args.page_size)
+        results.extend(size_results)
+        print(format_report(size_results), end='\n\n', flush=True)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+"""
+Misure delle prestazioni per fase (icona, caricamento dati, filtri,
+aggregazioni, render delle schede).
+
+Ogni esecuzione dello script Streamlit crea un PerfRecorder con start_run();
+il codice della pipeline registra le proprie fasi con stage()/annotate(), che
+non fanno nulla se nel thread corrente non c'è un recorder attivo (ad esempio
+nei thread di refresh in background). A fine esecuzione emit() scrive un log
+strutturato (JSON) e, se ELITEPREDICT_METRICS_FILE è impostata, una riga JSON
+nel file delle metriche.
+
+Il logger elitepredict.perf non ha handler propri: con la configurazione di
+logging di Streamlit i log non compaiono. ELITEPREDICT_PERF_LOG=1 aggiunge un
+handler su stderr a livello INFO.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+logger = logging.getLogger('elitepredict.perf')
+
+METRICS_FILE = os.getenv('ELITEPREDICT_METRICS_FILE')
+PERF_LOG = os.getenv('ELITEPREDICT_PERF_LOG', '0') not in ('', '0')
+
+if PERF_LOG and not logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter('%(asctime)s %(name)s %(message)s'))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+
+_current = threading.local()
+_file_lock = threading.Lock()
+
+
+class PerfRecorder:
+    """
+    Raccoglie le fasi di un'esecuzione: nome, livello di annidamento,
+    millisecondi e informazioni aggiuntive (cache hit/miss, bytes scaricati,
+    righe, ...).
+    """
+
+    def __init__(self, name: str = 'rerun'):
+        self.name = name
+        self.started_at = time.time()
+        self.stages = []
+        self._stack = []
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str, **info):
+        """
+        Misura il blocco come fase `name`. Il dizionario restituito può essere
+        arricchito durante il blocco.
+        """
+        entry = {'stage': name, 'depth': len(self._stack), **info}
+        # Le fasi sono elencate in ordine di inizio, le annidate dopo la fase che le contiene
+        self.stages.append(entry)
+        self._stack.append(entry)
+        start = time.perf_counter()
+        try:
+            yield entry
+        finally:
+            entry['ms'] = round((time.perf_counter() - start) * 1000, 2)
+            self._stack.remove(entry)
+
+    def annotate(self, **info):
+        """
+        Aggiunge informazioni alla fase più interna in corso.
+        """
+        if self._stack:
+            self._stack[-1].update(info)
+
+    def summary(self) -> dict:
+        return {
+            'run': self.name,
+            'timestamp': self.started_at,
+            'total_ms': round((time.perf_counter() - self._start) * 1000, 2),
+            'stages': self.stages,
+        }
+
+    def to_frame(self):
+        """
+        Le fasi come DataFrame (una riga per fase, nomi annidati indentati).
+        """
+        frame = pd.DataFrame(self.stages)
+        if frame.empty:
+            return frame
+        frame['stage'] = ['\u2003' * depth + name for depth, name in zip(frame['depth'], frame['stage'])]
+        return frame.drop(columns='depth').set_index('stage')
+
+    def emit(self, metrics_file: str | None = METRICS_FILE):
+        """
+        Scrive il riepilogo come log strutturato e, se richiesto, nel file delle
+        metriche. Restituisce il riepilogo.
+        """
+        summary = self.summary()
+        line = json.dumps(summary, ensure_ascii=False, default=str)
+        logger.info(line)
+        if metrics_file:
+            try:
+                with _file_lock, open(metrics_file, 'a', encoding='utf-8') as f:
+                    f.write(line + '\n')
+            except OSError:
+                logger.exception("Impossibile scrivere il file delle metriche %s", metrics_file)
+        return summary
+
+
+def start_run(name: str = 'rerun') -> PerfRecorder:
+    """
+    Crea il recorder dell'esecuzione corrente e lo associa al thread.
+    """
+    recorder = PerfRecorder(name)
+    _current.recorder = recorder
+    return recorder
+
+
+def current() -> PerfRecorder | None:
+    return getattr(_current, 'recorder', None)
+
+
+@contextmanager
+def stage(name: str, **info):
+    """
+    Come PerfRecorder.stage sul recorder del thread; senza recorder non misura nulla.
+    """
+    recorder = current()
+    if recorder is None:
+        yield dict(info)
+        return
+    with recorder.stage(name, **info) as entry:
+        yield entry
+
+
+def annotate(**info):
+    """
+    Come PerfRecorder.annotate sul recorder del thread, se presente.
+    """
+    recorder = current()
+    if recorder is not None:
+        recorder.annotate(**info)
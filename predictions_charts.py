@@ -0,0 +1,209 @@
+"""
+Grafici Plotly della dashboard con cache delle specifiche serializzate.
+
+Ogni grafico è costruito da una funzione pura (tabella aggregata + parametri
+di layout). La specifica JSON prodotta da Plotly viene memorizzata per
+(grafico, hash della tabella, parametri) e condivisa tra rerun e sessioni:
+finché gli aggregati non cambiano, un rerun ricrea la figura dalla specifica
+senza rifare la costruzione (px/go) né la validazione.
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import plotly.io as pio
+
+import perf_metrics
+from predictions_stats import BoundedLRUCache
+
+# Cache delle specifiche (JSON) dei grafici, limitata in MB
+FIGURE_CACHE = BoundedLRUCache(int(os.getenv('ELITEPREDICT_FIGURE_CACHE_MB', '32')) * 2**20, sizeof=len)
+
+# Ordine dei livelli di confidence nei grafici
+CONFIDENCE_ORDER = {'Bassa': 0, 'Media': 1, 'Alta': 2}
+
+
+def frame_digest(frame: pd.DataFrame) -> str:
+    """
+    Impronta del contenuto di una tabella aggregata (valori, indice, nomi delle colonne).
+    """
+    digest = hashlib.sha1()
+    digest.update(pd.util.hash_pandas_object(frame, index=True).to_numpy().tobytes())
+    digest.update(repr((list(frame.columns), frame.index.names)).encode())
+    return digest.hexdigest()
+
+
+def cached_figure(builder, table: pd.DataFrame, **params) -> go.Figure:
+    """
+    Figura di builder(table, **params), dalla cache se la stessa tabella è già
+    stata disegnata con gli stessi parametri.
+    """
+    key = (builder.__name__, frame_digest(table), tuple(sorted(params.items())))
+
+    def compute():
+        perf_metrics.annotate(cache='miss')
+        return pio.to_json(builder(table, **params), validate=False)
+
+    with perf_metrics.stage(f'grafico {builder.__name__}', cache='hit'):
+        spec = FIGURE_CACHE.get_or_compute(key, compute)
+        # La specifica è già stata validata quando è stata costruita
+        return go.Figure(json.loads(spec), _validate=False)
+
+
+def match_type_figure(table: pd.DataFrame, outcome: str, title: str, color_scale: str) -> go.Figure:
+    """
+    Barre dell'accuratezza per tipo sfida; outcome: 'Secco' o 'Doppia'.
+    table: aggregazione per 'Status Merged' (compute_statistics).
+    """
+    stats = table.round(1).rename(columns={
+        f'Accuratezza {outcome} %': 'Accuratezza', f'Corrette {outcome}': 'Corrette'
+    })[['Accuratezza', 'Totale', 'Corrette']].reset_index()
+
+    fig = px.bar(
+        stats,
+        x='Status Merged',
+        y='Accuratezza',
+        title=title,
+        labels={'Accuratezza': 'Accuratezza %', 'Status Merged': 'Tipo Sfida'},
+        color='Accuratezza',
+        color_continuous_scale=color_scale,
+        hover_data={
+            'Accuratezza': ':.1f',
+            'Totale': True,
+            'Corrette': True
+        }
+    )
+    fig.update_traces(
+        hovertemplate='<b>%{x}</b><br>Accuratezza: %{y:.1f}%<br>Corrette: %{customdata[1]}<br>Totale: %{customdata[0]}<extra></extra>'
+    )
+    fig.update_layout(height=400)
+    return fig
+
+
+def confidence_figure(table: pd.DataFrame, title: str, ordered: bool = False,
+                      decimals: int | None = None) -> go.Figure:
+    """
+    Barre affiancate dell'accuratezza (secco e doppia chance) per livello di confidence.
+    ordered: livelli da Bassa ad Alta; decimals: arrotondamento dei valori.
+    """
+    stats = table.reset_index() if decimals is None else table.round(decimals).reset_index()
+    if ordered:
+        order = stats['Confidence'].astype(str).map(CONFIDENCE_ORDER)
+        stats = stats.iloc[np.argsort(order.to_numpy(), kind='stable')]
+
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        name='Risultato Secco',
+        x=stats['Confidence'],
+        y=stats['Accuratezza Secco %'],
+        marker_color='#ff6b35'
+    ))
+    fig.add_trace(go.Bar(
+        name='Doppia Chance',
+        x=stats['Confidence'],
+        y=stats['Accuratezza Doppia %'],
+        marker_color='#4facfe'
+    ))
+
+    fig.update_layout(
+        title=title,
+        xaxis_title='Livello Confidence',
+        yaxis_title='Accuratezza (%)',
+        barmode='group',
+        height=400,
+        showlegend=True
+    )
+    return fig
+
+
+def trend_figure(trend: pd.DataFrame, title: str) -> go.Figure:
+    """
+    Linee dell'accuratezza nel tempo con le bande dell'intervallo di Wilson al 95%.
+    trend: serie del motore dei trend (indice = giorno o settimana).
+    """
+    trend = trend.reset_index()
+    x_col = trend.columns[0]
+
+    fig = go.Figure()
+    for label, name, color, band in (('Secco', 'Risultato Secco', '#ff6b35', 'rgba(255,107,53,0.15)'),
+                                     ('Doppia', 'Doppia Chance', '#4facfe', 'rgba(79,172,254,0.15)')):
+        # Banda dell'intervallo di Wilson al 95% (alto, poi basso con riempimento)
+        fig.add_trace(go.Scatter(
+            x=trend[x_col],
+            y=trend[f'IC {label} alto %'],
+            mode='lines',
+            line=dict(width=0),
+            hoverinfo='skip',
+            showlegend=False
+        ))
+        fig.add_trace(go.Scatter(
+            x=trend[x_col],
+            y=trend[f'IC {label} basso %'],
+            mode='lines',
+            line=dict(width=0),
+            fill='tonexty',
+            fillcolor=band,
+            hoverinfo='skip',
+            showlegend=False
+        ))
+        fig.add_trace(go.Scatter(
+            x=trend[x_col],
+            y=trend[f'Accuratezza {label} %'],
+            mode='lines+markers',
+            name=name,
+            line=dict(color=color, width=3),
+            customdata=trend['Totale'],
+            hovertemplate='%{y:.1f}% su %{customdata} partite'
+        ))
+
+    fig.update_layout(
+        title=title,
+        xaxis_title=x_col,
+        yaxis_title='Accuratezza (%)',
+        height=400,
+        hovermode='x unified'
+    )
+    return fig
+
+
+def reliability_figure(table: pd.DataFrame, title: str) -> go.Figure:
+    """
+    Diagramma di affidabilità: frequenza osservata contro probabilità media
+    prevista per fascia, con la diagonale della calibrazione perfetta.
+    table: tabella di affidabilità (motore dei punteggi).
+    """
+    stats = table.reset_index()
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=[0, 100],
+        y=[0, 100],
+        mode='lines',
+        name='Calibrazione perfetta',
+        line=dict(color='#94a3b8', dash='dash'),
+        hoverinfo='skip'
+    ))
+    fig.add_trace(go.Scatter(
+        x=stats['Probabilità media %'],
+        y=stats['Frequenza osservata %'],
+        mode='lines+markers',
+        name='Probabilità 1/X/2',
+        line=dict(color='#667eea', width=3),
+        customdata=stats[['Fascia', 'Previsioni']],
+        hovertemplate='<b>%{customdata[0]}</b><br>Prevista: %{x:.1f}%<br>Osservata: %{y:.1f}%'
+                      '<br>Previsioni: %{customdata[1]}<extra></extra>'
+    ))
+
+    fig.update_layout(
+        title=title,
+        xaxis_title='Probabilità prevista (%)',
+        yaxis_title='Frequenza osservata (%)',
+        xaxis_range=[0, 100],
+        yaxis_range=[0, 100],
+        height=400
+    )
+    return fig
@@ -0,0 +1,942 @@
+"""
+Livello dati della dashboard: download dell'export CSV di Google Sheets,
+pulizia del DataFrame delle predizioni, aggiornamento incrementale e
+snapshot colonnare su disco per l'avvio a freddo.
+"""
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from urllib.parse import parse_qs, unquote, urlparse
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import requests
+from requests.adapters import HTTPAdapter
+from pandas.api.types import union_categoricals
+
+import perf_metrics
+
+logger = logging.getLogger(__name__)
+
+# Cartella della cache locale (snapshot del dataset, icona, ...)
+CACHE_DIR = os.getenv('ELITEPREDICT_CACHE_DIR',
+                      os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache'))
+SNAPSHOT_METADATA_KEY = b'elitepredict'
+
+# Snapshot condivisi tra processi (repliche della dashboard e API sulla stessa
+# CACHE_DIR): una replica scarica il foglio, le altre caricano il suo snapshot
+SHARED_CACHE = os.getenv('ELITEPREDICT_SHARED_CACHE', '1') != '0'
+# Un controllo del foglio fatto da un altro processo vale per questa frazione
+# dell'intervallo di aggiornamento (margine per i timer non allineati)
+SHARED_CHECK_RATIO = 0.9
+# Secondi tra due controlli degli snapshot scritti dagli altri processi
+SHARED_POLL_SECONDS = float(os.getenv('ELITEPREDICT_SHARED_POLL_SECONDS', '5'))
+LOCK_POLL_SECONDS = 0.2
+
+# Colonne del foglio delle predizioni
+DATE_COLUMNS = ['Data predizione', 'Data partita']
+DATE_FORMAT = '%d/%m/%Y'
+TEXT_COLUMNS = ['Risultato secco reale', 'Risultato predizione (risultato secco)',
+                'Risultato predizione (doppia chance)']
+PENDING = 'Da giocare'
+
+# Schema compatto del dataset: categoriche per le colonne testuali a bassa
+# cardinalità (le etichette restano solo nelle categorie), esiti codificati
+# int8 con categorie fisse, interi piccoli e float32 per i numeri
+CATEGORY_COLUMNS = ['Campionato', 'Confidence', 'Status Merged', 'Squadra casa', 'Squadra ospite',
+                    'Risultato secco previsto', 'Risultato secco reale', 'Doppia chance prevista']
+OUTCOME_COLUMNS = ['Risultato predizione (risultato secco)', 'Risultato predizione (doppia chance)']
+OUTCOME_LABELS = [PENDING, 'Errato', 'Corretto']   # codici 0, 1, 2
+SMALL_INT_COLUMNS = ['Giornata']
+PROBABILITY_COLUMNS = ['Probabilità Vittoria Casa', 'Probabilità Pareggio', 'Probabilità Vittoria Ospite']
+# Colonna derivata: True se le tre probabilità sono presenti e la loro somma è
+# 100 entro PROBABILITY_SUM_TOLERANCE punti (arrotondamenti del foglio)
+PROBABILITY_VALID_COLUMN = 'Probabilità valide'
+PROBABILITY_SUM_TOLERANCE = 2.0
+# Colonne lette sempre come testo: un blocco o una coda di poche righe con
+# soli esiti '1'/'2' non deve diventare numerico (1.0) e cambiare categorie
+TEXT_DTYPES = {col: str for col in dict.fromkeys(TEXT_COLUMNS + CATEGORY_COLUMNS)}
+# Righe per blocco nella lettura del CSV (0 = tutto il file in una volta)
+CSV_CHUNK_ROWS = int(os.getenv('ELITEPREDICT_CSV_CHUNK_ROWS', '50000'))
+
+# Colonna con il foglio di provenienza nei dataset uniti da più fogli
+SOURCE_COLUMN = 'Fonte'
+
+# Colonne intere derivate dalle date e salvate con il dataset: ordinale del
+# giorno (giorni dal 1970-01-01) e chiave della settimana ISO (ordinale del
+# lunedì), così filtri e trend lavorano su interi senza riconvertire le date
+DAY_COLUMNS = {'Data partita': 'Giorno partita', 'Data predizione': 'Giorno predizione'}
+WEEK_COLUMN = 'Settimana partita'
+
+# Ordinale dei giorni senza data: in coda all'ordinamento
+NO_DATE = np.iinfo(np.int32).max
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def to_day_ordinal(value) -> int:
+    """
+    Converte una data (date, datetime o Timestamp) nel numero di giorni dal 1970-01-01.
+    """
+    return int(np.datetime64(pd.Timestamp(value).date(), 'D').astype(np.int64))
+
+
+def from_day_ordinal(day: int) -> date:
+    """
+    Inverso di to_day_ordinal.
+    """
+    return date.fromordinal(EPOCH_ORDINAL + int(day))
+
+
+def day_ordinals(dates: pd.Series) -> np.ndarray:
+    """
+    Ordinali (int32) dei giorni di una colonna datetime; NaT diventa NO_DATE.
+    Una colonna di ordinali (es. DAY_COLUMNS) viene restituita così com'è.
+    """
+    if pd.api.types.is_integer_dtype(dates):
+        return dates.to_numpy()
+    days = dates.to_numpy(dtype='datetime64[ns]').astype('datetime64[D]').astype(np.int64)
+    days[dates.isna().to_numpy()] = NO_DATE
+    return days.astype(np.int32)
+
+
+def week_ordinals(days: np.ndarray) -> np.ndarray:
+    """
+    Chiave della settimana ISO di ogni ordinale: l'ordinale del lunedì
+    (il 1970-01-01 era un giovedì). NO_DATE resta NO_DATE.
+    """
+    weeks = days - (days + 3) % 7
+    return np.where(days == NO_DATE, NO_DATE, weeks).astype(np.int32)
+
+
+def week_label(week: int) -> str:
+    """
+    Etichetta di una settimana, es. '2025-08-18/2025-08-24'.
+    """
+    return f'{from_day_ordinal(week)}/{from_day_ordinal(week + 6)}'
+
+
+def parse_dates(values: pd.Series) -> pd.Series:
+    """
+    Converte una colonna di date 'gg/mm/aaaa' analizzando una sola volta ogni
+    valore distinto (le giornate sono poche rispetto alle partite) e
+    riportando il risultato sulle righe. Valori non validi diventano NaT.
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    codes, uniques = pd.factorize(values)
+    parsed = pd.to_datetime(pd.Series(uniques, dtype=object), format=DATE_FORMAT, errors='coerce')
+    # Il codice -1 (valore mancante) prende l'ultimo elemento: NaT
+    lookup = np.append(parsed.to_numpy(), np.array(['NaT'], dtype=parsed.dtype))
+    return pd.Series(lookup[codes], index=values.index, name=values.name)
+
+
+def clean_predictions(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Pulizia e preprocessing dei dati letti dal CSV:
+    date in formato datetime, righe vuote rimosse, esiti mancanti = 'Da giocare'.
+    """
+    df.columns = df.columns.str.strip()
+
+    # Converte le date in formato corretto se necessario
+    for col in DATE_COLUMNS:
+        if col in df.columns:
+            df[col] = parse_dates(df[col])
+
+    # Rimuove righe completamente vuote
+    df = df.dropna(how='all').reset_index(drop=True)
+
+    # Sostituisce NaN con 'Da giocare' per le colonne degli esiti
+    for col in TEXT_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].fillna(PENDING)
+
+    return apply_schema(df)
+
+
+def apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Applica i tipi compatti alle colonne del dataset (vedi CATEGORY_COLUMNS,
+    OUTCOME_COLUMNS, SMALL_INT_COLUMNS e PROBABILITY_COLUMNS) e aggiunge le
+    colonne intere derivate dalle date (DAY_COLUMNS e WEEK_COLUMN) e la
+    maschera delle probabilità (PROBABILITY_VALID_COLUMN).
+    """
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+
+    for col in OUTCOME_COLUMNS:
+        if col in df.columns:
+            # Le etichette standard hanno sempre gli stessi codici; eventuali
+            # valori inattesi vengono aggiunti in coda invece di andare persi
+            values = df[col].astype('category')
+            extra = sorted(set(values.cat.categories) - set(OUTCOME_LABELS))
+            df[col] = values.cat.set_categories(OUTCOME_LABELS + extra)
+
+    for col in SMALL_INT_COLUMNS:
+        if col in df.columns:
+            values = pd.to_numeric(df[col], errors='coerce')
+            df[col] = values.astype('int16') if values.notna().all() else values.astype('float32')
+
+    normalize_probabilities(df)
+
+    for col, day_col in DAY_COLUMNS.items():
+        if col in df.columns:
+            df[day_col] = day_ordinals(parse_dates(df[col]))
+    if 'Giorno partita' in df.columns:
+        df[WEEK_COLUMN] = week_ordinals(df['Giorno partita'].to_numpy())
+
+    return df
+
+
+def parse_probabilities(values: pd.Series) -> pd.Series:
+    """
+    Converte una colonna di probabilità ('45%', '30,5', 24.5, ...) in float32.
+    """
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype('float32')
+    cleaned = (values.astype('string').str.strip()
+               .str.rstrip('%').str.strip()
+               .str.replace(',', '.', regex=False))
+    return pd.to_numeric(cleaned, errors='coerce').astype('float32')
+
+
+def percent_marked(values: pd.Series) -> np.ndarray:
+    """
+    Maschera dei valori scritti con il simbolo '%' (mai per colonne numeriche).
+    """
+    if pd.api.types.is_numeric_dtype(values):
+        return np.zeros(len(values), dtype=bool)
+    return values.astype('string').str.contains('%', regex=False).fillna(False).to_numpy(dtype=bool)
+
+
+def normalize_probabilities(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Converte le probabilità 1/X/2 in percentuali float32 (0-100) e aggiunge
+    la colonna PROBABILITY_VALID_COLUMN. Sono portate in percentuale solo le
+    righe espresse come frazioni: tutti e tre i valori presenti, nessuno
+    scritto con '%' e somma circa 1 invece di 100. Valori negativi o oltre
+    100 diventano mancanti.
+    """
+    columns = [col for col in PROBABILITY_COLUMNS if col in df.columns]
+    if not columns:
+        return df
+
+    probs = np.column_stack([parse_probabilities(df[col]).to_numpy(dtype=np.float32, na_value=np.nan)
+                             for col in columns])
+    if len(columns) == len(PROBABILITY_COLUMNS):
+        marked = np.column_stack([percent_marked(df[col]) for col in columns]).any(axis=1)
+        totals = probs.sum(axis=1)
+        fractions = (np.isfinite(totals) & ~marked
+                     & (totals > 0) & (totals <= 1 + PROBABILITY_SUM_TOLERANCE / 100))
+        probs[fractions] *= 100
+    with np.errstate(invalid='ignore'):
+        probs[(probs < 0) | (probs > 100)] = np.nan
+
+    for i, col in enumerate(columns):
+        df[col] = probs[:, i]
+    valid = np.zeros(len(df), dtype=bool)
+    if len(columns) == len(PROBABILITY_COLUMNS):
+        valid = np.isfinite(probs).all(axis=1) & (np.abs(probs.sum(axis=1) - 100) <= PROBABILITY_SUM_TOLERANCE)
+    df[PROBABILITY_VALID_COLUMN] = valid
+    return df
+
+
+def concat_predictions(frames: list) -> pd.DataFrame:
+    """
+    Concatena più DataFrame già puliti mantenendo le colonne categoriche
+    (le categorie vengono unite invece di ricadere su object).
+    """
+    frames = [f for f in frames if f is not None]
+    categories = {}
+    for col in dict.fromkeys(c for f in frames for c in f.columns):
+        parts = [f[col] for f in frames if col in f.columns]
+        if len(parts) > 1 and all(isinstance(p.dtype, pd.CategoricalDtype) for p in parts):
+            categories[col] = union_categoricals([p.array for p in parts]).categories
+
+    if categories:
+        frames = [
+            f.assign(**{col: f[col].cat.set_categories(cats)
+                        for col, cats in categories.items() if col in f.columns})
+            for f in frames
+        ]
+    return pd.concat(frames, ignore_index=True)
+
+
+def dataset_version(df: pd.DataFrame) -> str:
+    """
+    Identificativo della versione del dataset, usato come chiave per le cache
+    derivate (indici, aggregati, ...). Per i DataFrame che non arrivano dal
+    refresher viene calcolato un hash del contenuto.
+    """
+    version = df.attrs.get('version')
+    if version is None:
+        version = str(pd.util.hash_pandas_object(df, index=False).sum())
+    return version
+
+
+def parse_sheet_url(url: str):
+    """
+    Estrae automaticamente sheet_id e gid da un Google Sheets URL.
+    Restituisce (sheet_id, gid_or_None).
+    """
+    url = (url or "").strip()
+    parsed = urlparse(url)
+
+    # 1) Prova ad ottenere l'id dal percorso /d/<id>/
+    m = re.search(r'/d/([a-zA-Z0-9-_]+)', parsed.path)
+    if m:
+        sheet_id = m.group(1)
+    else:
+        # 2) Prova a trovare id nella query (es. ?id=<id>)
+        qs = parse_qs(parsed.query)
+        id_list = qs.get('id') or qs.get('spreadsheetId')
+        if id_list:
+            sheet_id = id_list[0]
+        else:
+            # 3) Cerca nell'fragment
+            frag = unquote(parsed.fragment or "")
+            m2 = re.search(r'id=([a-zA-Z0-9-_]+)', frag)
+            if m2:
+                sheet_id = m2.group(1)
+            else:
+                raise ValueError("Impossibile trovare lo sheet id nell'URL fornito.")
+
+    # Estrai il gid (può essere in query o nel fragment)
+    qs = parse_qs(parsed.query)
+    gid = None
+    if 'gid' in qs:
+        gid = qs['gid'][0]
+    else:
+        frag = unquote(parsed.fragment or "")
+        m_gid = re.search(r'gid=(\d+)', frag)
+        if m_gid:
+            gid = m_gid.group(1)
+        else:
+            m_gid2 = re.search(r'gid[:=](\d+)', frag)
+            if m_gid2:
+                gid = m_gid2.group(1)
+
+    return sheet_id, gid
+
+
+def make_csv_export_url(sheet_id: str, gid: str | None = None) -> str:
+    """
+    Costruisce l'URL di esportazione CSV per Google Sheets.
+    """
+    if gid:
+        return f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv&gid={gid}"
+    else:
+        return f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv"
+
+
+def parse_sheet_sources(value: str):
+    """
+    Fogli da caricare indicati in GOOGLE_SHEETS_URL: uno o più URL separati
+    da virgole, punti e virgola o spazi; un numero da solo è un altro gid
+    dell'ultimo foglio indicato.
+    Restituisce [(etichetta, csv_url), ...] senza duplicati.
+    """
+    sheets = []
+    sheet_id = None
+    for entry in re.split(r'[\s,;]+', (value or "").strip()):
+        if not entry:
+            continue
+        if entry.isdigit():
+            if sheet_id is None:
+                raise ValueError("Indica l'URL del foglio prima dei gid.")
+            gid = entry
+        else:
+            sheet_id, gid = parse_sheet_url(entry)
+        if (sheet_id, gid) not in sheets:
+            sheets.append((sheet_id, gid))
+
+    # Etichette della colonna Fonte: la scheda basta se il foglio è uno solo
+    single_sheet = len({sheet_id for sheet_id, _ in sheets}) == 1
+    sources = []
+    for sheet_id, gid in sheets:
+        label = f"gid {gid}" if gid else "prima scheda"
+        if not single_sheet:
+            label = f"{sheet_id[:12]} {label}"
+        sources.append((label, make_csv_export_url(sheet_id, gid)))
+    return sources
+
+
+def parse_predictions_csv(content: bytes, chunk_rows: int | None = None) -> pd.DataFrame:
+    """
+    Legge e pulisce un export CSV (in bytes) del foglio delle predizioni.
+
+    Il CSV viene letto a blocchi di chunk_rows righe (default CSV_CHUNK_ROWS)
+    e ogni blocco viene pulito e convertito nei tipi compatti prima di
+    leggere il successivo: le colonne di testo non convertite esistono solo
+    per un blocco alla volta, quindi la memoria di picco cresce con il
+    dataset compatto e non con il foglio in formato testo.
+    """
+    if chunk_rows is None:
+        chunk_rows = CSV_CHUNK_ROWS
+    if chunk_rows > 0:
+        with perf_metrics.stage('parse + clean', bytes=len(content), chunk_rows=chunk_rows) as entry:
+            chunks = [clean_predictions(chunk)
+                      for chunk in pd.read_csv(io.BytesIO(content), chunksize=chunk_rows, dtype=TEXT_DTYPES)]
+            entry['chunks'] = len(chunks)
+            if chunks:
+                df = chunks[0] if len(chunks) == 1 else concat_predictions(chunks)
+                entry['rows'] = len(df)
+                return df
+
+    with perf_metrics.stage('parse', bytes=len(content)) as entry:
+        raw = pd.read_csv(io.BytesIO(content), dtype=TEXT_DTYPES)
+        entry['rows'] = len(raw)
+    with perf_metrics.stage('clean') as entry:
+        df = clean_predictions(raw)
+        entry['rows'] = len(df)
+    return df
+
+
+class FileLock:
+    """
+    Lock tra processi basato su un file creato in modo esclusivo
+    (O_CREAT | O_EXCL, disponibile su tutte le piattaforme). Un file più
+    vecchio di stale secondi è di un processo terminato e viene rimosso.
+    Usato come context manager restituisce False se il lock non è stato
+    ottenuto entro timeout secondi.
+    """
+
+    def __init__(self, path: str, timeout: float, stale: float):
+        self.path = path
+        self.timeout = timeout
+        self.stale = stale
+        self.acquired = False
+
+    def acquire(self) -> bool:
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                try:
+                    age = time.time() - os.path.getmtime(self.path)
+                except OSError:
+                    continue   # rilasciato nel frattempo
+                if age > self.stale:
+                    logger.warning("Rimosso il lock scaduto %s", self.path)
+                    try:
+                        os.remove(self.path)
+                    except OSError:
+                        pass
+                    continue
+                if time.monotonic() >= deadline:
+                    return False
+                time.sleep(LOCK_POLL_SECONDS)
+                continue
+            except OSError:
+                logger.exception("Impossibile creare il lock %s", self.path)
+                return False
+            with os.fdopen(fd, 'w') as f:
+                f.write(f'{os.getpid()} {time.time()}')
+            self.acquired = True
+            return True
+
+    def release(self):
+        if self.acquired:
+            self.acquired = False
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+    def __enter__(self) -> bool:
+        return self.acquire()
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class BaseRefresher:
+    """
+    Parte comune dei refresher: refresh() "single-flight" (più chiamate
+    concorrenti si riducono a un solo aggiornamento) e thread di
+    aggiornamento periodico. Le sottoclassi implementano _refresh() e
+    mantengono df, digest e fetched; ogni nuovo DataFrame viene sostituito
+    in blocco, mai modificato, così i lettori usano sempre l'ultimo valido.
+    Con gli snapshot condivisi (shared) le sottoclassi implementano anche
+    sync_shared(), che adotta gli snapshot scritti dagli altri processi.
+    """
+    shared = False
+
+    def __init__(self, name: str):
+        self.name = name
+        self.df = None
+        self.digest = None      # identifica il contenuto del dataset corrente
+        self.last_mode = None   # come è stato ottenuto l'ultimo dataset
+        self.fetched = False    # True dopo il primo aggiornamento riuscito in questo processo
+
+        self._lock = threading.Lock()
+        self._generation = 0    # refresh completati (riusciti o no)
+        self._background = None
+        self._background_lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def refresh(self) -> pd.DataFrame:
+        """
+        Aggiorna il dataset (se cambiato) e restituisce il DataFrame.
+        Se un altro thread sta già aggiornando, ne attende il risultato
+        invece di ripetere download e parsing.
+        """
+        generation = self._generation
+        with self._lock:
+            if self._generation != generation and self.df is not None:
+                return self.df
+            try:
+                return self._refresh()
+            finally:
+                self._generation += 1
+
+    def _refresh(self) -> pd.DataFrame:
+        raise NotImplementedError
+
+    def sync_shared(self) -> bool:
+        """
+        Adotta la versione salvata da un altro processo, se più recente.
+        Restituisce True se il dataset è cambiato.
+        """
+        return False
+
+    def start_background(self, interval: float, on_change=None):
+        """
+        Avvia (una sola volta) il thread daemon che chiama refresh() ogni
+        interval secondi; se nessun aggiornamento è ancora riuscito il primo
+        refresh parte subito. Con gli snapshot condivisi, tra un refresh e
+        l'altro controlla ogni SHARED_POLL_SECONDS gli snapshot degli altri
+        processi. on_change viene chiamata quando il dataset cambia.
+        """
+        def run():
+            next_refresh = time.monotonic() + (interval if self.fetched else 0)
+            poll = min(interval, SHARED_POLL_SECONDS) if self.shared else interval
+            while not self._stop.wait(max(0.0, min(poll, next_refresh - time.monotonic()))):
+                digest = self.digest
+                try:
+                    if time.monotonic() >= next_refresh:
+                        next_refresh = time.monotonic() + interval
+                        self.refresh()
+                    else:
+                        self.sync_shared()
+                except Exception:
+                    logger.exception("Aggiornamento in background fallito per %s", self.name)
+                    continue
+                if on_change is not None and self.digest != digest:
+                    on_change()
+
+        with self._background_lock:
+            if self._background is not None and self._background.is_alive():
+                return
+            self._stop.clear()
+            self._background = threading.Thread(target=run, name='sheet-refresher', daemon=True)
+            self._background.start()
+
+    def stop_background(self):
+        """
+        Ferma il thread di aggiornamento (al termine dell'eventuale refresh in corso).
+        """
+        self._stop.set()
+
+
+class SheetRefresher(BaseRefresher):
+    """
+    Mantiene l'ultimo DataFrame letto da un export CSV di Google Sheets e lo
+    aggiorna evitando lavoro inutile:
+    - richiesta condizionale con ETag/Last-Modified (304 = nessun download);
+    - contenuto identico (stesso hash) = riuso del DataFrame già elaborato;
+    - sole righe aggiunte in coda = parsing e pulizia della sola coda.
+
+    Se è indicata una snapshot_dir, ogni nuova versione del dataset viene
+    salvata su disco (Feather non compresso) e un nuovo processo può
+    ripartire da lì senza attendere Google Sheets.
+
+    Con shared_max_age lo snapshot è condiviso tra i processi che usano la
+    stessa snapshot_dir: il download avviene sotto un lock file e viene
+    registrato nel file .checked; un processo che trova un controllo più
+    recente di shared_max_age secondi carica lo snapshot (memory mapping)
+    invece di scaricare il foglio, quindi il foglio viene scaricato una volta
+    per intervallo qualunque sia il numero di repliche, e tutte usano la
+    stessa versione.
+    """
+
+    def __init__(self, csv_url: str, session: requests.Session | None = None, timeout: float = 30,
+                 snapshot_dir: str | None = None, shared_max_age: float | None = None):
+        super().__init__(csv_url)
+        self.csv_url = csv_url
+        self.session = session or requests.Session()
+        self.timeout = timeout
+        self.snapshot_path = None
+        if snapshot_dir:
+            url_hash = hashlib.sha1(csv_url.encode()).hexdigest()[:12]
+            self.snapshot_path = os.path.join(snapshot_dir, f'predictions-{url_hash}.feather')
+        self.shared_max_age = shared_max_age if self.snapshot_path else None
+        self.shared = self.shared_max_age is not None
+        self._snapshot_stat = None   # (mtime, dimensione) dell'ultimo snapshot letto o scritto
+
+        self.etag = None
+        self.last_modified = None
+        self.size = 0           # lunghezza in bytes dell'ultimo contenuto
+        self.header = b''       # riga di intestazione del CSV
+        # digest = sha256 dell'ultimo contenuto elaborato;
+        # last_mode: 'not-modified' | 'unchanged' | 'append' | 'full' | 'snapshot' | 'shared'
+
+    def _refresh(self) -> pd.DataFrame:
+        if not self.shared:
+            return self._fetch()
+
+        df = self._adopt_shared()
+        if df is not None:
+            return df
+        # Un solo processo alla volta scarica il foglio; gli altri attendono
+        # il lock e poi trovano il controllo appena registrato
+        lock = FileLock(f'{self.snapshot_path}.lock', timeout=self.timeout + 30, stale=2 * self.timeout + 60)
+        with lock as acquired:
+            if not acquired:
+                logger.warning("Lock %s non ottenuto, scarico comunque il foglio", lock.path)
+            df = self._adopt_shared()
+            if df is not None:
+                return df
+
+            df = self._fetch()
+            checked_path = f'{self.snapshot_path}.checked'
+            try:
+                with open(checked_path, 'a'):
+                    pass
+                os.utime(checked_path)
+            except OSError:
+                logger.exception("Impossibile registrare il controllo in %s", checked_path)
+            return df
+
+    def _adopt_shared(self) -> pd.DataFrame | None:
+        """
+        Se un processo ha controllato il foglio da meno di shared_max_age
+        secondi, carica il suo snapshot (se diverso) e lo restituisce.
+        """
+        try:
+            checked_age = time.time() - os.path.getmtime(f'{self.snapshot_path}.checked')
+        except OSError:
+            return None
+        if checked_age >= self.shared_max_age:
+            return None
+        with perf_metrics.stage('snapshot condiviso', age=round(checked_age, 1)):
+            self._sync_snapshot()
+        if self.df is None:
+            return None
+        self.last_mode = 'shared'
+        self.fetched = True
+        perf_metrics.annotate(mode=self.last_mode, rows=len(self.df))
+        return self.df
+
+    def _fetch(self) -> pd.DataFrame:
+        """
+        Download condizionale del foglio e aggiornamento del dataset.
+        """
+        headers = {}
+        if self.df is not None:
+            if self.etag:
+                headers['If-None-Match'] = self.etag
+            if self.last_modified:
+                headers['If-Modified-Since'] = self.last_modified
+
+        with perf_metrics.stage('fetch', conditional=bool(headers)) as entry:
+            response = self.session.get(self.csv_url, headers=headers, timeout=self.timeout)
+            entry['status'] = response.status_code
+            entry['bytes'] = len(response.content)
+        if response.status_code == 304 and self.df is not None:
+            self.last_mode = 'not-modified'
+            self.fetched = True
+            perf_metrics.annotate(mode=self.last_mode, rows=len(self.df))
+            return self.df
+        response.raise_for_status()
+
+        self.etag = response.headers.get('ETag')
+        self.last_modified = response.headers.get('Last-Modified')
+        df = self.update(response.content)
+        self.fetched = True
+        perf_metrics.annotate(mode=self.last_mode, rows=len(df))
+        return df
+
+    def update(self, content: bytes) -> pd.DataFrame:
+        """
+        Applica un nuovo contenuto CSV, riusando il lavoro già fatto quando possibile.
+        """
+        digest = hashlib.sha256(content).hexdigest()
+
+        if self.df is not None and digest == self.digest:
+            self.last_mode = 'unchanged'
+            return self.df
+
+        df = None
+        if self.df is not None:
+            tail = self._appended_tail(content)
+            if tail is not None:
+                df = self._append(tail)
+        if df is None:
+            df = parse_predictions_csv(content)
+            self.header = content.split(b'\n', 1)[0] + b'\n'
+            self.last_mode = 'full'
+        else:
+            self.last_mode = 'append'
+            # Le prime base_rows righe sono quelle della versione precedente:
+            # chi mantiene aggregati incrementali elabora solo le nuove
+            df.attrs['base_version'] = self.digest
+            df.attrs['base_rows'] = len(self.df)
+
+        df.attrs['version'] = digest
+        self.df = df
+        self.digest = digest
+        self.size = len(content)
+        self.save_snapshot()
+        return df
+
+    def save_snapshot(self):
+        """
+        Salva il dataset corrente su disco in modo atomico (file temporaneo + rename),
+        insieme ai metadati necessari per i refresh condizionali/incrementali.
+        """
+        if self.snapshot_path is None or self.df is None:
+            return
+        metadata = {
+            'csv_url': self.csv_url,
+            'digest': self.digest,
+            'size': self.size,
+            'header': self.header.decode('utf-8', errors='surrogateescape'),
+            'etag': self.etag,
+            'last_modified': self.last_modified,
+            'saved_at': time.time(),
+        }
+        try:
+            os.makedirs(os.path.dirname(self.snapshot_path), exist_ok=True)
+            # Colonne extra del foglio con tipi misti (testo e numeri) non sono
+            # convertibili in Arrow: nello snapshot vengono salvate come testo
+            mixed = {col: 'str' for col in self.df.columns if self.df[col].dtype == object}
+            frame = self.df.astype(mixed) if mixed else self.df
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            table = table.replace_schema_metadata({
+                **(table.schema.metadata or {}),
+                SNAPSHOT_METADATA_KEY: json.dumps(metadata).encode(),
+            })
+            tmp_path = f'{self.snapshot_path}.{os.getpid()}.tmp'
+            feather.write_feather(table, tmp_path, compression='uncompressed')
+            os.replace(tmp_path, self.snapshot_path)
+            self._snapshot_stat = self._stat_snapshot()
+        except (OSError, pa.ArrowException):
+            logger.exception("Impossibile salvare lo snapshot %s", self.snapshot_path)
+
+    def _stat_snapshot(self) -> tuple | None:
+        try:
+            stat = os.stat(self.snapshot_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def sync_shared(self) -> bool:
+        if not self.shared:
+            return False
+        with self._lock:
+            return self._sync_snapshot()
+
+    def _sync_snapshot(self) -> bool:
+        """
+        Carica lo snapshot se è stato riscritto (da un altro processo) con un
+        contenuto diverso da quello corrente. Da chiamare con self._lock.
+        """
+        stat = self._stat_snapshot()
+        if stat is None or stat == self._snapshot_stat:
+            return False
+        digest = self.digest
+        self._load_snapshot()
+        return self.digest != digest
+
+    def load_snapshot(self) -> bool:
+        """
+        Carica (con memory mapping) l'ultimo snapshot salvato su disco.
+        Restituisce True se il dataset è stato ripristinato.
+        """
+        with self._lock:
+            return self._load_snapshot()
+
+    def _load_snapshot(self) -> bool:
+        if self.snapshot_path is None or not os.path.exists(self.snapshot_path):
+            return False
+        stat = self._stat_snapshot()
+        try:
+            table = feather.read_table(self.snapshot_path, memory_map=True)
+            metadata = json.loads(table.schema.metadata[SNAPSHOT_METADATA_KEY])
+            if metadata.get('csv_url') != self.csv_url:
+                return False
+            self._snapshot_stat = stat
+            if metadata['digest'] == self.digest and self.df is not None:
+                return True
+            df = table.to_pandas()
+            df.attrs['version'] = metadata['digest']
+        except (OSError, KeyError, ValueError, pa.ArrowException):
+            logger.exception("Snapshot %s non leggibile", self.snapshot_path)
+            return False
+
+        self.df = df
+        self.digest = metadata['digest']
+        self.size = metadata['size']
+        self.header = metadata['header'].encode('utf-8', errors='surrogateescape')
+        self.etag = metadata.get('etag')
+        self.last_modified = metadata.get('last_modified')
+        self.last_mode = 'snapshot'
+        return True
+
+    def _appended_tail(self, content: bytes) -> bytes | None:
+        """
+        Se il nuovo contenuto è il precedente con righe aggiunte in coda,
+        restituisce le sole righe nuove; altrimenti None.
+        """
+        if len(content) <= self.size:
+            return None
+        if hashlib.sha256(content[:self.size]).hexdigest() != self.digest:
+            return None
+
+        tail = content[self.size:]
+        # La coda deve iniziare su un confine di riga, altrimenti è stata
+        # modificata l'ultima riga esistente
+        if not content[:self.size].endswith(b'\n') and not tail.startswith((b'\n', b'\r\n')):
+            return None
+        return tail.lstrip(b'\r\n')
+
+    def _append(self, tail: bytes) -> pd.DataFrame | None:
+        if not tail.strip():
+            return self.df
+        try:
+            new_rows = parse_predictions_csv(self.header + tail)
+        except (ValueError, pd.errors.ParserError):
+            return None
+        if list(new_rows.columns) != list(self.df.columns):
+            return None
+        return concat_predictions([self.df, new_rows])
+
+
+def pooled_session(pool_size: int) -> requests.Session:
+    """
+    Sessione HTTP con un pool di connessioni abbastanza grande per scaricare
+    pool_size fogli in parallelo riusando le connessioni.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+class MultiSheetRefresher(BaseRefresher):
+    """
+    Unisce più export CSV (un foglio o una scheda per campionato o stagione)
+    in un unico dataset con la colonna SOURCE_COLUMN. Ogni foglio ha il suo
+    SheetRefresher (download condizionale, coda incrementale, snapshot); i
+    fogli vengono scaricati ed elaborati in parallelo con una sessione HTTP
+    condivisa, quindi la latenza è vicina a quella del foglio più lento.
+    """
+
+    def __init__(self, csv_urls: list, labels: list | None = None, timeout: float = 30,
+                 snapshot_dir: str | None = None, shared_max_age: float | None = None):
+        super().__init__(', '.join(csv_urls))
+        self.labels = list(labels) if labels is not None else [str(i + 1) for i in range(len(csv_urls))]
+        self.session = pooled_session(len(csv_urls))
+        self.sources = [SheetRefresher(url, session=self.session, timeout=timeout, snapshot_dir=snapshot_dir,
+                                       shared_max_age=shared_max_age)
+                        for url in csv_urls]
+        self.shared = any(source.shared for source in self.sources)
+        self._executor = ThreadPoolExecutor(max_workers=len(csv_urls), thread_name_prefix='sheet-fetch')
+
+    def _refresh(self) -> pd.DataFrame:
+        with perf_metrics.stage('fetch + parse (parallelo)', sources=len(self.sources)) as entry:
+            futures = [self._executor.submit(source.refresh) for source in self.sources]
+            for source, future in zip(self.sources, futures):
+                try:
+                    future.result()
+                except Exception:
+                    # Un foglio non raggiungibile non blocca gli altri se
+                    # ne esiste già una versione valida
+                    if source.df is None:
+                        raise
+                    logger.exception("Aggiornamento fallito per %s, uso l'ultima versione", source.csv_url)
+            entry['bytes'] = sum(source.size for source in self.sources)
+        self.fetched = True
+        df = self._merge()
+        perf_metrics.annotate(mode=self.last_mode, rows=len(df))
+        return df
+
+    def load_snapshot(self) -> bool:
+        """
+        Carica gli snapshot di tutti i fogli; il dataset unito viene
+        ripristinato solo se sono disponibili tutti.
+        """
+        loaded = [source.load_snapshot() for source in self.sources]
+        if not all(loaded):
+            return False
+        with self._lock:
+            self._merge()
+        return True
+
+    def sync_shared(self) -> bool:
+        changed = [source.sync_shared() for source in self.sources]
+        if not any(changed) or not all(source.df is not None for source in self.sources):
+            return False
+        with self._lock:
+            digest = self.digest
+            self._merge()
+            return self.digest != digest
+
+    def _merge(self) -> pd.DataFrame:
+        """
+        Ricostruisce il dataset unito se almeno un foglio è cambiato.
+        """
+        digest = hashlib.sha256(' '.join(source.digest or '' for source in self.sources).encode()).hexdigest()
+        if self.df is not None and digest == self.digest:
+            self.last_mode = 'unchanged'
+            return self.df
+
+        frames = []
+        for code, source in enumerate(self.sources):
+            codes = np.full(len(source.df), code, dtype=np.int16)
+            values = pd.Categorical.from_codes(codes, categories=self.labels)
+            frames.append(source.df.assign(**{SOURCE_COLUMN: values}))
+        df = concat_predictions(frames)
+        df.attrs['version'] = digest
+
+        modes = {source.last_mode for source in self.sources}
+        self.last_mode = modes.pop() if len(modes) == 1 else 'merge'
+        self.df = df
+        self.digest = digest
+        return df
+
+
+def create_refresher(sources: list, snapshot_dir: str | None = None,
+                     refresh_interval: float | None = None) -> BaseRefresher:
+    """
+    Refresher per le sorgenti restituite da parse_sheet_sources: SheetRefresher
+    per un foglio, MultiSheetRefresher (download paralleli e dataset unito)
+    per più fogli. Riparte dall'ultimo snapshot salvato, se presente.
+    Con refresh_interval (e SHARED_CACHE) gli snapshot sono condivisi con gli
+    altri processi che usano la stessa snapshot_dir.
+    """
+    labels = [label for label, _ in sources]
+    csv_urls = [csv_url for _, csv_url in sources]
+    shared_max_age = None
+    if SHARED_CACHE and snapshot_dir and refresh_interval:
+        shared_max_age = refresh_interval * SHARED_CHECK_RATIO
+    if len(csv_urls) == 1:
+        refresher = SheetRefresher(csv_urls[0], snapshot_dir=snapshot_dir, shared_max_age=shared_max_age)
+    else:
+        refresher = MultiSheetRefresher(csv_urls, labels=labels, snapshot_dir=snapshot_dir,
+                                        shared_max_age=shared_max_age)
+    refresher.load_snapshot()
+    return refresher
@@ -0,0 +1,154 @@
+"""
+Costruzione dell'HTML delle liste di partite: un unico blocco per pagina,
+formattato in modo vettoriale sulle colonne invece che riga per riga.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+
+from predictions_data import day_ordinals, to_day_ordinal
+from predictions_stats import CORRECT, DOUBLE_COL, EXACT_COL
+
+DIVIDER_HTML = '<div class="match-divider"></div>'
+
+
+def escape_html(values: pd.Series) -> pd.Series:
+    """
+    Converte in testo ed esegue l'escape HTML di una colonna.
+    """
+    return (values.astype(str)
+            .str.replace('&', '&amp;', regex=False)
+            .str.replace('<', '&lt;', regex=False)
+            .str.replace('>', '&gt;', regex=False))
+
+
+def format_dates(dates: pd.Series, missing: str = 'Data N/D') -> pd.Series:
+    """
+    Date in formato gg/mm/aaaa, con un segnaposto per quelle mancanti.
+    """
+    return dates.dt.strftime('%d/%m/%Y').fillna(missing)
+
+
+def status_classes(outcomes: pd.Series) -> pd.Series:
+    """
+    Classe CSS del badge per ogni esito (corretto / errato).
+    """
+    return pd.Series(np.where(outcomes == CORRECT, 'status-correct', 'status-incorrect'), index=outcomes.index)
+
+
+def format_number(values: pd.Series) -> pd.Series:
+    """
+    Numeri in forma compatta (45 invece di 45.0, massimo un decimale).
+    """
+    if not pd.api.types.is_numeric_dtype(values):
+        return escape_html(values)
+    formatted = np.char.mod('%g', values.round(1).to_numpy(dtype=np.float64))
+    return pd.Series(formatted, index=values.index)
+
+
+def page_count(n_rows: int, page_size: int) -> int:
+    """
+    Numero di pagine (almeno una).
+    """
+    return max(1, math.ceil(n_rows / page_size))
+
+
+def page_slice(df: pd.DataFrame, page: int, page_size: int) -> pd.DataFrame:
+    """
+    Righe della pagina richiesta (numerata da 1).
+    """
+    start = (page - 1) * page_size
+    return df.iloc[start:start + page_size]
+
+
+def page_for_date(dates: pd.Series, date, page_size: int) -> int:
+    """
+    Pagina che contiene la prima partita dalla data indicata in poi.
+    Le righe devono essere ordinate per data (come quelle dell'indice dei filtri).
+    """
+    position = int(np.searchsorted(day_ordinals(dates), to_day_ordinal(date), side='left'))
+    position = min(position, max(len(dates) - 1, 0))
+    return position // page_size + 1
+
+
+def completed_matches_html(matches: pd.DataFrame) -> str:
+    """
+    HTML delle partite concluse (dettaglio + badge degli esiti) in un solo blocco.
+    """
+    if len(matches) == 0:
+        return ''
+
+    exact = escape_html(matches[EXACT_COL])
+    double = escape_html(matches[DOUBLE_COL])
+    exact_class = status_classes(matches[EXACT_COL])
+    double_class = status_classes(matches[DOUBLE_COL])
+
+    rows = (
+        '<div class="match-row"><div class="match-info">'
+        + '<strong>' + escape_html(matches['Squadra casa']) + ' vs ' + escape_html(matches['Squadra ospite']) + '</strong><br>'
+        + '📅 ' + format_dates(matches['Data partita']) + ' | 🏆 ' + escape_html(matches['Campionato']) + '<br>'
+        + '🎯 Previsto: ' + escape_html(matches['Risultato secco previsto'])
+        + ' | Reale: ' + escape_html(matches['Risultato secco reale']) + '<br>'
+        + '🎲 Doppia Chance: ' + escape_html(matches['Doppia chance prevista'])
+        + ' | Confidence: ' + escape_html(matches['Confidence'])
+        + '</div><div class="match-status">'
+        + '<div class="status-badge ' + exact_class + '">Secco: ' + exact + '</div><br>'
+        + '<div class="status-badge ' + double_class + '">Doppia: ' + double + '</div>'
+        + '</div></div>' + DIVIDER_HTML
+    )
+    return ''.join(rows.tolist())
+
+
+# Riquadri delle probabilità 1/X/2: (colonna, icona, etichetta, classe CSS)
+PROBABILITY_BOXES = [
+    ('Probabilità Vittoria Casa', '🏠', 'Vittoria Casa', 'prob-home'),
+    ('Probabilità Pareggio', '🤝', 'Pareggio', 'prob-draw'),
+    ('Probabilità Vittoria Ospite', '✈️', 'Vittoria Ospite', 'prob-away'),
+]
+
+
+def probability_html(matches: pd.DataFrame, column: str, icon: str, label: str, css_class: str) -> pd.Series:
+    """
+    Riquadro di una probabilità per ogni partita, o 'N/D' se il valore manca.
+    """
+    missing_html = f'<div>{icon} <strong>{label}:</strong> N/D</div>'
+    if column not in matches.columns:
+        return pd.Series(missing_html, index=matches.index)
+
+    values = matches[column]
+    box_html = (f'<div class="prob-box {css_class}"><div class="prob-label">{icon} {label}</div>'
+                + '<div class="prob-value">' + format_number(values) + '%</div></div>')
+    return box_html.where(values.notna(), missing_html)
+
+
+def upcoming_matches_html(matches: pd.DataFrame) -> str:
+    """
+    HTML delle card delle partite da giocare (intestazione, predizioni e
+    probabilità dettagliate) in un solo blocco.
+    """
+    if len(matches) == 0:
+        return ''
+
+    def prediction(label, column):
+        return ('<div><strong>' + label + '</strong><br><strong>'
+                + escape_html(matches[column]) + '</strong></div>')
+
+    probabilities = pd.Series('', index=matches.index)
+    for column, icon, label, css_class in PROBABILITY_BOXES:
+        probabilities = probabilities + probability_html(matches, column, icon, label, css_class)
+
+    cards = (
+        '<div class="prediction-card"><h3>⚽ ' + escape_html(matches['Squadra casa'])
+        + ' vs ' + escape_html(matches['Squadra ospite']) + '</h3>'
+        + '<p>📅 ' + format_dates(matches['Data partita']) + ' | 🏆 ' + escape_html(matches['Campionato'])
+        + ' | Giornata ' + format_number(matches['Giornata']) + '</p></div>'
+        + '<div class="prediction-grid">'
+        + prediction('🎯 Risultato Secco Previsto:', 'Risultato secco previsto')
+        + prediction('🎲 Doppia Chance:', 'Doppia chance prevista')
+        + prediction('📊 Confidence:', 'Confidence')
+        + '</div><hr><p><strong>📈 Probabilità Dettagliate:</strong></p>'
+        + '<div class="prediction-grid">' + probabilities + '</div>'
+        + DIVIDER_HTML
+    )
+    return ''.join(cards.tolist())
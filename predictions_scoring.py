@@ -0,0 +1,198 @@
+"""
+Valutazione delle probabilità 1/X/2 sulle partite concluse: Brier score,
+log-loss, ranked probability score (RPS) e tabelle di affidabilità
+(calibrazione) per campionato e livello di confidence.
+
+I punteggi di tutte le partite sono calcolati in un solo passaggio
+vettoriale; per ogni (campionato, confidence) vengono conservate solo le
+somme, da cui le tabelle richieste dalla dashboard si ricavano senza
+tornare sulle righe. Il risultato è in cache per versione del dataset.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+import perf_metrics
+from predictions_data import PENDING, PROBABILITY_COLUMNS, PROBABILITY_VALID_COLUMN, dataset_version
+from predictions_stats import CONFIDENCE_LEVELS, EXACT_COL, BoundedLRUCache
+
+# Esiti in ordine (per l'RPS: vittoria casa < pareggio < vittoria ospite)
+OUTCOMES = ['1', 'X', '2']
+ACTUAL_COL = 'Risultato secco reale'
+
+SCORE_COLUMNS = ['Brier', 'Log-loss', 'RPS']
+# Fasce di probabilità delle tabelle di affidabilità (0-10%, 10-20%, ...)
+RELIABILITY_BINS = 10
+# Limite inferiore della probabilità dell'esito reale nella log-loss
+LOG_LOSS_EPSILON = 1e-15
+
+
+def probability_matrix(df: pd.DataFrame) -> tuple:
+    """
+    Probabilità 1/X/2 come matrice (n, 3) normalizzata a somma 1 per riga,
+    e maschera delle righe con tutte e tre le probabilità valide (colonna
+    calcolata al caricamento; ricalcolata solo per gli snapshot precedenti).
+    """
+    if not all(col in df.columns for col in PROBABILITY_COLUMNS):
+        return np.full((len(df), 3), np.nan), np.zeros(len(df), dtype=bool)
+    probs = np.column_stack([df[col].to_numpy(dtype=np.float64, na_value=np.nan) for col in PROBABILITY_COLUMNS])
+    totals = probs.sum(axis=1)
+    if PROBABILITY_VALID_COLUMN in df.columns:
+        valid = df[PROBABILITY_VALID_COLUMN].to_numpy(dtype=bool)
+    else:
+        valid = np.isfinite(totals) & (totals > 0) & (probs >= 0).all(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        probs = probs / totals[:, None]
+    return probs, valid
+
+
+def outcome_codes(df: pd.DataFrame) -> np.ndarray:
+    """
+    Indice dell'esito reale (0 = '1', 1 = 'X', 2 = '2'), -1 se mancante o non riconosciuto.
+    """
+    if ACTUAL_COL not in df.columns:
+        return np.full(len(df), -1, dtype=np.int8)
+    # Confronto sulle categorie, non riga per riga
+    values = df[ACTUAL_COL].astype('category')
+    lookup = np.array([OUTCOMES.index(str(c).strip()) if str(c).strip() in OUTCOMES else -1
+                       for c in values.cat.categories] + [-1], dtype=np.int8)
+    return lookup[values.cat.codes.to_numpy()]
+
+
+def match_scores(probs: np.ndarray, outcomes: np.ndarray) -> dict:
+    """
+    Brier (multiclasse, 0-2), log-loss e RPS (0-1) di ogni partita.
+    """
+    observed = np.zeros_like(probs)
+    observed[np.arange(len(outcomes)), outcomes] = 1
+    brier = ((probs - observed) ** 2).sum(axis=1)
+    log_loss = -np.log(np.clip(probs[np.arange(len(outcomes)), outcomes], LOG_LOSS_EPSILON, 1))
+    # RPS: distanza tra le distribuzioni cumulate (gli esiti sono ordinati)
+    cumulative = np.cumsum(probs - observed, axis=1)[:, :-1]
+    rps = (cumulative ** 2).sum(axis=1) / (probs.shape[1] - 1)
+    return {'Brier': brier, 'Log-loss': log_loss, 'RPS': rps}
+
+
+def group_codes(df: pd.DataFrame, col: str) -> tuple:
+    """
+    Codici interi e etichette testuali di una colonna di raggruppamento
+    (valori mancanti e colonna assente = etichetta '').
+    """
+    if col not in df.columns:
+        return np.zeros(len(df), dtype=np.int16), np.array([''], dtype=object)
+    values = df[col].astype('category')
+    labels = np.array([str(c) for c in values.cat.categories] + [''], dtype=object)
+    codes = values.cat.codes.to_numpy().astype(np.int16)
+    return np.where(codes < 0, len(labels) - 1, codes), labels
+
+
+def label_levels(table: pd.DataFrame, labels: list) -> pd.DataFrame:
+    """
+    Sostituisce i codici dei primi livelli dell'indice con le etichette testuali.
+    """
+    levels = [table.index.get_level_values(i) for i in range(table.index.nlevels)]
+    for i, level_labels in enumerate(labels):
+        levels[i] = level_labels[levels[i].to_numpy()]
+    return table.set_axis(pd.MultiIndex.from_arrays(levels, names=table.index.names))
+
+
+class ProbabilityScores:
+    """
+    Punteggi e affidabilità delle probabilità per una versione del dataset.
+    _sums: somme dei punteggi per (campionato, confidence);
+    _bins: previsioni, probabilità e frequenze osservate per (campionato,
+    confidence, fascia), con ogni partita che contribuisce tre previsioni
+    (una per esito).
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        with perf_metrics.stage('punteggi probabilità', rows=len(df)):
+            probs, valid = probability_matrix(df)
+            outcomes = outcome_codes(df)
+            completed = valid & (outcomes >= 0)
+            if EXACT_COL in df.columns:
+                completed &= (df[EXACT_COL] != PENDING).to_numpy()
+            probs, outcomes = probs[completed], outcomes[completed]
+            leagues, league_labels = group_codes(df, 'Campionato')
+            confidence, confidence_labels = group_codes(df, 'Confidence')
+            leagues, confidence = leagues[completed], confidence[completed]
+            labels = [league_labels, confidence_labels]
+
+            scores = pd.DataFrame({'Partite': np.ones(len(outcomes), dtype=np.int64), **match_scores(probs, outcomes)})
+            sums = scores.groupby([leagues, confidence]).sum().rename_axis(['Campionato', 'Confidence'])
+            self._sums = label_levels(sums, labels)
+
+            # Affidabilità: tutte le coppie (partita, esito) in un solo groupby
+            forecasts = probs.ravel()
+            observed = (outcomes[:, None] == np.arange(len(OUTCOMES))).ravel().astype(np.int64)
+            # Arrotondamento prima della fascia: le probabilità sono float32 e
+            # un 20% letto come frazione vale 19.9999996%, non va nella fascia 10-20%
+            bins = np.minimum(np.round(forecasts * RELIABILITY_BINS, 6).astype(np.int64), RELIABILITY_BINS - 1)
+            pairs = pd.DataFrame({'Previsioni': np.ones(len(forecasts), dtype=np.int64),
+                                  'Somma probabilità': forecasts, 'Osservati': observed})
+            sums = pairs.groupby([np.repeat(leagues, len(OUTCOMES)), np.repeat(confidence, len(OUTCOMES)),
+                                  bins]).sum().rename_axis(['Campionato', 'Confidence', 'Fascia'])
+            self._bins = label_levels(sums, labels)
+        self.matches = int(len(outcomes))
+
+    def _select(self, table: pd.DataFrame, league: str = 'Tutti', confidence: str | None = None) -> pd.DataFrame:
+        if league != 'Tutti':
+            table = table[table.index.get_level_values('Campionato') == league]
+        if confidence is not None:
+            table = table[table.index.get_level_values('Confidence') == confidence]
+        return table
+
+    def summary(self, league: str = 'Tutti', confidence: str | None = None) -> dict:
+        """
+        Punteggi medi (e numero di partite) sulle partite selezionate.
+        """
+        sums = self._select(self._sums, league, confidence).sum()
+        matches = int(sums.get('Partite', 0))
+        result = {'Partite': matches}
+        for col in SCORE_COLUMNS:
+            result[col] = float(sums[col] / matches) if matches else None
+        return result
+
+    def score_table(self, by: str, league: str = 'Tutti') -> pd.DataFrame:
+        """
+        Punteggi medi per 'Campionato' o 'Confidence' (confidence da Alta a Bassa).
+        """
+        sums = self._select(self._sums, league).groupby(level=by).sum()
+        table = sums[SCORE_COLUMNS].div(sums['Partite'], axis=0)
+        table.insert(0, 'Partite', sums['Partite'])
+        if by == 'Confidence':
+            order = [level for level in CONFIDENCE_LEVELS if level in table.index]
+            table = table.loc[order + [level for level in table.index if level not in order]]
+        return table
+
+    def reliability(self, league: str = 'Tutti', confidence: str | None = None) -> pd.DataFrame:
+        """
+        Tabella di affidabilità: per fascia di probabilità prevista, numero di
+        previsioni, probabilità media e frequenza osservata dell'esito (%).
+        Probabilità ben calibrate = le due percentuali coincidono.
+        """
+        sums = self._select(self._bins, league, confidence).groupby(level='Fascia').sum()
+        width = 100 // RELIABILITY_BINS
+        table = pd.DataFrame({
+            'Previsioni': sums['Previsioni'],
+            'Probabilità media %': sums['Somma probabilità'] / sums['Previsioni'] * 100,
+            'Frequenza osservata %': sums['Osservati'] / sums['Previsioni'] * 100,
+        })
+        table.index = pd.Index([f'{b * width}-{(b + 1) * width}%' for b in table.index], name='Fascia')
+        return table
+
+
+# Cache dei punteggi per versione del dataset (dimensione in MB configurabile)
+SCORES_CACHE = BoundedLRUCache(int(os.getenv('ELITEPREDICT_SCORES_CACHE_MB', '16')) * 2**20)
+
+
+def get_probability_scores(df: pd.DataFrame) -> ProbabilityScores:
+    """
+    Punteggi delle probabilità della versione corrente del dataset, calcolati una volta per versione.
+    """
+    def compute():
+        perf_metrics.annotate(cache='miss')
+        return ProbabilityScores(df)
+
+    return SCORES_CACHE.get_or_compute(dataset_version(df), compute)
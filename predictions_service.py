@@ -0,0 +1,264 @@
+"""
+Statistiche della dashboard senza Streamlit: caricamento del dataset, filtri,
+aggregazioni e trend come libreria, con risultati pronti per JSON.
+
+Esempio:
+    service = PredictionsService(os.environ['GOOGLE_SHEETS_URL'])
+    service.start()
+    service.league_stats(date=date(2025, 8, 23))
+"""
+import math
+import threading
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+from predictions_data import (CACHE_DIR, DAY_COLUMNS, PROBABILITY_VALID_COLUMN, WEEK_COLUMN, create_refresher,
+                              dataset_version, parse_sheet_sources, to_day_ordinal)
+from predictions_scoring import get_probability_scores
+from predictions_stats import FilterIndex, MatchdayIndex, TeamIndex, get_derived_views
+from predictions_trends import get_accuracy_series, rolling_matches
+
+# Serie del trend di accuratezza (come le opzioni del grafico della dashboard)
+TREND_MODES = ['settimanale', 'cumulativa', 'ultime_partite', 'ultimi_giorni']
+
+# Colonne interne (ordinali delle date, maschera delle probabilità) escluse dalle liste di partite
+INTERNAL_COLUMNS = [*DAY_COLUMNS.values(), WEEK_COLUMN, PROBABILITY_VALID_COLUMN]
+
+
+def json_value(value):
+    """
+    Valore scalare serializzabile in JSON: date in formato ISO, NaN/NaT e
+    infiniti come None, tipi numpy convertiti nei tipi Python.
+    """
+    if isinstance(value, np.generic):
+        value = value.item()
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    if isinstance(value, datetime):
+        # Le date del foglio non hanno orario
+        return value.date().isoformat() if value.time() == datetime.min.time() else value.isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, float) and math.isinf(value):
+        return None
+    return value
+
+
+def to_records(frame: pd.DataFrame) -> list:
+    """
+    Righe del DataFrame come lista di dizionari; un indice con nome diventa la prima colonna.
+    """
+    if frame.index.name is not None:
+        frame = frame.reset_index()
+    columns = list(frame.columns)
+    return [{col: json_value(value) for col, value in zip(columns, row)}
+            for row in frame.itertuples(index=False, name=None)]
+
+
+class PredictionsService:
+    """
+    Dataset delle predizioni e statistiche derivate per un processo senza
+    interfaccia. Usa gli stessi componenti della dashboard: refresher con
+    snapshot e aggiornamento in background, indice dei filtri per versione,
+    viste derivate in cache e motore incrementale dei trend.
+    I filtri (league, date, only_date) hanno lo stesso significato di quelli
+    della sidebar.
+    """
+
+    def __init__(self, sheets_url: str, refresh_interval: float = 300, snapshot_dir: str | None = CACHE_DIR):
+        self.refresher = create_refresher(parse_sheet_sources(sheets_url), snapshot_dir=snapshot_dir,
+                                          refresh_interval=refresh_interval)
+        self.refresh_interval = refresh_interval
+        self._index = (None, None)   # (versione, FilterIndex)
+        self._index_lock = threading.Lock()
+        self._matchday_index = (None, None)   # (versione, MatchdayIndex)
+        self._team_index = (None, None)   # (versione, TeamIndex)
+
+    def start(self):
+        """
+        Avvia l'aggiornamento periodico del dataset in background.
+        """
+        self.refresher.start_background(self.refresh_interval)
+
+    def stop(self):
+        self.refresher.stop_background()
+
+    def dataset(self) -> pd.DataFrame:
+        """
+        Ultimo dataset valido; scaricato subito solo se non ce n'è ancora uno.
+        """
+        df = self.refresher.df
+        return df if df is not None else self.refresher.refresh()
+
+    def version(self) -> str:
+        return dataset_version(self.dataset())
+
+    def _versioned_index(self) -> tuple:
+        """
+        (versione, indice dei filtri) del dataset corrente; l'indice viene
+        ricostruito solo quando il dataset cambia.
+        """
+        df = self.dataset()
+        version = dataset_version(df)
+        with self._index_lock:
+            if self._index[0] != version:
+                self._index = (version, FilterIndex(df))
+            return self._index
+
+    def filter_index(self) -> FilterIndex:
+        return self._versioned_index()[1]
+
+    def matchday_index(self) -> MatchdayIndex:
+        """
+        Read model per campionato e giornata della versione corrente.
+        """
+        df = self.dataset()
+        version = dataset_version(df)
+        with self._index_lock:
+            if self._matchday_index[0] != version:
+                self._matchday_index = (version, MatchdayIndex(df))
+            return self._matchday_index[1]
+
+    def team_index(self) -> TeamIndex:
+        """
+        Read model per squadra della versione corrente.
+        """
+        df = self.dataset()
+        version = dataset_version(df)
+        with self._index_lock:
+            if self._team_index[0] != version:
+                self._team_index = (version, TeamIndex(df))
+            return self._team_index[1]
+
+    def views(self, league: str = 'Tutti', date=None, only_date: bool = False):
+        """
+        Viste derivate (partite filtrate, concluse, da giocare, aggregazioni).
+        """
+        version, index = self._versioned_index()
+        date_mode = 'tutte' if date is None else 'solo' if only_date else 'da'
+        return get_derived_views(index, version, league, date_mode, date)
+
+    def kpis(self, **filters) -> dict:
+        """
+        Indicatori principali: partite concluse, corrette e accuratezze, partite da giocare.
+        """
+        views = self.views(**filters)
+        stats = views.stats or {'Totale': 0, 'Corrette Secco': 0, 'Corrette Doppia': 0}
+        total = stats['Totale']
+        return {
+            'totale': total,
+            'corrette_secco': stats['Corrette Secco'],
+            'corrette_doppia': stats['Corrette Doppia'],
+            'accuratezza_secco': stats['Corrette Secco'] / total * 100 if total else None,
+            'accuratezza_doppia': stats['Corrette Doppia'] / total * 100 if total else None,
+            'da_giocare': views.upcoming_count,
+        }
+
+    def stats_table(self, key: str, **filters) -> list:
+        """
+        Tabella delle aggregazioni per 'Campionato', 'Confidence', 'Status Merged' o 'Settimana'.
+        """
+        stats = self.views(**filters).stats
+        if stats is None or key not in stats:
+            return []
+        return to_records(stats[key].rename_axis(key))
+
+    def league_stats(self, **filters) -> list:
+        return self.stats_table('Campionato', **filters)
+
+    def confidence_stats(self, **filters) -> list:
+        return self.stats_table('Confidence', **filters)
+
+    def match_type_stats(self, **filters) -> list:
+        return self.stats_table('Status Merged', **filters)
+
+    def matchdays(self, league: str) -> list:
+        """
+        Riepiloghi di tutte le giornate del campionato, in ordine.
+        """
+        return to_records(self.matchday_index().league_summary(league))
+
+    def matchday(self, league: str, matchday: int) -> dict | None:
+        """
+        Riepilogo e partite di una giornata, None se la giornata non esiste.
+        """
+        index = self.matchday_index()
+        summary = index.matchday_summary(league, matchday)
+        if summary is None:
+            return None
+        fixtures = index.fixtures(league, matchday).drop(columns=INTERNAL_COLUMNS, errors='ignore')
+        return {'riepilogo': {key: json_value(value) for key, value in summary.items()},
+                'partite': to_records(fixtures)}
+
+    def calibration(self, league: str = 'Tutti', confidence: str | None = None) -> dict:
+        """
+        Punteggi delle probabilità 1/X/2 (Brier, log-loss, RPS) e tabella di
+        affidabilità su tutte le partite concluse del campionato.
+        """
+        scores = get_probability_scores(self.dataset())
+        return {'punteggi': {key: json_value(value) for key, value in scores.summary(league, confidence).items()},
+                'per_confidence': to_records(scores.score_table('Confidence', league)),
+                'affidabilita': to_records(scores.reliability(league, confidence))}
+
+    def teams(self, league: str = 'Tutti') -> list:
+        """
+        Riepiloghi delle squadre (di un campionato se indicato), in ordine alfabetico.
+        """
+        index = self.team_index()
+        return to_records(index.summary.loc[index.team_list(league)])
+
+    def team(self, team: str, opponent: str | None = None) -> dict | None:
+        """
+        Riepilogo e partite della squadra; con opponent anche gli scontri
+        diretti. None se la squadra non esiste.
+        """
+        index = self.team_index()
+        summary = index.team_summary(team)
+        if summary is None:
+            return None
+        result = {'riepilogo': {key: json_value(value) for key, value in summary.items()},
+                  'partite': to_records(index.matches(team).drop(columns=INTERNAL_COLUMNS, errors='ignore'))}
+        if opponent is not None:
+            head_to_head = index.head_to_head(team, opponent)
+            result['scontri_diretti'] = None if head_to_head is None else {
+                key: json_value(value) for key, value in head_to_head.items()}
+        return result
+
+    def upcoming(self, limit: int | None = None, **filters) -> list:
+        """
+        Partite da giocare in ordine di data (al più limit).
+        """
+        upcoming = self.views(**filters).upcoming
+        if limit is not None:
+            upcoming = upcoming.iloc[:limit]
+        return to_records(upcoming.drop(columns=INTERNAL_COLUMNS, errors='ignore'))
+
+    def trend(self, mode: str = 'settimanale', window: int | None = None, league: str = 'Tutti', date=None,
+              only_date: bool = False) -> list:
+        """
+        Serie dell'accuratezza con intervalli di Wilson: 'settimanale',
+        'cumulativa', 'ultime_partite' (window partite) o 'ultimi_giorni'
+        (finestra degli ultimi window giorni di calendario, valutata
+        a ogni giorno con partite concluse).
+        """
+        if mode not in TREND_MODES:
+            raise ValueError(f"Serie non valida: {mode} (valori ammessi: {', '.join(TREND_MODES)})")
+        if mode in ('ultime_partite', 'ultimi_giorni') and (window is None or window < 1):
+            raise ValueError("La serie richiede una finestra (window) positiva")
+
+        if mode == 'ultime_partite':
+            return to_records(rolling_matches(self.views(league, date, only_date).completed, window))
+
+        filters = {'league': league}
+        if date is not None:
+            filters['start_day'] = to_day_ordinal(date)
+            if only_date:
+                filters['end_day'] = filters['start_day']
+        series = get_accuracy_series(self.dataset())
+        if mode == 'settimanale':
+            return to_records(series.series('settimana', **filters))
+        if mode == 'cumulativa':
+            return to_records(series.cumulative('settimana', **filters))
+        return to_records(series.rolling(window, 'giorno', **filters))
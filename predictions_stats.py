@@ -0,0 +1,647 @@
+"""
+Indici e aggregazioni sul dataset delle predizioni, costruiti una volta per
+versione del dataset e riusati da tutte le sessioni della dashboard.
+"""
+import os
+import threading
+from collections import OrderedDict, deque
+
+import numpy as np
+import pandas as pd
+
+import perf_metrics
+from predictions_data import (DAY_COLUMNS, NO_DATE, PENDING, WEEK_COLUMN, day_ordinals, to_day_ordinal,
+                              week_label, week_ordinals)
+
+
+class FilterIndex:
+    """
+    Indice per i filtri della sidebar.
+    Le righe sono ordinate per 'Data partita' (ordinamento stabile, date mancanti
+    in coda) e partizionate per campionato: i filtri "dalla data X", "solo la
+    data X" e il campionato diventano ricerche binarie che restituiscono slice
+    del DataFrame, senza scansioni né copie complete.
+    """
+
+    def __init__(self, df: pd.DataFrame, date_col: str = 'Data partita', league_col: str = 'Campionato'):
+        if date_col in df.columns:
+            # Ordinali già salvati con il dataset, se presenti
+            day_col = DAY_COLUMNS.get(date_col)
+            days = day_ordinals(df[day_col] if day_col in df.columns else df[date_col])
+            order = np.argsort(days, kind='stable')
+            days = days[order]
+        else:
+            order = np.arange(len(df))
+            days = None
+
+        # Il foglio è di solito già in ordine di data: in quel caso l'indice
+        # usa il dataset condiviso così com'è, senza copiarlo
+        in_order = days is None or bool((order[1:] > order[:-1]).all())
+        if in_order and df.index.equals(pd.RangeIndex(len(df))):
+            frame = df
+        else:
+            frame = df.take(order).reset_index(drop=True)
+        self._parts = {'Tutti': (frame, days)}
+
+        if league_col in frame.columns:
+            for league, positions in frame.groupby(league_col, observed=True, sort=True).indices.items():
+                league_frame = frame.take(positions).reset_index(drop=True)
+                self._parts[league] = (league_frame, None if days is None else days[positions])
+
+        self.leagues = [league for league in self._parts if league != 'Tutti']
+
+        dated = None if days is None else days[days != NO_DATE]
+        self.min_day = None if dated is None or len(dated) == 0 else int(dated[0])
+        self.max_day = None if dated is None or len(dated) == 0 else int(dated[-1])
+
+    def query(self, league: str = 'Tutti', date=None, only_date: bool = False) -> pd.DataFrame:
+        """
+        Restituisce le partite del campionato (o 'Tutti') a partire dalla data
+        indicata, oppure solo di quella data se only_date=True.
+        Senza data restituisce tutto il campionato. Il risultato è una slice
+        dell'indice: va trattato in sola lettura.
+        """
+        frame, days = self._parts.get(league, (self._parts['Tutti'][0].iloc[:0], None))
+        if date is None or days is None:
+            return frame
+
+        day = to_day_ordinal(date)
+        lo = np.searchsorted(days, day, side='left')
+        if only_date:
+            hi = np.searchsorted(days, day, side='right')
+        else:
+            hi = np.searchsorted(days, NO_DATE, side='left')
+        return frame.iloc[lo:hi]
+
+
+# Colonne degli esiti delle predizioni
+EXACT_COL = 'Risultato predizione (risultato secco)'
+DOUBLE_COL = 'Risultato predizione (doppia chance)'
+CORRECT = 'Corretto'
+
+# Colonne delle tabelle prodotte da aggregate_outcomes
+STATS_COLUMNS = ['Totale', 'Corrette Secco', 'Accuratezza Secco %', 'Corrette Doppia', 'Accuratezza Doppia %']
+
+
+def outcome_matrix(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Matrice int8 degli esiti (1 = predizione corretta), calcolata con un solo
+    confronto per colonna: tutte le aggregazioni partono da qui.
+    """
+    return pd.DataFrame({
+        'secco': (df[EXACT_COL] == CORRECT).to_numpy(dtype=np.int8),
+        'doppia': (df[DOUBLE_COL] == CORRECT).to_numpy(dtype=np.int8),
+    }, index=df.index)
+
+
+def aggregate_outcomes(outcomes: pd.DataFrame, key) -> pd.DataFrame:
+    """
+    Totale, corrette e accuratezza (%) per gruppo, con un solo passaggio
+    groupby e riduzioni native (sum/size) al posto delle lambda.
+    key: Series (o array) allineata alle righe di outcomes.
+    """
+    grouped = outcomes.groupby(key, observed=True, sort=True)
+    correct = grouped.sum()
+    total = grouped.size()
+
+    stats = pd.DataFrame({
+        'Totale': total,
+        'Corrette Secco': correct['secco'],
+        'Corrette Doppia': correct['doppia'],
+    })
+    stats['Accuratezza Secco %'] = stats['Corrette Secco'] / stats['Totale'] * 100
+    stats['Accuratezza Doppia %'] = stats['Corrette Doppia'] / stats['Totale'] * 100
+    return stats[STATS_COLUMNS]
+
+
+def weekly_keys(df: pd.DataFrame) -> np.ndarray:
+    """
+    Chiave della settimana ISO (ordinale del lunedì) di ogni partita: la
+    colonna WEEK_COLUMN se presente, altrimenti calcolata da 'Data partita'.
+    """
+    if WEEK_COLUMN in df.columns:
+        return df[WEEK_COLUMN].to_numpy()
+    return week_ordinals(day_ordinals(df['Data partita']))
+
+
+def compute_statistics(completed: pd.DataFrame) -> dict:
+    """
+    Tutte le aggregazioni delle schede Statistiche e Storico a partire da
+    un'unica matrice degli esiti: totali complessivi (interi) e tabelle per
+    campionato, tipo sfida, livello di confidence e settimana.
+    """
+    outcomes = outcome_matrix(completed)
+    correct = outcomes.sum()
+    stats = {
+        'Totale': len(outcomes),
+        'Corrette Secco': int(correct['secco']),
+        'Corrette Doppia': int(correct['doppia']),
+    }
+
+    for key in ('Campionato', 'Status Merged', 'Confidence'):
+        if key in completed.columns:
+            stats[key] = aggregate_outcomes(outcomes, completed[key])
+
+    if 'Data partita' in completed.columns:
+        # Aggregazione sugli interi; le etichette servono solo per le poche settimane risultanti
+        weekly = aggregate_outcomes(outcomes, weekly_keys(completed))
+        weekly = weekly[weekly.index != NO_DATE]
+        weekly.index = pd.Index([week_label(week) for week in weekly.index], name='Settimana')
+        stats['Settimana'] = weekly
+
+    return stats
+
+
+def estimate_nbytes(obj) -> int:
+    """
+    Stima (shallow) della memoria occupata da DataFrame/Series e contenitori.
+    """
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=False).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(index=True, deep=False))
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, dict):
+        return sum(estimate_nbytes(v) for v in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sum(estimate_nbytes(v) for v in obj)
+    if hasattr(obj, '__dict__'):
+        return estimate_nbytes(vars(obj))
+    return 64
+
+
+class BoundedLRUCache:
+    """
+    Cache LRU thread-safe limitata dalla memoria stimata delle voci:
+    quando il totale supera max_bytes vengono eliminate le voci usate meno di recente.
+    """
+
+    def __init__(self, max_bytes: int, sizeof=estimate_nbytes):
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._versions = deque(maxlen=4)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._items:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._items.move_to_end(key)
+            return self._items[key][0]
+
+    def put(self, key, value):
+        size = self.sizeof(value)
+        with self._lock:
+            if key in self._items:
+                self.nbytes -= self._items.pop(key)[1]
+            if size > self.max_bytes:
+                return
+            self._items[key] = (value, size)
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                _, (_, evicted) = self._items.popitem(last=False)
+                self.nbytes -= evicted
+
+    def use_version(self, version: str):
+        """
+        Per cache con chiavi (versione del dataset, ...): alla prima richiesta
+        di una versione nuova elimina le voci delle altre versioni. Le slice in
+        cache tengono in vita tutto il dataset da cui derivano, memoria che la
+        stima per voce non conta.
+        """
+        with self._lock:
+            if version in self._versions:
+                return
+            self._versions.append(version)
+            for key in [key for key in self._items if key[0] != version]:
+                self.nbytes -= self._items.pop(key)[1]
+
+    def get_or_compute(self, key, compute):
+        """
+        Restituisce la voce in cache o la calcola (fuori dal lock) e la memorizza.
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.put(key, value)
+        return value
+
+
+_MISSING = object()
+
+
+class DerivedViews:
+    """
+    Viste derivate da una combinazione di filtri: partite filtrate, concluse
+    e da giocare, più le aggregazioni (KPI e tabelle) sulle partite concluse.
+    Le aggregazioni sono calcolate al primo accesso a stats, così le schede
+    che non le mostrano non le pagano.
+    Condivise tra le schede e tra le sessioni: vanno trattate in sola lettura.
+    """
+
+    def __init__(self, filtered: pd.DataFrame):
+        pending = ((filtered[EXACT_COL] == PENDING) | (filtered[DOUBLE_COL] == PENDING)).to_numpy()
+        self.filtered = filtered
+        self.completed = filtered[~pending]
+        self.upcoming = filtered[pending]
+        self.upcoming_count = len(self.upcoming)
+        self._stats = _MISSING
+        self._stats_lock = threading.Lock()
+
+    @property
+    def stats(self) -> dict | None:
+        """
+        Aggregazioni di compute_statistics sulle partite concluse (None se non ce ne sono).
+        """
+        with self._stats_lock:
+            if self._stats is _MISSING:
+                with perf_metrics.stage('aggregazioni', rows=len(self.completed)):
+                    self._stats = compute_statistics(self.completed) if len(self.completed) > 0 else None
+            return self._stats
+
+
+# Cache di processo delle viste derivate (dimensione in MB configurabile)
+VIEWS_CACHE = BoundedLRUCache(int(os.getenv('ELITEPREDICT_VIEWS_CACHE_MB', '256')) * 2**20)
+
+
+def get_derived_views(index: FilterIndex, version: str, league: str = 'Tutti',
+                      date_mode: str = 'tutte', date=None) -> DerivedViews:
+    """
+    Viste derivate per (versione dataset, campionato, modalità data, data).
+    date_mode: 'tutte' (nessun filtro data), 'da' (dalla data in poi) o 'solo' (solo la data).
+    """
+    day = None if date_mode == 'tutte' or date is None else to_day_ordinal(date)
+    key = (version, league, date_mode, day)
+
+    def compute():
+        perf_metrics.annotate(cache='miss')
+        if day is None:
+            filtered = index.query(league)
+        else:
+            filtered = index.query(league, date, only_date=(date_mode == 'solo'))
+        return DerivedViews(filtered)
+
+    VIEWS_CACHE.use_version(version)
+    views = VIEWS_CACHE.get_or_compute(key, compute)
+    perf_metrics.annotate(rows=len(views.filtered))
+    return views
+
+
+# Livelli di confidence nell'ordine delle colonne del read model delle giornate
+CONFIDENCE_LEVELS = ['Alta', 'Media', 'Bassa']
+
+
+class MatchdayIndex:
+    """
+    Read model per (campionato, giornata), costruito una volta per versione
+    del dataset. Le righe sono ordinate per campionato, giornata e data: le
+    partite di una giornata sono una slice contigua, e la tabella summary ha
+    una riga per giornata con partite, concluse, da giocare, corrette e
+    accuratezze (secco e doppia chance), mix dei livelli di confidence e
+    date della prima e dell'ultima partita. Tutte le ricerche sono accessi a
+    dizionario, indipendenti dalla lunghezza dello storico.
+    """
+
+    def __init__(self, df: pd.DataFrame, league_col: str = 'Campionato', matchday_col: str = 'Giornata'):
+        if league_col not in df.columns or matchday_col not in df.columns:
+            df = df.iloc[:0].assign(**{league_col: pd.Series(dtype=str), matchday_col: pd.Series(dtype=np.int32)})
+
+        # Righe senza campionato o giornata escluse: factorize darebbe loro il
+        # codice -1, che take() leggerebbe come l'ultimo campionato
+        frame = df[(df[matchday_col].notna() & df[league_col].notna()).to_numpy()]
+        league_codes, leagues = pd.factorize(frame[league_col], sort=True)
+        leagues = pd.Index(np.asarray(leagues).astype(str))
+        matchdays = frame[matchday_col].to_numpy().astype(np.int32)
+        day_col = DAY_COLUMNS['Data partita']
+        days = day_ordinals(frame[day_col] if day_col in frame.columns else frame['Data partita']) \
+            if 'Data partita' in frame.columns else np.zeros(len(frame), dtype=np.int32)
+        order = np.lexsort((days, matchdays, league_codes))
+        self.frame = frame.take(order).reset_index(drop=True)
+        league_codes, matchdays, days = league_codes[order], matchdays[order], days[order]
+
+        # Tutti i conteggi in un solo groupby sugli interi
+        pending = ((self.frame[EXACT_COL] == PENDING) | (self.frame[DOUBLE_COL] == PENDING)).to_numpy()
+        outcomes = outcome_matrix(self.frame)
+        counts = pd.DataFrame({
+            'Partite': np.ones(len(self.frame), dtype=np.int32),
+            'Da giocare': pending.astype(np.int32),
+            'Corrette Secco': outcomes['secco'].to_numpy(dtype=np.int32),
+            'Corrette Doppia': outcomes['doppia'].to_numpy(dtype=np.int32),
+        })
+        if 'Confidence' in self.frame.columns:
+            levels = pd.get_dummies(self.frame['Confidence'].astype(str), dtype=np.int32)
+            ranked = sorted(levels.columns, key=lambda level: (
+                CONFIDENCE_LEVELS.index(level) if level in CONFIDENCE_LEVELS else len(CONFIDENCE_LEVELS), level))
+            counts = pd.concat([counts, levels[ranked].add_prefix('Confidence ')], axis=1)
+
+        keys = [league_codes, matchdays]
+        summary = counts.groupby(keys, sort=True).sum()
+        # Date senza valore (NO_DATE) escluse da prima e ultima data
+        dated_days = pd.Series(np.where(days != NO_DATE, days, np.nan))
+        first_days = dated_days.groupby(keys, sort=True).min()
+        last_days = dated_days.groupby(keys, sort=True).max()
+        completed = summary['Partite'] - summary['Da giocare']
+        summary.insert(1, 'Concluse', completed)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            summary.insert(summary.columns.get_loc('Corrette Secco') + 1, 'Accuratezza Secco %',
+                           summary['Corrette Secco'] / completed * 100)
+            summary.insert(summary.columns.get_loc('Corrette Doppia') + 1, 'Accuratezza Doppia %',
+                           summary['Corrette Doppia'] / completed * 100)
+        for col, group_days in (('Prima data', first_days), ('Ultima data', last_days)):
+            summary[col] = pd.to_datetime(group_days.to_numpy(), unit='D').date
+        group_codes = summary.index.get_level_values(0).to_numpy()
+        group_matchdays = summary.index.get_level_values(1).to_numpy()
+        summary.index = pd.MultiIndex.from_arrays([leagues.take(group_codes), group_matchdays],
+                                                  names=[league_col, matchday_col])
+        self.summary = summary
+        self.leagues = list(leagues)
+
+        # Righe di frame di ogni giornata e righe di summary di ogni campionato
+        self._stops = np.cumsum(summary['Partite'].to_numpy())
+        self._starts = self._stops - summary['Partite'].to_numpy()
+        self._rows = dict(zip(zip(summary.index.get_level_values(0), group_matchdays.tolist()), range(len(summary))))
+        bounds = np.searchsorted(group_codes, np.arange(len(leagues) + 1))
+        self._league_rows = {league: (bounds[code], bounds[code + 1]) for code, league in enumerate(leagues)}
+        self._matchdays = group_matchdays
+
+    def matchdays(self, league: str) -> list:
+        """
+        Giornate disponibili per il campionato, in ordine.
+        """
+        lo, hi = self._league_rows.get(league, (0, 0))
+        return self._matchdays[lo:hi].tolist()
+
+    def fixtures(self, league: str, matchday: int) -> pd.DataFrame:
+        """
+        Partite della giornata in ordine di data (slice: in sola lettura).
+        """
+        row = self._rows.get((league, matchday))
+        if row is None:
+            return self.frame.iloc[:0]
+        return self.frame.iloc[self._starts[row]:self._stops[row]]
+
+    def matchday_summary(self, league: str, matchday: int) -> dict | None:
+        """
+        Riepilogo della giornata (una riga di summary come dizionario), None se non esiste.
+        """
+        row = self._rows.get((league, matchday))
+        return None if row is None else self.summary.iloc[row].to_dict()
+
+    def league_summary(self, league: str) -> pd.DataFrame:
+        """
+        Riepiloghi di tutte le giornate del campionato (indice: giornata).
+        """
+        lo, hi = self._league_rows.get(league, (0, 0))
+        return self.summary.iloc[lo:hi].droplevel(0)
+
+
+def get_matchday_views(index: MatchdayIndex, version: str, league: str, matchday: int) -> DerivedViews:
+    """
+    Viste derivate delle partite di una giornata, nella stessa cache delle
+    viste per data (chiave con modalità 'giornata').
+    """
+    key = (version, league, 'giornata', matchday)
+
+    def compute():
+        perf_metrics.annotate(cache='miss')
+        return DerivedViews(index.fixtures(league, matchday))
+
+    VIEWS_CACHE.use_version(version)
+    views = VIEWS_CACHE.get_or_compute(key, compute)
+    perf_metrics.annotate(rows=len(views.filtered))
+    return views
+
+
+# Esito reale dal punto di vista della squadra di casa
+ACTUAL_COL = 'Risultato secco reale'
+HOME_WIN, DRAW, AWAY_WIN = '1', 'X', '2'
+
+
+def row_dict(table: pd.DataFrame, row: int) -> dict:
+    """
+    Una riga della tabella come dizionario, mantenendo il tipo di ogni colonna.
+    """
+    return {col: table[col].iat[row] for col in table.columns}
+
+
+def current_streaks(teams: np.ndarray, correct: np.ndarray, n_teams: int) -> np.ndarray:
+    """
+    Serie in corso di ogni squadra: numero di predizioni consecutive corrette
+    (positivo) o errate (negativo) fino all'ultima partita conclusa.
+    teams/correct: presenze concluse ordinate per squadra e data.
+    """
+    streaks = np.zeros(n_teams, dtype=np.int32)
+    if len(teams) == 0:
+        return streaks
+    # Sequenze di esiti uguali della stessa squadra
+    starts = np.r_[True, (teams[1:] != teams[:-1]) | (correct[1:] != correct[:-1])]
+    run_ids = np.cumsum(starts) - 1
+    run_lengths = np.bincount(run_ids)
+    last = np.searchsorted(teams, np.arange(n_teams), side='right') - 1
+    has_matches = (last >= 0) & (teams[np.maximum(last, 0)] == np.arange(n_teams))
+    last = last[has_matches]
+    streaks[has_matches] = run_lengths[run_ids[last]] * np.where(correct[last] == 1, 1, -1)
+    return streaks
+
+
+class TeamIndex:
+    """
+    Read model per squadra, costruito una volta per versione del dataset.
+    Ogni partita compare due volte (per la squadra di casa e per quella
+    ospite) e le presenze sono ordinate per squadra e data: le partite di una
+    squadra sono una slice contigua. summary ha una riga per squadra con
+    partite, accuratezze complessive, in casa e in trasferta e serie in corso
+    (secco e doppia chance); h2h ha una riga per coppia di squadre con gli
+    esiti reali degli scontri diretti e l'accuratezza delle predizioni.
+    Tutte le ricerche sono accessi a dizionario, indipendenti dalla
+    lunghezza dello storico.
+    """
+
+    def __init__(self, df: pd.DataFrame, home_col: str = 'Squadra casa', away_col: str = 'Squadra ospite'):
+        if home_col not in df.columns or away_col not in df.columns:
+            df = df.iloc[:0].assign(**{home_col: pd.Series(dtype=str), away_col: pd.Series(dtype=str)})
+
+        named = (df[home_col].notna() & df[away_col].notna()).to_numpy()
+        self.frame = df if named.all() else df[named]
+        frame = self.frame
+        n = len(frame)
+        codes, teams = pd.factorize(np.concatenate([frame[home_col].astype(str).to_numpy(),
+                                                    frame[away_col].astype(str).to_numpy()]), sort=True)
+        teams = [str(team) for team in teams]
+        n_teams = len(teams)
+        home, away = codes[:n], codes[n:]
+        day_col = DAY_COLUMNS['Data partita']
+        days = day_ordinals(frame[day_col] if day_col in frame.columns else frame['Data partita']) \
+            if 'Data partita' in frame.columns else np.zeros(n, dtype=np.int32)
+        pending = ((frame[EXACT_COL] == PENDING) | (frame[DOUBLE_COL] == PENDING)).to_numpy()
+        outcomes = outcome_matrix(frame)
+        exact, double = outcomes['secco'].to_numpy(), outcomes['doppia'].to_numpy()
+
+        # Presenze (squadra, lato 0 = casa / 1 = trasferta) ordinate per squadra e data
+        team = np.concatenate([home, away])
+        rows = np.tile(np.arange(n), 2)
+        order = np.lexsort((rows, np.tile(days, 2), team))
+        team, rows = team[order], rows[order]
+        away_side = order >= n
+        completed = ~pending[rows]
+        self._rows = rows
+        self._completed = completed
+        bounds = np.searchsorted(team, np.arange(n_teams + 1))
+        self._team_rows = {name: (bounds[code], bounds[code + 1]) for code, name in enumerate(teams)}
+        self._codes = {name: code for code, name in enumerate(teams)}
+        self.teams = teams
+
+        def count(mask, weights=None):
+            return np.bincount(team[mask], weights=None if weights is None else weights[mask],
+                               minlength=n_teams).astype(np.int32)
+
+        summary = pd.DataFrame(index=pd.Index(teams, name='Squadra'))
+        summary['Partite'] = count(slice(None))
+        summary['Concluse'] = count(completed)
+        summary['Da giocare'] = summary['Partite'] - summary['Concluse']
+        exact_rows, double_rows = exact[rows], double[rows]
+        for prefix, side in (('', None), ('Casa ', ~away_side), ('Trasferta ', away_side)):
+            mask = completed if side is None else completed & side
+            total = count(mask)
+            if prefix:
+                summary[f'{prefix}Concluse'] = total
+            with np.errstate(divide='ignore', invalid='ignore'):
+                for label, values in (('Secco', exact_rows), ('Doppia', double_rows)):
+                    correct = count(mask, values)
+                    if not prefix:
+                        summary[f'Corrette {label}'] = correct
+                    summary[f'{prefix}Accuratezza {label} %'] = correct / total * 100
+        done_teams = team[completed]
+        summary['Serie Secco'] = current_streaks(done_teams, exact_rows[completed], n_teams)
+        summary['Serie Doppia'] = current_streaks(done_teams, double_rows[completed], n_teams)
+        self.summary = summary
+
+        # Campionati di ogni squadra (per filtrare l'elenco delle squadre)
+        self._league_teams = {}
+        if 'Campionato' in frame.columns:
+            league_codes, leagues = pd.factorize(frame['Campionato'], sort=True)
+            valid = league_codes[rows] >= 0
+            pairs = np.unique(league_codes[rows][valid].astype(np.int64) * n_teams + team[valid])
+            for league_code, team_code in zip((pairs // n_teams).tolist(), (pairs % n_teams).tolist()):
+                self._league_teams.setdefault(str(leagues[league_code]), []).append(teams[team_code])
+
+        # Scontri diretti: coppie (squadra A, squadra B) con A < B in ordine alfabetico
+        first, second = np.minimum(home, away), np.maximum(home, away)
+        pair_keys = first.astype(np.int64) * n_teams + second
+        pair_order = np.lexsort((np.arange(n), days, pair_keys))
+        pairs, pair_starts, pair_ids = np.unique(pair_keys[pair_order], return_index=True, return_inverse=True)
+        self._pair_rows = pair_order
+        self._pair_completed = ~pending[pair_order]
+        self._pair_bounds = np.append(pair_starts, n)
+
+        if ACTUAL_COL in frame.columns:
+            actual = frame[ACTUAL_COL].astype('category')
+            labels = np.array([str(c).strip() for c in actual.cat.categories] + [''], dtype=object)
+            actual = labels[actual.cat.codes.to_numpy()][pair_order]
+        else:
+            actual = np.full(n, '', dtype=object)
+        finished = ~pending[pair_order]
+        winners = np.where(actual == HOME_WIN, home[pair_order], np.where(actual == AWAY_WIN, away[pair_order], -1))
+
+        def pair_count(mask):
+            return np.bincount(pair_ids[mask], minlength=len(pairs)).astype(np.int32)
+
+        pair_first, pair_second = pairs // n_teams, pairs % n_teams
+        h2h = pd.DataFrame({
+            'Partite': pair_count(slice(None)),
+            'Concluse': pair_count(finished),
+            'Vittorie A': pair_count(finished & (winners == first[pair_order])),
+            'Pareggi': pair_count(finished & (actual == DRAW)),
+            'Vittorie B': pair_count(finished & (winners == second[pair_order])),
+            'Corrette Secco': pair_count(finished & (exact[pair_order] == 1)),
+            'Corrette Doppia': pair_count(finished & (double[pair_order] == 1)),
+        }, index=pd.MultiIndex.from_arrays([np.array(teams, dtype=object)[pair_first],
+                                            np.array(teams, dtype=object)[pair_second]],
+                                           names=['Squadra A', 'Squadra B']))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            h2h.insert(h2h.columns.get_loc('Corrette Secco') + 1, 'Accuratezza Secco %',
+                       h2h['Corrette Secco'] / h2h['Concluse'] * 100)
+            h2h['Accuratezza Doppia %'] = h2h['Corrette Doppia'] / h2h['Concluse'] * 100
+        self.h2h = h2h
+        self._pairs = dict(zip(zip(pair_first.tolist(), pair_second.tolist()), range(len(pairs))))
+        self._opponents = {}
+        for a, b in self._pairs:
+            if a == b:
+                continue
+            self._opponents.setdefault(a, []).append(teams[b])
+            self._opponents.setdefault(b, []).append(teams[a])
+
+    def team_list(self, league: str = 'Tutti') -> list:
+        """
+        Squadre in ordine alfabetico, solo quelle del campionato se indicato.
+        """
+        return self.teams if league == 'Tutti' else self._league_teams.get(league, [])
+
+    def team_summary(self, team: str) -> dict | None:
+        """
+        Riepilogo della squadra (una riga di summary come dizionario), None se non esiste.
+        """
+        code = self._codes.get(team)
+        return None if code is None else row_dict(self.summary, code)
+
+    def matches(self, team: str, completed: bool | None = None) -> pd.DataFrame:
+        """
+        Partite della squadra in ordine di data; completed=True/False per le
+        sole partite concluse / da giocare.
+        """
+        lo, hi = self._team_rows.get(team, (0, 0))
+        rows = self._rows[lo:hi]
+        if completed is not None:
+            rows = rows[self._completed[lo:hi] == completed]
+        return self.frame.iloc[rows]
+
+    def opponents(self, team: str) -> list:
+        """
+        Avversari affrontati (o da affrontare) dalla squadra, in ordine alfabetico.
+        """
+        code = self._codes.get(team)
+        return sorted(self._opponents.get(code, [])) if code is not None else []
+
+    def _pair(self, team: str, opponent: str) -> tuple:
+        a, b = self._codes.get(team), self._codes.get(opponent)
+        if a is None or b is None:
+            return None, False
+        return self._pairs.get((min(a, b), max(a, b))), a > b
+
+    def head_to_head(self, team: str, opponent: str) -> dict | None:
+        """
+        Scontri diretti dal punto di vista di team: partite, vittorie, pareggi,
+        sconfitte e accuratezza delle predizioni. None se non si sono mai affrontate.
+        """
+        row, swapped = self._pair(team, opponent)
+        if row is None:
+            return None
+        result = row_dict(self.h2h, row)
+        wins, losses = result.pop('Vittorie A'), result.pop('Vittorie B')
+        if swapped:
+            wins, losses = losses, wins
+        return {'Partite': result.pop('Partite'), 'Concluse': result.pop('Concluse'),
+                'Vittorie': wins, 'Pareggi': result.pop('Pareggi'), 'Sconfitte': losses, **result}
+
+    def head_to_head_matches(self, team: str, opponent: str, completed: bool | None = None) -> pd.DataFrame:
+        """
+        Partite tra le due squadre in ordine di data (completed come in matches).
+        """
+        row, _ = self._pair(team, opponent)
+        if row is None:
+            return self.frame.iloc[:0]
+        lo, hi = self._pair_bounds[row], self._pair_bounds[row + 1]
+        rows = self._pair_rows[lo:hi]
+        if completed is not None:
+            rows = rows[self._pair_completed[lo:hi] == completed]
+        return self.frame.iloc[rows]
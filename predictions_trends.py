@@ -0,0 +1,265 @@
+"""
+Serie temporali dell'accuratezza: conteggi per (campionato, confidence,
+giorno) mantenuti in modo incrementale, da cui si ricavano accuratezza per
+giorno o settimana, cumulata, su finestre mobili e intervalli di Wilson.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+import perf_metrics
+from predictions_data import (NO_DATE, PENDING, dataset_version, day_ordinals, from_day_ordinal, week_label,
+                              week_ordinals)
+from predictions_stats import DOUBLE_COL, EXACT_COL, outcome_matrix
+
+BUCKET_COLUMNS = ['Campionato', 'Confidence', 'Giorno']
+COUNT_COLUMNS = ['Totale', 'Corrette Secco', 'Corrette Doppia']
+PERIODS = {'giorno': 'Giorno', 'settimana': 'Settimana'}
+
+# Quantile della normale per gli intervalli di confidenza al 95%
+WILSON_Z = 1.96
+
+
+def wilson_interval(correct, total, z: float = WILSON_Z):
+    """
+    Intervallo di confidenza di Wilson per la proporzione correct/total
+    (array o scalari). Restituisce (basso, alto) in percentuale; NaN se total = 0.
+    """
+    correct = np.asarray(correct, dtype=float)
+    total = np.asarray(total, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p = correct / total
+        denominator = 1 + z**2 / total
+        center = (p + z**2 / (2 * total)) / denominator
+        half = z * np.sqrt(p * (1 - p) / total + z**2 / (4 * total**2)) / denominator
+    return (center - half) * 100, (center + half) * 100
+
+
+def with_accuracy(counts: pd.DataFrame) -> pd.DataFrame:
+    """
+    Aggiunge a una tabella di conteggi (COUNT_COLUMNS) accuratezze e
+    intervalli di Wilson per risultato secco e doppia chance.
+    """
+    result = counts.copy()
+    total = result['Totale'].to_numpy()
+    for label, col in (('Secco', 'Corrette Secco'), ('Doppia', 'Corrette Doppia')):
+        correct = result[col].to_numpy()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            result[f'Accuratezza {label} %'] = correct / total * 100
+        result[f'IC {label} basso %'], result[f'IC {label} alto %'] = wilson_interval(correct, total)
+    return result
+
+
+def completed_rows(completed: pd.DataFrame) -> pd.DataFrame:
+    """
+    Partite concluse ridotte alle colonne dei bucket e agli esiti (int8).
+    """
+    outcomes = outcome_matrix(completed)
+    return pd.DataFrame({
+        # .array mantiene le colonne categoriche (niente stringhe per riga)
+        'Campionato': completed['Campionato'].array if 'Campionato' in completed.columns else '',
+        'Confidence': completed['Confidence'].array if 'Confidence' in completed.columns else '',
+        'Giorno': day_ordinals(completed['Giorno partita'] if 'Giorno partita' in completed.columns
+                               else completed['Data partita']),
+        'secco': outcomes['secco'].to_numpy(),
+        'doppia': outcomes['doppia'].to_numpy(),
+    })
+
+
+def row_keys(df: pd.DataFrame) -> np.ndarray:
+    """
+    Impronta (uint64) di ogni riga; le righe identiche ricevono impronte
+    distinte in base all'ordine di comparsa.
+    """
+    keys = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    duplicated = pd.Series(keys).duplicated(keep=False).to_numpy()
+    if duplicated.any():
+        occurrence = pd.Series(keys).groupby(keys).cumcount().to_numpy().astype(np.uint64)
+        keys = keys + occurrence * np.uint64(0x9E3779B97F4A7C15)
+    return keys
+
+
+def bucket_counts(rows: pd.DataFrame) -> pd.DataFrame:
+    """
+    Conteggi per bucket (BUCKET_COLUMNS) di un insieme di righe di completed_rows.
+    """
+    grouped = rows[['secco', 'doppia']].groupby([rows[col] for col in BUCKET_COLUMNS], observed=True, sort=False)
+    counts = grouped.sum().astype(np.int64)
+    counts.insert(0, 'Totale', grouped.size().astype(np.int64))
+    counts.columns = COUNT_COLUMNS
+    # Etichette come testo: le categorie cambiano da una versione all'altra del dataset
+    counts.index = pd.MultiIndex.from_arrays(
+        [counts.index.get_level_values(0).astype(str), counts.index.get_level_values(1).astype(str),
+         counts.index.get_level_values(2).astype(np.int32)],
+        names=BUCKET_COLUMNS)
+    return counts
+
+
+class AccuracySeries:
+    """
+    Conteggi di partite e predizioni corrette per (campionato, confidence,
+    giorno), aggiornati senza raggruppare di nuovo tutto il dataset:
+    - righe solo aggiunte in coda (attrs 'base_version'/'base_rows' impostati
+      dal refresher) = vengono contate solo le nuove righe;
+    - altrimenti le impronte delle partite concluse vengono confrontate con
+      quelle già contate e si aggiornano solo i bucket delle righe aggiunte o
+      rimosse (nuovi risultati, correzioni).
+    """
+
+    def __init__(self):
+        self.version = None
+        self.counts = pd.DataFrame(
+            columns=COUNT_COLUMNS, dtype=np.int64,
+            index=pd.MultiIndex.from_arrays([[], [], []], names=BUCKET_COLUMNS))
+        self.last_update = {}
+        self._keys = np.empty(0, dtype=np.uint64)
+        self._rows = None
+        self._lock = threading.Lock()
+
+    def update(self, df: pd.DataFrame, version: str | None = None):
+        """
+        Porta i conteggi alla versione df del dataset.
+        """
+        version = version or dataset_version(df)
+        with self._lock:
+            if version == self.version:
+                return
+            with perf_metrics.stage('trend (aggiornamento)') as entry:
+                base_rows = df.attrs.get('base_rows', 0)
+                if self._rows is not None and df.attrs.get('base_version') == self.version:
+                    df = df.iloc[base_rows:]
+                else:
+                    base_rows = None
+                pending = ((df[EXACT_COL] == PENDING) | (df[DOUBLE_COL] == PENDING)).to_numpy()
+                completed = df[~pending]
+                rows = completed_rows(completed)
+                # L'impronta copre tutta la riga: un risultato inserito o
+                # corretto toglie la vecchia versione e conta la nuova
+                keys = row_keys(completed)
+
+                if self._rows is None:
+                    added = np.ones(len(keys), dtype=bool)
+                    removed = np.zeros(0, dtype=bool)
+                    counts = bucket_counts(rows)
+                elif base_rows is not None:
+                    # Solo righe in coda: si sommano ai conteggi esistenti
+                    added = np.ones(len(keys), dtype=bool)
+                    removed = np.zeros(0, dtype=bool)
+                    counts = self.counts.add(bucket_counts(rows), fill_value=0) if len(rows) else self.counts
+                    keys = np.concatenate([self._keys, keys])
+                    rows = pd.concat([self._rows, rows], ignore_index=True)
+                else:
+                    added = ~pd.Series(keys).isin(self._keys).to_numpy()
+                    removed = ~pd.Series(self._keys).isin(keys).to_numpy()
+                    counts = self.counts
+                    if added.any():
+                        counts = counts.add(bucket_counts(rows[added]), fill_value=0)
+                    if removed.any():
+                        counts = counts.sub(bucket_counts(self._rows[removed]), fill_value=0)
+                counts = counts[counts['Totale'] > 0].astype(np.int64).sort_index()
+
+                self.last_update = {'aggiunte': int(added.sum()), 'rimosse': int(removed.sum())}
+                entry.update(self.last_update)
+                self.counts = counts
+                self._keys = keys
+                self._rows = rows
+                self.version = version
+
+    def period_counts(self, period: str = 'settimana', league: str = 'Tutti', confidence: str | None = None,
+                      start_day: int | None = None, end_day: int | None = None) -> pd.DataFrame:
+        """
+        Conteggi per giorno o settimana (ordinati), con i filtri su campionato,
+        confidence e intervallo di giorni [start_day, end_day].
+        """
+        counts = self.counts
+        if league != 'Tutti':
+            counts = counts[counts.index.get_level_values('Campionato') == league]
+        if confidence is not None:
+            counts = counts[counts.index.get_level_values('Confidence') == confidence]
+        days = counts.index.get_level_values('Giorno').to_numpy()
+        mask = days != NO_DATE
+        if start_day is not None:
+            mask &= days >= start_day
+        if end_day is not None:
+            mask &= days <= end_day
+        counts, days = counts[mask], days[mask]
+
+        keys = week_ordinals(days) if period == 'settimana' else days
+        return counts.groupby(keys, sort=True).sum().rename_axis(PERIODS[period])
+
+    def series(self, period: str = 'settimana', **filters) -> pd.DataFrame:
+        """
+        Accuratezza per giorno o settimana con intervalli di Wilson.
+        """
+        return label_periods(with_accuracy(self.period_counts(period, **filters)), period)
+
+    def cumulative(self, period: str = 'settimana', **filters) -> pd.DataFrame:
+        """
+        Accuratezza cumulata alla fine di ogni giorno o settimana.
+        """
+        return label_periods(with_accuracy(self.period_counts(period, **filters).cumsum()), period)
+
+    def rolling(self, periods: int, period: str = 'giorno', **filters) -> pd.DataFrame:
+        """
+        Accuratezza sugli ultimi `periods` giorni (o settimane) di calendario,
+        valutata a ogni giorno (o settimana) con partite concluse: i periodi
+        senza partite contano nella finestra come vuoti.
+        """
+        counts = self.period_counts(period, **filters)
+        if len(counts):
+            step = 7 if period == 'settimana' else 1
+            calendar = np.arange(counts.index[0], counts.index[-1] + 1, step)
+            window = counts.reindex(calendar, fill_value=0).rolling(periods, min_periods=1).sum()
+            counts = window.loc[counts.index].astype(np.int64)
+        return label_periods(with_accuracy(counts), period)
+
+
+def label_periods(table: pd.DataFrame, period: str) -> pd.DataFrame:
+    """
+    Sostituisce gli ordinali dell'indice con date (giorni) o etichette (settimane).
+    """
+    if period == 'settimana':
+        labels = [week_label(week) for week in table.index]
+    else:
+        labels = [from_day_ordinal(day) for day in table.index]
+    return table.set_axis(pd.Index(labels, name=PERIODS[period]))
+
+
+def rolling_matches(completed: pd.DataFrame, matches: int) -> pd.DataFrame:
+    """
+    Accuratezza sulle ultime `matches` partite concluse, valutata alla fine
+    di ogni giorno. completed deve essere ordinato per data (come le viste
+    dell'indice dei filtri); somme cumulative, senza raggruppamenti per finestra.
+    """
+    days = day_ordinals(completed['Giorno partita'] if 'Giorno partita' in completed.columns
+                        else completed['Data partita'])
+    dated = days != NO_DATE
+    outcomes = outcome_matrix(completed)[dated]
+    days = days[dated]
+
+    cumulative = np.vstack([np.zeros((1, 2), dtype=np.int64),
+                            np.cumsum(outcomes[['secco', 'doppia']].to_numpy(dtype=np.int64), axis=0)])
+    # Ultima partita di ogni giorno
+    ends = np.flatnonzero(np.append(days[1:] != days[:-1], True)) + 1 if len(days) else np.empty(0, dtype=int)
+    starts = np.maximum(ends - matches, 0)
+    window = cumulative[ends] - cumulative[starts]
+
+    counts = pd.DataFrame({
+        'Totale': ends - starts,
+        'Corrette Secco': window[:, 0],
+        'Corrette Doppia': window[:, 1],
+    }, index=pd.Index(days[ends - 1] if len(ends) else [], name='Giorno'))
+    return label_periods(with_accuracy(counts), 'giorno')
+
+
+# Motore di processo, aggiornato in modo incrementale a ogni nuova versione del dataset
+ACCURACY_SERIES = AccuracySeries()
+
+
+def get_accuracy_series(df: pd.DataFrame) -> AccuracySeries:
+    """
+    Motore delle serie di accuratezza allineato alla versione corrente del dataset.
+    """
+    ACCURACY_SERIES.update(df)
+    return ACCURACY_SERIES
@@ -0,0 +1,161 @@
+"""
+Test del livello dati: aggiornamento incrementale del refresher,
+normalizzazione delle probabilità 1/X/2 e snapshot condivisi tra processi.
+"""
+import os
+import subprocess
+import sys
+import textwrap
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from predictions_data import (PROBABILITY_COLUMNS, PROBABILITY_VALID_COLUMN, FileLock,  # noqa: E402
+                              SheetRefresher, normalize_probabilities, parse_predictions_csv)
+
+HEADER = ('Data partita,Squadra casa,Squadra ospite,Risultato secco previsto,Risultato secco reale,'
+          'Doppia chance prevista,Confidence,Risultato predizione (risultato secco),'
+          'Risultato predizione (doppia chance),Giornata,Campionato\n')
+BASE_ROWS = ('23/08/2025,Inter,Torino,1,X,1X,Alta,Errato,Corretto,1,Serie A\n'
+             '23/08/2025,Milan,Cremonese,X,2,X2,Media,Errato,Corretto,1,Serie A\n')
+# Coda con soli esiti '1'/'2': letta da sola verrebbe interpretata come numerica
+NUMERIC_TAIL = ('30/08/2025,Torino,Fiorentina,1,1,1X,Bassa,Corretto,Corretto,2,Serie A\n'
+                '30/08/2025,Cremonese,Sassuolo,2,2,X2,Alta,Corretto,Corretto,2,Serie A\n')
+
+
+def comparable(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Valori confrontabili indipendentemente dall'ordine delle categorie.
+    """
+    return df.astype({col: str for col in df.columns if isinstance(df[col].dtype, pd.CategoricalDtype)})
+
+
+def test_append_numeric_tail_matches_full_parse():
+    content = (HEADER + BASE_ROWS).encode()
+    appended = (HEADER + BASE_ROWS + NUMERIC_TAIL).encode()
+
+    refresher = SheetRefresher('https://example.com/sheet.csv')
+    refresher.update(content)
+    df = refresher.update(appended)
+
+    assert refresher.last_mode == 'append'
+    expected = parse_predictions_csv(appended)
+    pd.testing.assert_frame_equal(comparable(df), comparable(expected))
+    assert df['Risultato secco reale'].astype(str).tolist() == ['X', '2', '1', '2']
+
+
+def normalized(rows: list) -> pd.DataFrame:
+    return normalize_probabilities(pd.DataFrame(rows, columns=PROBABILITY_COLUMNS))
+
+
+def test_fraction_rows_become_percentages():
+    df = normalized([['0.5', '0.3', '0.2'], [0.45, 0.3, 0.25]])
+
+    np.testing.assert_allclose(df[PROBABILITY_COLUMNS].to_numpy(), [[50.0, 30.0, 20.0], [45.0, 30.0, 25.0]], rtol=1e-6)
+    assert df[PROBABILITY_VALID_COLUMN].tolist() == [True, True]
+
+
+def test_percent_rows_are_kept():
+    df = normalized([['45%', '30%', '25%'], ['50', '30,5', '19,5']])
+
+    np.testing.assert_allclose(df[PROBABILITY_COLUMNS].to_numpy(), [[45.0, 30.0, 25.0], [50.0, 30.5, 19.5]], rtol=1e-6)
+    assert df[PROBABILITY_VALID_COLUMN].tolist() == [True, True]
+
+
+def test_rows_with_percent_sign_are_not_rescaled():
+    # Somma sotto 1 ma scritta in percentuale: non è una riga di frazioni
+    df = normalized([['0.5%', '0.3%', '0.2%'], ['0.5', '0.3%', '0.2']])
+
+    np.testing.assert_allclose(df[PROBABILITY_COLUMNS].to_numpy(), [[0.5, 0.3, 0.2], [0.5, 0.3, 0.2]], rtol=1e-6)
+    assert df[PROBABILITY_VALID_COLUMN].tolist() == [False, False]
+
+
+def test_rows_with_missing_values_are_not_rescaled():
+    df = normalized([['1%', None, None], ['0.5', '0.5', None]])
+
+    probs = df[PROBABILITY_COLUMNS].to_numpy()
+    assert probs[0, 0] == pytest.approx(1.0)
+    np.testing.assert_allclose(probs[1, :2], [0.5, 0.5])
+    assert np.isnan(probs[:, 2]).all()
+    assert df[PROBABILITY_VALID_COLUMN].tolist() == [False, False]
+
+
+@pytest.fixture
+def sheet_server():
+    """
+    Server HTTP locale che restituisce il CSV e conta le richieste.
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            server.hits += 1
+            body = (HEADER + BASE_ROWS).encode()
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.hits = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def run_in_process(code: str) -> str:
+    """
+    Esegue code in un nuovo interprete Python e restituisce lo stdout.
+    """
+    result = subprocess.run([sys.executable, '-c', textwrap.dedent(code)], cwd=REPO_DIR,
+                            capture_output=True, text=True, timeout=60, check=True)
+    return result.stdout.strip()
+
+
+def test_second_process_reuses_shared_snapshot(sheet_server, tmp_path):
+    url = f'http://127.0.0.1:{sheet_server.server_port}/sheet.csv'
+    refresher = SheetRefresher(url, snapshot_dir=str(tmp_path), shared_max_age=60)
+    refresher.refresh()
+    assert refresher.last_mode == 'full'
+    assert sheet_server.hits == 1
+
+    output = run_in_process(f"""
+        from predictions_data import SheetRefresher
+        refresher = SheetRefresher({url!r}, snapshot_dir={str(tmp_path)!r}, shared_max_age=60)
+        df = refresher.refresh()
+        print(refresher.last_mode, refresher.digest, len(df))
+    """)
+
+    assert output.split() == ['shared', refresher.digest, str(len(refresher.df))]
+    assert sheet_server.hits == 1
+
+
+def test_file_lock_excludes_other_processes(tmp_path):
+    path = str(tmp_path / 'snapshot.lock')
+    attempt = f"""
+        from predictions_data import FileLock
+        print(FileLock({path!r}, timeout=0.2, stale=60).acquire())
+    """
+
+    with FileLock(path, timeout=1, stale=60) as acquired:
+        assert acquired
+        assert run_in_process(attempt) == 'False'
+    assert not os.path.exists(path)
+    assert run_in_process(attempt) == 'True'
+
+
+def test_file_lock_removes_stale_lock(tmp_path):
+    path = tmp_path / 'snapshot.lock'
+    path.write_text('0 0')
+    os.utime(path, (0, 0))
+
+    with FileLock(str(path), timeout=0.2, stale=60) as acquired:
+        assert acquired
@@ -0,0 +1,70 @@
+"""
+Test dei punteggi delle probabilità 1/X/2 su partite con valori noti.
+"""
+import math
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from predictions_data import parse_predictions_csv  # noqa: E402
+from predictions_scoring import ProbabilityScores  # noqa: E402
+
+HEADER = ('Data partita,Squadra casa,Squadra ospite,Campionato,Confidence,Probabilità Vittoria Casa,'
+          'Probabilità Pareggio,Probabilità Vittoria Ospite,Risultato secco reale,'
+          'Risultato predizione (risultato secco),Risultato predizione (doppia chance)\n')
+ROWS = ('23/08/2025,Inter,Torino,Serie A,Alta,50%,30%,20%,1,Corretto,Corretto\n'
+        '24/08/2025,Betis,Elche,La Liga,Media,0.2,0.3,0.5,X,Errato,Corretto\n'
+        # Esclusa: partita da giocare
+        '30/08/2025,Roma,Pisa,Serie A,Alta,40%,30%,30%,,,\n'
+        # Esclusa: probabilità incomplete
+        '30/08/2025,Milan,Lecce,Serie A,Bassa,60%,,,2,Errato,Errato\n')
+
+
+@pytest.fixture(scope='module')
+def scores() -> ProbabilityScores:
+    return ProbabilityScores(parse_predictions_csv((HEADER + ROWS).encode()))
+
+
+def test_scores_of_each_match(scores):
+    # Inter-Torino 0.5/0.3/0.2 con esito '1'; Betis-Elche 0.2/0.3/0.5 con esito 'X'
+    inter = scores.summary('Serie A')
+    assert inter['Partite'] == 1
+    assert inter['Brier'] == pytest.approx(0.25 + 0.09 + 0.04)
+    assert inter['Log-loss'] == pytest.approx(-math.log(0.5))
+    assert inter['RPS'] == pytest.approx((0.5 ** 2 + 0.2 ** 2) / 2)
+
+    betis = scores.summary(confidence='Media')
+    assert betis['Partite'] == 1
+    assert betis['Brier'] == pytest.approx(0.04 + 0.49 + 0.25)
+    assert betis['Log-loss'] == pytest.approx(-math.log(0.3))
+    assert betis['RPS'] == pytest.approx((0.2 ** 2 + 0.5 ** 2) / 2)
+
+
+def test_summary_averages_selected_matches(scores):
+    summary = scores.summary()
+
+    assert scores.matches == 2
+    assert summary['Partite'] == 2
+    assert summary['Brier'] == pytest.approx((0.38 + 0.78) / 2)
+    assert summary['Log-loss'] == pytest.approx((-math.log(0.5) - math.log(0.3)) / 2)
+    assert scores.summary('Premier League') == {'Partite': 0, 'Brier': None, 'Log-loss': None, 'RPS': None}
+
+    table = scores.score_table('Confidence')
+    assert table.index.tolist() == ['Alta', 'Media']
+    assert table['Brier'].tolist() == pytest.approx([0.38, 0.78])
+
+
+def test_reliability_bins(scores):
+    table = scores.reliability()
+
+    # Ogni partita contribuisce tre previsioni, una per esito
+    assert table.index.tolist() == ['20-30%', '30-40%', '50-60%']
+    assert table['Previsioni'].tolist() == [2, 2, 2]
+    assert table['Probabilità media %'].tolist() == pytest.approx([20, 30, 50])
+    assert table['Frequenza osservata %'].tolist() == pytest.approx([0, 50, 50])
+
+    only_inter = scores.reliability('Serie A')
+    assert only_inter['Frequenza osservata %'].tolist() == pytest.approx([0, 0, 100])
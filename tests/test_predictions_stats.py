@@ -0,0 +1,52 @@
+"""
+Test degli indici e delle cache di processo delle viste derivate.
+"""
+import gc
+import os
+import sys
+import weakref
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from predictions_data import apply_schema  # noqa: E402
+from predictions_stats import VIEWS_CACHE, FilterIndex, get_derived_views  # noqa: E402
+
+
+def make_dataset(rows: int) -> pd.DataFrame:
+    days = pd.date_range('2025-08-01', periods=30, freq='D')
+    return apply_schema(pd.DataFrame({
+        'Data partita': np.resize(days.strftime('%d/%m/%Y').to_numpy(), rows),
+        'Squadra casa': 'Inter',
+        'Squadra ospite': 'Milan',
+        'Campionato': 'Serie A',
+        'Giornata': np.arange(rows) % 38 + 1,
+        'Risultato predizione (risultato secco)': 'Corretto',
+        'Risultato predizione (doppia chance)': 'Corretto',
+    }))
+
+
+def root_buffer(frame: pd.DataFrame) -> np.ndarray:
+    values = frame['Giornata'].to_numpy()
+    while values.base is not None and isinstance(values.base, np.ndarray):
+        values = values.base
+    return values
+
+
+def test_new_version_frees_views_of_previous_version():
+    day = date(2025, 8, 3)
+    old = get_derived_views(FilterIndex(make_dataset(3000)), 'v1', date_mode='solo', date=day)
+    old_views = weakref.ref(old)
+    old_buffer = weakref.ref(root_buffer(old.filtered))
+    del old
+
+    new = get_derived_views(FilterIndex(make_dataset(3000)), 'v2', date_mode='solo', date=day)
+    gc.collect()
+
+    assert old_views() is None
+    assert old_buffer() is None
+    assert all(key[0] == 'v2' for key in VIEWS_CACHE._items)
+    assert len(new.filtered) == 100
@@ -0,0 +1,82 @@
+"""
+Test delle serie di accuratezza (conteggi incrementali e finestre mobili).
+"""
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from predictions_data import SheetRefresher, parse_predictions_csv  # noqa: E402
+from predictions_trends import AccuracySeries  # noqa: E402
+
+HEADER = ('Data partita,Squadra casa,Squadra ospite,Confidence,Risultato predizione (risultato secco),'
+          'Risultato predizione (doppia chance),Giornata,Campionato\n')
+# Partite con buchi tra le date: 1, 2 e 20 settembre
+GAP_ROWS = ('01/09/2025,Inter,Torino,Alta,Corretto,Corretto,1,Serie A\n'
+            '02/09/2025,Milan,Roma,Media,Errato,Corretto,1,Serie A\n'
+            '20/09/2025,Lazio,Napoli,Alta,Corretto,Corretto,2,Serie A\n')
+
+
+def series_for(rows: str) -> AccuracySeries:
+    series = AccuracySeries()
+    series.update(parse_predictions_csv((HEADER + rows).encode()))
+    return series
+
+
+def test_rolling_days_is_a_calendar_window():
+    trend = series_for(GAP_ROWS).rolling(2, 'giorno')
+
+    assert [str(day) for day in trend.index] == ['2025-09-01', '2025-09-02', '2025-09-20']
+    # Il 20 settembre la finestra di 2 giorni non raggiunge più l'1 e il 2
+    assert trend['Totale'].tolist() == [1, 2, 1]
+    assert trend['Corrette Secco'].tolist() == [1, 1, 1]
+
+
+def test_rolling_weeks_counts_empty_weeks():
+    trend = series_for(GAP_ROWS).rolling(2, 'settimana')
+
+    # Settimane del 1 e del 15 settembre: quella dell'8 è vuota
+    assert trend['Totale'].tolist() == [2, 1]
+
+
+# Storico con più campionati e livelli di confidence, poi righe in coda e correzioni
+BASE_ROWS = ('23/08/2025,Inter,Torino,Alta,Errato,Corretto,1,Serie A\n'
+             '23/08/2025,Milan,Cremonese,Media,Corretto,Corretto,1,Serie A\n'
+             '24/08/2025,Betis,Elche,Bassa,Errato,Errato,1,La Liga\n'
+             '30/08/2025,Roma,Pisa,Alta,,,2,Serie A\n')
+TAIL_ROWS = ('31/08/2025,Siviglia,Getafe,Media,Corretto,Corretto,2,La Liga\n'
+             '31/08/2025,Napoli,Cagliari,Alta,Corretto,Corretto,2,Serie A\n')
+# La partita da giocare riceve il risultato, un esito viene corretto
+EDITED_ROWS = (BASE_ROWS.replace('Roma,Pisa,Alta,,,', 'Roma,Pisa,Alta,Corretto,Corretto,')
+               .replace('Inter,Torino,Alta,Errato,', 'Inter,Torino,Alta,Corretto,'))
+
+
+def assert_same_counts(incremental: AccuracySeries, df):
+    full = AccuracySeries()
+    full.update(df)
+    pd.testing.assert_frame_equal(incremental.counts, full.counts)
+
+
+def test_appended_rows_match_full_recompute():
+    refresher = SheetRefresher('https://example.com/sheet.csv')
+    series = AccuracySeries()
+    series.update(refresher.update((HEADER + BASE_ROWS).encode()))
+    df = refresher.update((HEADER + BASE_ROWS + TAIL_ROWS).encode())
+    series.update(df)
+
+    assert refresher.last_mode == 'append'
+    assert series.last_update == {'aggiunte': 2, 'rimosse': 0}
+    assert_same_counts(series, df)
+
+
+def test_edited_rows_match_full_recompute():
+    series = AccuracySeries()
+    series.update(parse_predictions_csv((HEADER + BASE_ROWS + TAIL_ROWS).encode()))
+    df = parse_predictions_csv((HEADER + EDITED_ROWS + TAIL_ROWS).encode())
+    series.update(df)
+
+    # Una riga corretta (tolta e ricontata) e una nuova partita conclusa
+    assert series.last_update == {'aggiunte': 2, 'rimosse': 1}
+    assert_same_counts(series, df)